@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import copy
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.EstaticosMiddleware',  # WhiteNoise (también asíncrono): estáticos antes que el resto, sin sesión ni BD
+    'core.middleware.PerfiladoMiddleware',  # Al principio: el perfil incluye los demás middlewares
+    'core.middleware.ConsultasLentasMiddleware',  # Antes de sesión/auth: también mide sus consultas
+    'core.middleware.MantenimientoMiddleware',  # Antes de sesión/auth: no toca la BD
+    'core.middleware.LecturaPropiaMiddleware',  # Antes de sesión: también detecta el guardado de la sesión
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,12 +62,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.fragmentos',
+            ],
+            # Cada plantilla se compila una vez por proceso; con runserver el autoreloader
+            # vacía el cargador cuando cambia un archivo de plantilla
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -69,6 +83,14 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'biblioteca.wsgi.application'
 
+# Precalentamiento de cada proceso al cargar wsgi.py/asgi.py (ver core/precalentamiento.py).
+# Con gunicorn (--preload incluido) el pool y los catálogos se cargan en cada worker
+# desde gunicorn.conf.py, no en el proceso maestro
+PRECALENTAR = True
+# Módulos pesados que se importan también al arrancar (p. ej. ['pandas', 'openpyxl'] si
+# la exportación a Excel es frecuente; cada proceso ocupa más memoria)
+PRECALENTAR_MODULOS = []
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -85,9 +107,110 @@ DATABASES = {
             'options': '-c search_path=sh_biblioteca,public'
         },
         'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Pool de conexiones de psycopg 3 (pip install "psycopg[binary,pool]").
+# Cada proceso comparte entre sus hilos de min_size a max_size conexiones: procesos x max_size
+# debe quedar por debajo de max_connections de PostgreSQL. Con CONN_HEALTH_CHECKS la conexión
+# se verifica al sacarla del pool.
+DATABASE_POOL = {
+    'min_size': 2,
+    'max_size': 10,
+    'timeout': 10,         # Segundos máximos esperando una conexión libre
+    'max_idle': 300,       # Cierra las conexiones ociosas que excedan min_size
+    'max_lifetime': 3600,  # Recicla cada conexión pasada una hora
+}
+
+try:
+    import psycopg_pool  # noqa: F401
+except ImportError:
+    # Sin psycopg 3 se mantienen las conexiones persistentes por hilo (CONN_MAX_AGE)
+    pass
+else:
+    DATABASES['default']['OPTIONS']['pool'] = DATABASE_POOL
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# Pool asíncrono (psycopg 3) de los endpoints del dashboard bajo ASGI, uno por event loop.
+# Cada petición usa una conexión por consulta concurrente (ver core/consultas_async.py).
+ASYNC_DATABASE_POOL = {
+    'min_size': 2,
+    'max_size': 20,
+    'timeout': 10,
+    'max_idle': 300,
+}
+
+# Réplica de solo lectura para dashboards, gráficos y exportaciones (ver core/replicas.py).
+# Solo se indican las claves que difieren de 'default', p. ej. {'HOST': 'replica.local', 'PORT': '5432'}.
+# Con None todas las lecturas van a la base principal.
+DATABASE_REPLICA = None
+
+if DATABASE_REPLICA:
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        **DATABASE_REPLICA,
+        'TEST': {'MIRROR': 'default'},
+    }
+    if 'pool' in DATABASES['replica']['OPTIONS']:
+        # Si la réplica no responde se vuelve pronto a la principal
+        DATABASES['replica']['OPTIONS']['pool'] = {**DATABASE_POOL, 'timeout': 2}
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# Retraso máximo (s) de la réplica antes de volver a leer de la principal
+REPLICA_RETRASO_MAXIMO = 10
+# Segundos entre verificaciones del retraso (por proceso)
+REPLICA_INTERVALO_VERIFICACION = 5
+# Segundos durante los que un cliente que escribió lee de la principal
+REPLICA_LECTURA_PROPIA = 5
+
+# Estadísticas del dashboard por Server-Sent Events (solo bajo ASGI, ver core/eventos.py)
+# Segundos entre recálculos cuando no hay escrituras
+SSE_INTERVALO = 30
+# Segundos entre consultas de la versión de las tablas: una escritura se refleja como máximo tras este tiempo
+SSE_INTERVALO_MINIMO = 2
+# Segundos entre latidos que mantienen viva la conexión
+SSE_LATIDO = 15
+
+# Pre-registro diferido para picos de inscripción (ver core/entrada_preregistros.py):
+# la vista solo valida el formato y encola; 'manage.py procesar_preregistros --continuo'
+# verifica, inserta por lotes y avisa por correo
+PRE_REGISTRO_DIFERIDO = False
+# Solicitudes por lote del procesador
+PRE_REGISTRO_LOTE = 500
+
+# Cola de revisión de pre-registros (ver core/cola_revision.py)
+# Segundos que un pre-registro reclamado queda reservado al revisor
+COLA_REVISION_RESERVA = 300
+# Máximo de pre-registros por reclamo
+COLA_REVISION_MAXIMO = 20
+
+# Días tras el registro para mover un pre-registro RECHAZADO a
+# pre_registro_archivo con 'manage.py archivar_preregistros' (ver core/archivo.py)
+PRE_REGISTRO_ARCHIVO_DIAS = 180
+
+# Perfiles cProfile por petición (ver core/perfilado.py): un superusuario los pide con la
+# cabecera "X-Perfilar: 1" o ?perfilar=1; se listan en /superuser/api/perfiles/
+PERFILADO_DIRECTORIO = BASE_DIR / 'perfiles'
+# Perfiles conservados; al superarlo se borran los más antiguos
+PERFILADO_MAXIMO = 50
+# Fracción de todas las peticiones que se perfilan al azar (0 = solo a pedido)
+PERFILADO_MUESTREO = 0.0
+
+# Consultas lentas (ver core/consultas_lentas.py), agrupadas en /superuser/api/consultas-lentas/
+# Milisegundos a partir de los que se registra una sentencia (None = desactivado)
+CONSULTAS_LENTAS_UMBRAL_MS = 200
+# Registros conservados en memoria por proceso
+CONSULTAS_LENTAS_MAXIMO = 500
+# Fracción de las consultas lentas que se explican con EXPLAIN (ANALYZE, BUFFERS)
+CONSULTAS_LENTAS_MUESTREO_PLAN = 0.1
+# Límite de cada EXPLAIN ANALYZE
+CONSULTAS_LENTAS_PLAN_TIMEOUT_MS = 5000
+
+# Las pruebas clonan una plantilla construida con sql/sh_biblioteca.sql + migraciones
+TEST_RUNNER = 'core.test_runner.BibliotecaTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -108,6 +231,21 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PBKDF2CalibradoHasher usa PASSWORD_PBKDF2_ITERATIONS; recalcular con:
+#   python manage.py calibrar_hasher --objetivo-ms 100 --escribir
+
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2CalibradoHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_PBKDF2_ITERATIONS = 1000000
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -127,6 +265,38 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic minifica JS/CSS, añade el hash del contenido al nombre y genera .gz/.br
+# (ver core/almacenamiento.py). WhiteNoise sirve los archivos con hash como inmutables.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.almacenamiento.EstaticosMinificados',
+    },
+}
+# Caché de los archivos sin hash; los que llevan hash siempre se sirven con max-age de 10 años e immutable
+WHITENOISE_MAX_AGE = 0 if DEBUG else 3600
+
+# 'fragmentos' guarda las partes estáticas de las plantillas ({% cache ... using="fragmentos" %});
+# sus claves incluyen la versión de catálogos/configuración y el rol, así que no requiere invalidación
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragmentos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragmentos',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Configuración del sistema
+# Segundos entre verificaciones de la versión de configuración en BD (por proceso)
+CONFIGURACION_INTERVALO_VERIFICACION = 5
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'biblioteca.settings')
 
 application = get_wsgi_application()
+
+# Importaciones, pool, catálogos y plantillas antes de la primera petición (PRECALENTAR)
+# Con gunicorn el pool y los catálogos se cargan en cada worker (gunicorn.conf.py)
+from core.precalentamiento import precalentar_si_corresponde  # noqa: E402
+
+precalentar_si_corresponde()
@@ -0,0 +1,66 @@
+"""
+Almacenamiento de archivos estáticos para producción.
+
+Durante ``collectstatic``:
+1. minifica los .js y .css copiados (rjsmin / rcssmin, si están instalados),
+2. les asigna nombres con hash del contenido y escribe staticfiles.json,
+3. genera las variantes .gz y .br (WhiteNoise; .br solo si Brotli está instalado).
+
+WhiteNoise sirve los archivos con hash con ``Cache-Control: immutable`` y elige la
+variante comprimida según el Accept-Encoding del navegador.
+"""
+import logging
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+def _minificador_js():
+    try:
+        from rjsmin import jsmin
+    except ImportError:
+        return None
+    return jsmin
+
+def _minificador_css():
+    try:
+        from rcssmin import cssmin
+    except ImportError:
+        return None
+    return cssmin
+
+class EstaticosMinificados(CompressedManifestStaticFilesStorage):
+    # Sin collectstatic (desarrollo, pruebas) {% static %} devuelve el nombre original
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.minificar(paths)
+            # El hash y las copias con hash se calculan desde los archivos ya minificados
+            # del destino, no desde los originales de STATICFILES_DIRS
+            paths = {nombre: (self, nombre) for nombre in paths}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minificar(self, paths):
+        """Minifica en el destino los archivos recién copiados, antes de calcular su hash"""
+        minificadores = {'.js': _minificador_js(), '.css': _minificador_css()}
+        antes = despues = 0
+
+        for nombre in paths:
+            extension = nombre[nombre.rfind('.'):].lower()
+            minificar = minificadores.get(extension)
+            if minificar is None or nombre.endswith(('.min.js', '.min.css')):
+                continue
+
+            ruta = self.path(nombre)
+            with open(ruta, encoding='utf-8') as archivo:
+                original = archivo.read()
+            minificado = minificar(original)
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(minificado)
+
+            antes += len(original.encode('utf-8'))
+            despues += len(minificado.encode('utf-8'))
+
+        if antes:
+            logger.info('Estáticos minificados: %d KB -> %d KB', antes // 1024, despues // 1024)
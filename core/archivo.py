@@ -0,0 +1,75 @@
+"""
+Archivo de pre-registros resueltos.
+
+``pre_registro`` solo necesita los pendientes, los usuarios y los resueltos recientes.
+Los RECHAZADO más antiguos que ``PRE_REGISTRO_ARCHIVO_DIAS`` se mueven a
+``pre_registro_archivo`` (mismo id) con ``manage.py archivar_preregistros``, en lotes de
+un solo ``DELETE ... RETURNING`` + ``INSERT`` para no bloquear la tabla mucho tiempo.
+Solo se archiva el estado final: los ACTIVO e INACTIVO siguen recibiendo acciones
+(bloquear, reactivar) que buscan en ``pre_registro``.
+
+Las verificaciones de unicidad (ci, email, teléfono, username) consultan ambas tablas
+en una sola consulta, y las vistas de administración leen el archivo cuando se pide.
+"""
+from django.conf import settings
+from django.db import connection
+
+from .models import PreRegistroArchivo
+
+ESTADOS_ARCHIVABLES = ('RECHAZADO',)
+
+# Columnas que se pueden verificar con preregistro_existe
+COLUMNAS_UNICAS = ('ci', 'email', 'telefono', 'username')
+
+def _columnas_archivo():
+    return [campo.column for campo in PreRegistroArchivo._meta.concrete_fields if campo.name != 'fecha_archivo']
+
+def dias_archivo():
+    return getattr(settings, 'PRE_REGISTRO_ARCHIVO_DIAS', 180)
+
+def preregistro_existe(columna, valor):
+    """True si ``valor`` ya está en un pre-registro vigente o archivado"""
+    if columna not in COLUMNAS_UNICAS:
+        raise ValueError(f'Columna no verificable: {columna}')
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT EXISTS (SELECT 1 FROM pre_registro WHERE {columna} = %s)
+                OR EXISTS (SELECT 1 FROM pre_registro_archivo WHERE {columna} = %s)
+        """, [valor, valor])
+        return cursor.fetchone()[0]
+
+def archivar_lote(limite, tamano, estados=ESTADOS_ARCHIVABLES):
+    """
+    Mueve al archivo hasta ``tamano`` pre-registros en ``estados`` resueltos antes de
+    ``limite``. Devuelve (filas movidas, bytes de las filas movidas).
+    """
+    columnas = ', '.join(_columnas_archivo())
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH movidos AS (
+                DELETE FROM pre_registro
+                WHERE id IN (
+                    SELECT id FROM pre_registro
+                    WHERE estado = ANY(%(estados)s)
+                      AND COALESCE(fecha_aprobacion, fecha_registro) < %(limite)s
+                    ORDER BY id
+                    LIMIT %(tamano)s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *
+            ),
+            archivados AS (
+                INSERT INTO pre_registro_archivo ({columnas}, fecha_archivo)
+                SELECT {columnas}, now() FROM movidos
+                RETURNING id
+            )
+            SELECT (SELECT COUNT(*) FROM archivados), COALESCE(SUM(pg_column_size(movidos.*)), 0)
+            FROM movidos
+        """, {'estados': list(estados), 'limite': limite, 'tamano': tamano})
+        return cursor.fetchone()
+
+def tamano_tabla(tabla):
+    """Bytes de la tabla con sus índices y TOAST"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_total_relation_size(%s::regclass)", [tabla])
+        return cursor.fetchone()[0]
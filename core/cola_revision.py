@@ -0,0 +1,89 @@
+"""
+Cola de revisión de pre-registros para varios revisores a la vez.
+
+En modo cola cada revisor reclama los siguientes N pendientes: un solo UPDATE los
+reserva a su nombre hasta ``reserva_hasta``. La subconsulta usa
+``FOR UPDATE SKIP LOCKED``, así que dos revisores que reclaman al mismo tiempo reciben
+filas distintas sin esperarse. Una reserva vencida vuelve a estar disponible.
+
+Aprobar y rechazar bloquean la fila (``select_for_update``) y exigen la reserva: si
+otro revisor la tiene vigente la acción se rechaza; si la fila está libre basta su
+bloqueo hasta el final de la transacción. Con la fila bloqueada, un doble clic espera
+a la primera petición y después ya no encuentra el pre-registro pendiente.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from .models import PreRegistro
+
+SQL_RECLAMAR = """
+    UPDATE pre_registro
+    SET revisor_id = %(revisor)s, reserva_hasta = now() + make_interval(secs => %(segundos)s)
+    WHERE id IN (
+        SELECT id FROM pre_registro
+        WHERE estado = 'PENDIENTE' AND aprobado = false
+          AND (revisor_id IS NULL OR reserva_hasta IS NULL
+               OR reserva_hasta < now() OR revisor_id = %(revisor)s)
+        ORDER BY fecha_registro, id
+        LIMIT %(cantidad)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *
+"""
+
+class ReservaNoDisponible(Exception):
+    """El pre-registro está reservado por otro revisor"""
+
+def duracion_reserva():
+    return getattr(settings, 'COLA_REVISION_RESERVA', 300)
+
+def maximo_reclamo():
+    return getattr(settings, 'COLA_REVISION_MAXIMO', 20)
+
+def reclamar(usuario, cantidad):
+    """
+    Reserva a ``usuario`` hasta ``cantidad`` pendientes (incluye y renueva los que ya
+    tenía). Devuelve los pre-registros reservados en orden de llegada.
+    """
+    cantidad = max(1, min(int(cantidad), maximo_reclamo()))
+    reservados = PreRegistro.objects.raw(SQL_RECLAMAR, {
+        'revisor': usuario.pk,
+        'segundos': duracion_reserva(),
+        'cantidad': cantidad,
+    })
+    return sorted(reservados, key=lambda preregistro: (preregistro.fecha_registro, preregistro.id))
+
+def liberar(usuario, ids=None):
+    """Devuelve a la cola las reservas pendientes de ``usuario`` (todas o solo ``ids``)"""
+    reservas = PreRegistro.objects.filter(revisor=usuario, aprobado=False, reserva_hasta__isnull=False)
+    if ids is not None:
+        reservas = reservas.filter(id__in=ids)
+    return reservas.update(revisor=None, reserva_hasta=None)
+
+def exigir_reserva(preregistro, usuario):
+    """
+    Para una fila ya bloqueada con ``select_for_update``: falla si otro revisor tiene la
+    reserva vigente. Si está libre basta el bloqueo de la fila hasta el final de la
+    transacción (y ``usuario``, perezoso en la petición, ni se carga).
+    """
+    if preregistro.reserva_hasta is None or preregistro.reserva_hasta <= timezone.now():
+        return
+    if not (usuario.is_authenticated and preregistro.revisor_id == usuario.pk):
+        raise ReservaNoDisponible('El pre-registro está reservado por otro revisor')
+
+def cerrar_reserva(preregistro):
+    """Tras aprobar o rechazar: la fila sale de la cola (``revisor`` queda como historial)"""
+    preregistro.reserva_hasta = None
+
+def serializar(preregistro):
+    return {
+        'id': preregistro.id,
+        'ci': preregistro.ci,
+        'nombre_completo': ' '.join(
+            parte for parte in (preregistro.nombres, preregistro.paterno, preregistro.materno) if parte
+        ),
+        'email': preregistro.email,
+        'tipo_usuario': preregistro.get_id_tipo_usuario_display(),
+        'fecha_registro': timezone.localtime(preregistro.fecha_registro).strftime('%d/%m/%Y %H:%M'),
+        'reserva_hasta': preregistro.reserva_hasta.isoformat() if preregistro.reserva_hasta else None,
+    }
@@ -0,0 +1,103 @@
+"""
+Respuestas condicionales (ETag / Last-Modified) para las APIs JSON del superusuario.
+
+Cada vista declara una función de versión barata (contadores de ``version_datos``,
+la fecha, un intervalo de tiempo...). Si el cliente envía la misma versión en
+If-None-Match / If-Modified-Since se responde 304 sin ejecutar la vista.
+``django.views.decorators.http.condition`` no sirve aquí porque llama a sus funciones
+de forma síncrona también desde vistas asíncronas.
+"""
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.db import connections
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .consultas_async import consultar
+
+SQL_VERSION_TABLAS = """
+    SELECT COALESCE(SUM(version), 0), MAX(fecha_modificacion)
+    FROM sh_biblioteca.version_datos
+    WHERE tabla = ANY(%s)
+"""
+
+# Las vistas responden los errores con 200 y success=False: esas respuestas no se validan
+MARCA_ERROR = b'"success": false'
+
+class VersionNoDisponible(Exception):
+    """La función de versión no puede calcularla: la vista se ejecuta sin validadores"""
+
+def version_tablas(tablas, alias='default'):
+    """(versión, última modificación) de un conjunto de tablas"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(SQL_VERSION_TABLAS, [list(tablas)])
+        return cursor.fetchone()
+
+async def version_tablas_async(tablas, alias='default', paralelo=True):
+    filas = await consultar(SQL_VERSION_TABLAS, [list(tablas)], alias=alias, paralelo=paralelo)
+    return filas[0]
+
+def _etag(partes):
+    # Débil: el cuerpo puede variar (p. ej. 'timestamp') sin que cambien los datos
+    return 'W/"%s"' % hashlib.sha1(repr(partes).encode()).hexdigest()[:20]
+
+def _respuesta(request, version):
+    """Devuelve (respuesta 304 o None, etag, last_modified)"""
+    partes, modificado = version
+    etag = _etag(partes)
+    ultima = int(modificado.timestamp()) if modificado else None
+    return get_conditional_response(request, etag=etag, last_modified=ultima), etag, ultima
+
+def _validadores(request, response, etag, ultima):
+    if request.method not in ('GET', 'HEAD'):
+        return response
+    # Solo se validan las respuestas correctas (y los 304): un 400/404 no se reutiliza
+    if response.status_code != 304 and (response.status_code != 200 or MARCA_ERROR in response.content):
+        return response
+    response['ETag'] = etag
+    if ultima:
+        response['Last-Modified'] = http_date(ultima)
+    # El navegador debe revalidar siempre en lugar de reutilizar la respuesta
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def respuesta_condicional(calcular_version):
+    """
+    Decorador para vistas GET de solo lectura. ``calcular_version(request)`` devuelve
+    ``(partes, ultima_modificacion)``: ``partes`` es cualquier valor con repr estable y
+    ``ultima_modificacion`` un datetime o None. En vistas asíncronas puede ser una corrutina.
+    Si la versión no se puede calcular (``VersionNoDisponible``) la vista se ejecuta sin
+    validadores; cualquier otro error, p. ej. de la BD, se propaga.
+    """
+    def decorador(vista):
+        if iscoroutinefunction(vista):
+            @functools.wraps(vista)
+            async def envoltura_async(request, *args, **kwargs):
+                try:
+                    version = calcular_version(request)
+                    if iscoroutinefunction(calcular_version):
+                        version = await version
+                    no_modificado, etag, ultima = _respuesta(request, version)
+                except VersionNoDisponible:
+                    return await vista(request, *args, **kwargs)
+                if no_modificado is not None:
+                    return _validadores(request, no_modificado, etag, ultima)
+                response = await vista(request, *args, **kwargs)
+                return _validadores(request, response, etag, ultima)
+            return envoltura_async
+
+        @functools.wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            try:
+                no_modificado, etag, ultima = _respuesta(request, calcular_version(request))
+            except VersionNoDisponible:
+                return vista(request, *args, **kwargs)
+            if no_modificado is not None:
+                return _validadores(request, no_modificado, etag, ultima)
+            response = vista(request, *args, **kwargs)
+            return _validadores(request, response, etag, ultima)
+        return envoltura
+
+    return decorador
@@ -0,0 +1,226 @@
+"""
+Configuración persistente del sistema con copia en memoria por proceso
+"""
+import contextlib
+import math
+import re
+import threading
+import time
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import F
+
+# ========================================
+# CLAVES TIPADAS Y VALORES POR DEFECTO
+# ========================================
+
+CONFIGURACION_SISTEMA_POR_DEFECTO = {
+    'nombre_sistema': 'Biblioteca Universitaria',
+    'email_admin': 'admin@biblioteca.edu.bo',
+    'timezone': 'America/La_Paz',
+    'idioma': 'es',
+    'mantenimiento': False,
+    'registro_publico': True,
+    'notificaciones_email': True,
+    'backup_automatico': True,
+    'logs_detallados': True,
+    # Préstamos
+    'dias_prestamo_estudiante': 7,
+    'dias_prestamo_docente': 15,
+    'max_libros_usuario': 3,
+    # Multas
+    'multas_activas': True,
+    'multa_por_dia': 2.0,
+}
+
+POLITICA_PASSWORD_POR_DEFECTO = {
+    'min_length': 8,
+    'max_length': 128,
+    'require_uppercase': True,
+    'require_lowercase': True,
+    'require_numbers': True,
+    'require_special': False,
+    'password_expiry': 90,
+    'max_attempts': 5,
+    'lockout_duration': 30,
+    'history_count': 5,
+    'force_change_first_login': True,
+}
+
+CONFIGURACION_POR_DEFECTO = {**CONFIGURACION_SISTEMA_POR_DEFECTO, **POLITICA_PASSWORD_POR_DEFECTO}
+
+# ========================================
+# CACHÉ EN MEMORIA DEL PROCESO
+# ========================================
+
+_cache = {
+    'version': None,
+    'valores': MappingProxyType(dict(CONFIGURACION_POR_DEFECTO)),
+    'verificado_en': 0.0,
+}
+_lock = threading.Lock()
+
+def _intervalo_verificacion():
+    return getattr(settings, 'CONFIGURACION_INTERVALO_VERIFICACION', 5)
+
+class ValorConfiguracionInvalido(ValueError):
+    """Valor que no se puede convertir al tipo de su clave"""
+
+    def __init__(self, clave, valor):
+        self.clave = clave
+        super().__init__(f"Valor no válido para '{clave}': {valor!r}")
+
+def _convertir(clave, valor):
+    """Convierte un valor recibido al tipo de su valor por defecto"""
+    defecto = CONFIGURACION_POR_DEFECTO[clave]
+    if isinstance(defecto, bool):
+        if isinstance(valor, str):
+            return valor.strip().lower() in ('1', 'true', 'on', 'si', 'sí')
+        return bool(valor)
+    # Un campo numérico vacío llega como null (NaN en JSON.stringify)
+    if valor is None:
+        raise ValorConfiguracionInvalido(clave, valor)
+    try:
+        if isinstance(defecto, int):
+            return int(valor)
+        if isinstance(defecto, float):
+            convertido = float(valor)
+            if not math.isfinite(convertido):
+                raise ValueError
+            return convertido
+    except (TypeError, ValueError):
+        raise ValorConfiguracionInvalido(clave, valor)
+    return str(valor).strip()
+
+def _sincronizar(ahora):
+    """Consulta la versión y recarga los valores solo si cambió"""
+    from .models import ConfiguracionSistema, VersionConfiguracion
+
+    alias = router.db_for_read(VersionConfiguracion)
+    # Dentro de una transacción el error no debe dejarla abortada: se aísla en un savepoint
+    bloque = transaction.atomic(using=alias) if connections[alias].in_atomic_block else contextlib.nullcontext()
+    try:
+        with bloque:
+            version = (
+                VersionConfiguracion.objects.using(alias).filter(pk=1)
+                .values_list('version', flat=True)
+                .first()
+            ) or 0
+
+            if version != _cache['version']:
+                valores = dict(CONFIGURACION_POR_DEFECTO)
+                for clave, valor in ConfiguracionSistema.objects.using(alias).values_list('clave', 'valor'):
+                    if clave in valores:
+                        try:
+                            valores[clave] = _convertir(clave, valor)
+                        except ValorConfiguracionInvalido:
+                            # Un valor guardado corrupto no debe tumbar cada petición
+                            pass
+                _cache['valores'] = MappingProxyType(valores)
+                _cache['version'] = version
+    except DatabaseError:
+        # Si la tabla aún no existe se mantienen los últimos valores conocidos
+        pass
+
+    _cache['verificado_en'] = ahora
+
+def obtener_configuracion():
+    """
+    Devuelve la configuración vigente (solo lectura).
+    Consulta la versión en BD como máximo una vez por intervalo.
+    """
+    ahora = time.monotonic()
+    if ahora - _cache['verificado_en'] >= _intervalo_verificacion():
+        # Si otro hilo ya está sincronizando se usan los valores actuales
+        if _lock.acquire(blocking=False):
+            try:
+                _sincronizar(ahora)
+            finally:
+                _lock.release()
+    return _cache['valores']
+
+async def obtener_configuracion_async():
+    """
+    ``obtener_configuracion`` para código asíncrono: solo pasa a un hilo cuando toca
+    consultar la versión en BD.
+    """
+    if time.monotonic() - _cache['verificado_en'] >= _intervalo_verificacion():
+        return await sync_to_async(obtener_configuracion)()
+    return _cache['valores']
+
+def version_configuracion():
+    """Versión de la configuración vigente en este proceso (0 si nunca se guardó)"""
+    obtener_configuracion()
+    return _cache['version'] or 0
+
+def obtener_valor(clave):
+    """Devuelve un valor de configuración por su clave"""
+    return obtener_configuracion()[clave]
+
+def obtener_politica_password():
+    """Devuelve solo las claves de la política de contraseñas"""
+    configuracion = obtener_configuracion()
+    return {clave: configuracion[clave] for clave in POLITICA_PASSWORD_POR_DEFECTO}
+
+def invalidar_cache():
+    """Fuerza la verificación de versión en la próxima lectura"""
+    _cache['verificado_en'] = 0.0
+
+def guardar_configuracion(datos, claves):
+    """
+    Guarda las claves indicadas e incrementa la versión en una sola transacción.
+    Las claves ausentes en ``datos`` conservan su valor actual.
+    Devuelve los valores guardados ya convertidos a su tipo; ``ValorConfiguracionInvalido``
+    si alguno no se puede convertir (no se guarda nada).
+    """
+    from .models import ConfiguracionSistema, VersionConfiguracion
+
+    actual = obtener_configuracion()
+    valores = {
+        clave: _convertir(clave, datos.get(clave, actual[clave]))
+        for clave in claves
+    }
+
+    with transaction.atomic():
+        ConfiguracionSistema.objects.bulk_create(
+            [ConfiguracionSistema(clave=clave, valor=valor) for clave, valor in valores.items()],
+            update_conflicts=True,
+            unique_fields=['clave'],
+            update_fields=['valor', 'fecha_modificacion'],
+        )
+        actualizadas = VersionConfiguracion.objects.filter(pk=1).update(version=F('version') + 1)
+        if not actualizadas:
+            VersionConfiguracion.objects.create(pk=1, version=1)
+
+    # El proceso que escribe ve el cambio de inmediato
+    with _lock:
+        _sincronizar(time.monotonic())
+
+    return valores
+
+# ========================================
+# VALIDACIÓN SEGÚN POLÍTICA DE CONTRASEÑAS
+# ========================================
+
+def errores_politica_password(password):
+    """Devuelve la lista de requisitos de la política que no cumple la contraseña"""
+    politica = obtener_politica_password()
+    errores = []
+
+    if len(password) < politica['min_length']:
+        errores.append(f"La contraseña debe tener al menos {politica['min_length']} caracteres.")
+    if len(password) > politica['max_length']:
+        errores.append(f"La contraseña no puede tener más de {politica['max_length']} caracteres.")
+    if politica['require_uppercase'] and not re.search(r'[A-Z]', password):
+        errores.append('La contraseña debe contener al menos una mayúscula.')
+    if politica['require_lowercase'] and not re.search(r'[a-z]', password):
+        errores.append('La contraseña debe contener al menos una minúscula.')
+    if politica['require_numbers'] and not re.search(r'[0-9]', password):
+        errores.append('La contraseña debe contener al menos un número.')
+    if politica['require_special'] and not re.search(r'[^A-Za-z0-9]', password):
+        errores.append('La contraseña debe contener al menos un carácter especial.')
+
+    return errores
@@ -0,0 +1,143 @@
+"""
+Consultas concurrentes con psycopg 3 asíncrono para los endpoints del dashboard.
+
+Bajo ASGI (uvicorn) cada consulta toma su propia conexión de un pool asíncrono por
+event loop, de modo que ``asyncio.gather`` las ejecuta en paralelo en el servidor y la
+latencia total se acerca a la de la consulta más lenta (``paralelo=True``). Bajo WSGI
+cada petición corre en un event loop nuevo donde ese pool no sobrevive: las consultas
+se ejecutan una tras otra en la conexión de Django del hilo, que ya sale de su pool
+(``paralelo=False``), en lugar de abrir una conexión nueva por consulta.
+"""
+import asyncio
+import contextlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+# Opciones de conexión de DATABASES que entiende libpq
+OPCIONES_LIBPQ = ('options', 'sslmode', 'sslrootcert', 'connect_timeout', 'application_name')
+
+_pools = {}
+
+def _parametros(alias):
+    configuracion = settings.DATABASES[alias]
+    opciones = configuracion.get('OPTIONS', {})
+    return {
+        'dbname': configuracion['NAME'],
+        'user': configuracion['USER'],
+        'password': configuracion['PASSWORD'],
+        'host': configuracion['HOST'] or None,
+        'port': configuracion['PORT'] or None,
+        'client_encoding': 'UTF8',
+        **{clave: valor for clave, valor in opciones.items() if clave in OPCIONES_LIBPQ},
+    }
+
+async def _crear_pool(alias):
+    from psycopg_pool import AsyncConnectionPool
+
+    pool = AsyncConnectionPool(
+        kwargs={**_parametros(alias), 'autocommit': True},
+        open=False,
+        check=AsyncConnectionPool.check_connection,
+        **getattr(settings, 'ASYNC_DATABASE_POOL', {}),
+    )
+    await pool.open()
+    return pool
+
+async def _pool(alias):
+    clave = (alias, id(asyncio.get_running_loop()))
+    if clave not in _pools:
+        # Se guarda la tarea (no el pool) para que las corrutinas concurrentes esperen la misma
+        _pools[clave] = asyncio.ensure_future(_crear_pool(alias))
+    return await _pools[clave]
+
+def _consultar_django(sql, params, alias):
+    conexion = connections[alias]
+    # Dentro de una transacción, un error no debe abortar las consultas siguientes
+    bloque = transaction.atomic(using=alias) if conexion.in_atomic_block else contextlib.nullcontext()
+    with bloque, conexion.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+def _consultar_secuencial(consultas, alias):
+    resultados = {}
+    for nombre, consulta in consultas.items():
+        sql, params = consulta if isinstance(consulta, tuple) else (consulta, None)
+        try:
+            resultados[nombre] = _consultar_django(sql, params, alias)
+        except Exception as e:
+            resultados[nombre] = e
+    return resultados
+
+async def consultar(sql, params=None, alias='default', paralelo=True):
+    """Ejecuta una consulta (en su propia conexión del pool asíncrono si ``paralelo``) y devuelve todas las filas"""
+    if not paralelo:
+        return await sync_to_async(_consultar_django)(sql, params, alias)
+    async with (await _pool(alias)).connection() as conexion:
+        cursor = await conexion.execute(sql, params)
+        return await cursor.fetchall()
+
+async def consultar_concurrentes(consultas, alias='default', paralelo=True):
+    """
+    Ejecuta un dict {nombre: sql} o {nombre: (sql, params)}: en paralelo, o sin
+    ``paralelo`` una tras otra en la conexión de Django (un solo cambio de hilo).
+    Devuelve {nombre: filas}; una consulta que falla devuelve su excepción
+    en lugar de las filas sin cancelar a las demás.
+    """
+    if not paralelo:
+        return await sync_to_async(_consultar_secuencial)(consultas, alias)
+    
+    tareas = []
+    for consulta in consultas.values():
+        sql, params = consulta if isinstance(consulta, tuple) else (consulta, None)
+        tareas.append(consultar(sql, params, alias=alias))
+    resultados = await asyncio.gather(*tareas, return_exceptions=True)
+    return dict(zip(consultas, resultados))
+
+def escalar(resultado, defecto=0):
+    """Primer valor de la primera fila, o ``defecto`` si la consulta falló"""
+    if isinstance(resultado, Exception) or not resultado:
+        return defecto
+    return resultado[0][0] if resultado[0][0] is not None else defecto
+
+# ========================================
+# CONSULTAS DEL DASHBOARD
+# ========================================
+
+# Tablas de las que dependen los contadores del dashboard (su versión en version_datos)
+TABLAS_ESTADISTICAS = ('usuario', 'empleado', 'libro', 'prestamo', 'pre_registro')
+
+async def estadisticas_dashboard(alias='default', paralelo=True):
+    """Contadores del dashboard del superusuario (en paralelo bajo ASGI)"""
+    # Las tablas libro/prestamo pueden no existir: su consulta falla sola y cuenta como 0
+    resultados = await consultar_concurrentes({
+        'total_usuarios': "SELECT COUNT(*) FROM sh_biblioteca.usuario",
+        'total_empleados': "SELECT COUNT(*) FROM sh_biblioteca.empleado",
+        'total_libros': "SELECT COUNT(*) FROM sh_biblioteca.libro",
+        'prestamos_activos': "SELECT COUNT(*) FROM sh_biblioteca.prestamo WHERE estado = 'ACTIVO'",
+        'vencidos': "SELECT COUNT(*) FROM sh_biblioteca.prestamo WHERE estado = 'VENCIDO' OR fecha_devolucion < CURRENT_DATE",
+        'usuarios_por_tipo': """
+            SELECT tu.tipo_usuario, COUNT(*)
+            FROM sh_biblioteca.usuario u
+            JOIN sh_biblioteca.tipo_usuario tu ON u.id_tipo_usuario = tu.id_tipo_usuario
+            GROUP BY tu.tipo_usuario
+        """,
+        'preregistros_pendientes': "SELECT COUNT(*) FROM pre_registro WHERE estado = 'PENDIENTE'",
+    }, alias=alias, paralelo=paralelo)
+
+    for clave in ('total_usuarios', 'total_empleados', 'usuarios_por_tipo', 'preregistros_pendientes'):
+        if isinstance(resultados[clave], Exception):
+            raise resultados[clave]
+
+    return {
+        'total_usuarios': escalar(resultados['total_usuarios']),
+        'total_empleados': escalar(resultados['total_empleados']),
+        'total_libros': escalar(resultados['total_libros']),
+        'prestamos_activos': escalar(resultados['prestamos_activos']),
+        'vencidos': escalar(resultados['vencidos']),
+        'usuarios_por_tipo': dict(resultados['usuarios_por_tipo']),
+        'preregistros_pendientes': escalar(resultados['preregistros_pendientes']),
+        'timestamp': timezone.now().isoformat(),
+    }
@@ -0,0 +1,161 @@
+"""
+Registro de consultas lentas (ver ConsultasLentasMiddleware).
+
+Cada sentencia que tarda más de ``CONSULTAS_LENTAS_UMBRAL_MS`` se guarda en memoria del
+proceso (las últimas ``CONSULTAS_LENTAS_MAXIMO``) con los parámetros reducidos a su
+tipo y la vista que la ejecutó. Una fracción ``CONSULTAS_LENTAS_MUESTREO_PLAN`` se
+explica con ``EXPLAIN (ANALYZE, BUFFERS)`` en un hilo aparte, fuera de la petición y
+dentro de una transacción que se revierte; las sentencias que modifican datos solo se
+explican sin ANALYZE.
+"""
+import collections
+import queue
+import random
+import re
+import statistics
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+# Sentencias pendientes de EXPLAIN; si el hilo no da abasto se descartan
+MAXIMO_PLANES_PENDIENTES = 20
+
+# Solo estas sentencias admiten EXPLAIN
+PREFIJOS_EXPLICABLES = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+# Con alguna de estas palabras EXPLAIN ANALYZE ejecutaría una escritura o tomaría bloqueos
+ESCRITURA = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b', re.IGNORECASE)
+
+_NORMALIZACIONES = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+_registros = collections.deque(maxlen=getattr(settings, 'CONSULTAS_LENTAS_MAXIMO', 500))
+_lock = threading.Lock()
+_planes = queue.Queue(maxsize=MAXIMO_PLANES_PENDIENTES)
+_hilo = None
+
+def umbral_ms():
+    return getattr(settings, 'CONSULTAS_LENTAS_UMBRAL_MS', 200)
+
+def muestreo_plan():
+    return getattr(settings, 'CONSULTAS_LENTAS_MUESTREO_PLAN', 0.1)
+
+def normalizar(sql):
+    """La sentencia sin valores: las que solo difieren en los parámetros se agrupan"""
+    for patron, reemplazo in _NORMALIZACIONES:
+        sql = patron.sub(reemplazo, sql)
+    return sql.strip()
+
+def _redactar(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, dict):
+        return {clave: _redactar(item) for clave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_redactar(item) for item in valor]
+    return f'<{type(valor).__name__}>'
+
+def registrar(alias, sql, params, many, duracion_ms, vista):
+    registro = {
+        'fecha': timezone.now().isoformat(),
+        'alias': alias,
+        'vista': vista,
+        # Sin el texto original: podría llevar valores literales
+        'normalizada': normalizar(sql),
+        # executemany: solo el primer juego de parámetros
+        'parametros': _redactar(params[0] if many and params else params),
+        'duracion_ms': round(duracion_ms, 2),
+        'plan': None,
+    }
+    with _lock:
+        _registros.append(registro)
+
+    tasa = muestreo_plan()
+    if not many and tasa and random.random() < tasa and sql.lstrip().upper().startswith(PREFIJOS_EXPLICABLES):
+        _encolar_plan(registro, alias, sql, params)
+
+# ==========================================
+# PLANES (HILO EN SEGUNDO PLANO)
+# ==========================================
+
+def _encolar_plan(registro, alias, sql, params):
+    global _hilo
+    with _lock:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_explicar_pendientes, name='consultas-lentas-explain', daemon=True)
+            _hilo.start()
+    try:
+        # Los parámetros reales solo viajan a la cola, nunca al registro
+        _planes.put_nowait((registro, alias, sql, params))
+    except queue.Full:
+        pass
+
+def _explicar_pendientes():
+    while True:
+        registro, alias, sql, params = _planes.get()
+        try:
+            registro['plan'] = explicar(alias, sql, params)
+        except Exception as e:
+            registro['plan'] = f'No se pudo obtener el plan: {e}'
+        finally:
+            # Devuelve la conexión del hilo al pool
+            connections[alias].close()
+
+def explicar(alias, sql, params):
+    """Plan de la sentencia; ANALYZE solo si es de lectura, y siempre revertido"""
+    explain = 'EXPLAIN' if ESCRITURA.search(sql) else 'EXPLAIN (ANALYZE, BUFFERS)'
+    limite = getattr(settings, 'CONSULTAS_LENTAS_PLAN_TIMEOUT_MS', 5000)
+    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+        cursor.execute(f'SET LOCAL statement_timeout = {int(limite)}')
+        cursor.execute(f'{explain} {sql}', params)
+        plan = '\n'.join(fila[0] for fila in cursor.fetchall())
+        transaction.set_rollback(True, using=alias)
+    return plan
+
+# ==========================================
+# RESUMEN
+# ==========================================
+
+def _percentil(valores, percentil):
+    if len(valores) < 2:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[percentil - 1]
+
+def resumen():
+    """Registros agrupados por sentencia normalizada, de mayor a menor tiempo total"""
+    with _lock:
+        registros = list(_registros)
+
+    grupos = {}
+    for registro in registros:
+        grupos.setdefault(registro['normalizada'], []).append(registro)
+
+    resultado = []
+    for normalizada, grupo in grupos.items():
+        tiempos = [registro['duracion_ms'] for registro in grupo]
+        con_plan = [registro for registro in grupo if registro['plan']]
+        ultimo = grupo[-1]
+        resultado.append({
+            'sentencia': normalizada,
+            'cantidad': len(grupo),
+            'total_ms': round(sum(tiempos), 2),
+            'p50_ms': round(_percentil(tiempos, 50), 2),
+            'p95_ms': round(_percentil(tiempos, 95), 2),
+            'p99_ms': round(_percentil(tiempos, 99), 2),
+            'max_ms': max(tiempos),
+            'vistas': dict(collections.Counter(registro['vista'] for registro in grupo).most_common()),
+            'ultima_vez': ultimo['fecha'],
+            'ejemplo_parametros': ultimo['parametros'],
+            'plan': con_plan[-1]['plan'] if con_plan else None,
+        })
+    return sorted(resultado, key=lambda grupo: grupo['total_ms'], reverse=True)
+
+def limpiar():
+    with _lock:
+        _registros.clear()
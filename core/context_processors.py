@@ -0,0 +1,60 @@
+"""
+Variables de contexto para las claves de los fragmentos cacheados ({% cache %}).
+
+Las versiones se calculan solo si la plantilla las usa y se consultan en BD como
+máximo una vez por CONFIGURACION_INTERVALO_VERIFICACION segundos por proceso.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .condicional import version_tablas
+from .configuracion import version_configuracion
+
+# Catálogos cuyos cambios incrementan version_datos (migración 0007)
+TABLAS_CATALOGO = (
+    'sexo', 'tipo_usuario', 'grado_academico', 'modalidad_ingreso',
+    'estado_usuario', 'turno', 'cargo', 'categoria',
+)
+
+_catalogos = {
+    'version': 0,
+    'verificado_en': float('-inf'),
+}
+_lock = threading.Lock()
+
+def version_catalogos():
+    """Versión conjunta de los catálogos (0 si nunca cambiaron)"""
+    ahora = time.monotonic()
+    intervalo = getattr(settings, 'CONFIGURACION_INTERVALO_VERIFICACION', 5)
+    if ahora - _catalogos['verificado_en'] >= intervalo and _lock.acquire(blocking=False):
+        try:
+            try:
+                _catalogos['version'] = version_tablas(TABLAS_CATALOGO)[0]
+            except Exception:
+                # Sin la tabla version_datos se mantiene la última versión conocida
+                pass
+            _catalogos['verificado_en'] = ahora
+        finally:
+            _lock.release()
+    return _catalogos['version']
+
+def rol_usuario(user):
+    """Rol que determina los enlaces visibles en la navegación"""
+    if not user.is_authenticated:
+        return 'anonimo'
+    if user.is_superuser:
+        return 'superusuario'
+    if user.is_staff:
+        return 'staff'
+    return 'usuario'
+
+def fragmentos(request):
+    user = getattr(request, 'user', None)
+    return {
+        'rol_usuario': SimpleLazyObject(lambda: rol_usuario(user)) if user is not None else 'anonimo',
+        'version_configuracion': SimpleLazyObject(version_configuracion),
+        'version_catalogos': SimpleLazyObject(version_catalogos),
+    }
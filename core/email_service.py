@@ -1,7 +1,7 @@
 """
 Servicio para envío de emails del sistema de biblioteca
 """
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 
@@ -55,13 +55,9 @@ Equipo de la Biblioteca
         print(f"Error enviando email: {e}")
         return False
 
-def enviar_email_rechazo(preregistro, motivo):
-    """
-    Enviar email cuando se rechaza un pre-registro
-    """
-    try:
-        mensaje_texto = f"""
-Hola {preregistro.nombres},
+def _mensaje_rechazo(nombres, motivo):
+    return f"""
+Hola {nombres},
 
 Lamentamos informarte que tu pre-registro no ha sido aprobado.
 
@@ -72,10 +68,17 @@ Si tienes dudas, puedes contactarnos o intentar registrarte nuevamente.
 Saludos,
 Equipo de la Biblioteca
         """
-        
+
+ASUNTO_RECHAZO = '❌ Pre-registro No Aprobado - Biblioteca Universitaria'
+
+def enviar_email_rechazo(preregistro, motivo):
+    """
+    Enviar email cuando se rechaza un pre-registro
+    """
+    try:
         send_mail(
-            subject='❌ Pre-registro No Aprobado - Biblioteca Universitaria',
-            message=mensaje_texto,
+            subject=ASUNTO_RECHAZO,
+            message=_mensaje_rechazo(preregistro.nombres, motivo),
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[preregistro.email],
             fail_silently=False,
@@ -85,4 +88,82 @@ Equipo de la Biblioteca
         
     except Exception as e:
         print(f"Error enviando email de rechazo: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def enviar_emails_rechazo(destinatarios, motivo):
+    """
+    Enviar el email de rechazo a varios pre-registros (nombres, email) por una sola
+    conexión SMTP. Devuelve el número de correos enviados.
+    """
+    mensajes = [
+        EmailMessage(
+            subject=ASUNTO_RECHAZO,
+            body=_mensaje_rechazo(nombres, motivo),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+        )
+        for nombres, email in destinatarios if email
+    ]
+    if not mensajes:
+        return 0
+    
+    try:
+        return get_connection(fail_silently=False).send_messages(mensajes) or 0
+        
+    except Exception as e:
+        print(f"Error enviando emails de rechazo: {e}")
+        return 0
+
+def enviar_emails_solicitudes(solicitudes):
+    """
+    Avisar el resultado de las solicitudes del pre-registro diferido, todas por una
+    sola conexión SMTP. Devuelve el número de correos enviados.
+    """
+    mensajes = []
+    for solicitud in solicitudes:
+        datos = solicitud.datos
+        if not datos.get('email'):
+            continue
+        
+        if solicitud.estado == 'PROCESADA':
+            asunto = '📨 Pre-registro Recibido - Biblioteca Universitaria'
+            mensaje_texto = f"""
+Hola {datos.get('nombres')},
+
+Recibimos tu pre-registro y está pendiente de revisión.
+Te avisaremos por este medio cuando sea aprobado (máximo 24 horas hábiles).
+
+Saludos,
+Equipo de la Biblioteca
+        """
+        else:
+            asunto = '❌ Pre-registro No Registrado - Biblioteca Universitaria'
+            mensaje_texto = f"""
+Hola {datos.get('nombres')},
+
+No pudimos registrar tu pre-registro.
+
+Motivo: {solicitud.motivo}
+
+Si tienes dudas, puedes contactarnos o intentar registrarte nuevamente.
+
+Saludos,
+Equipo de la Biblioteca
+        """
+        
+        mensajes.append(EmailMessage(
+            subject=asunto,
+            body=mensaje_texto,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[datos['email']],
+        ))
+    
+    if not mensajes:
+        return 0
+    
+    try:
+        return get_connection(fail_silently=False).send_messages(mensajes) or 0
+        
+    except Exception as e:
+        print(f"Error enviando emails de solicitudes: {e}")
+        return 0
@@ -0,0 +1,143 @@
+"""
+Entrada diferida de pre-registros para los picos de inscripción.
+
+Con ``PRE_REGISTRO_DIFERIDO`` la vista pública valida solo el formato
+(``RecepcionPreRegistroForm``, sin consultas) y guarda los datos en
+``pre_registro_entrada`` con un único INSERT. El procesador
+(``manage.py procesar_preregistros``) toma lotes con ``FOR UPDATE SKIP LOCKED`` (admite
+varios procesos), verifica la unicidad de todo el lote en una sola consulta, descarta
+los duplicados contra las tablas y dentro del propio lote, inserta los válidos con un
+``bulk_create`` y avisa a cada solicitante por correo. La contraseña se borra de la
+solicitud al procesarla: solo queda en el pre-registro creado.
+"""
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .email_service import enviar_emails_solicitudes
+from .forms import PreRegistroForm
+from .models import PreRegistro, SolicitudPreRegistro
+
+logger = logging.getLogger(__name__)
+
+# columna -> (tablas donde debe ser única, mensaje para el solicitante)
+COLUMNAS_UNICAS = {
+    'ci': (('pre_registro', 'pre_registro_archivo', 'sh_biblioteca.persona'), 'La cédula de identidad ya está registrada.'),
+    'email': (('pre_registro', 'pre_registro_archivo', 'sh_biblioteca.persona'), 'El correo electrónico ya está registrado.'),
+    'telefono': (('pre_registro', 'pre_registro_archivo', 'sh_biblioteca.persona'), 'El número de teléfono ya está registrado.'),
+    'username': (('pre_registro', 'pre_registro_archivo'), 'El nombre de usuario ya está en uso.'),
+}
+
+def diferido_activo():
+    return getattr(settings, 'PRE_REGISTRO_DIFERIDO', False)
+
+def tamano_lote():
+    return getattr(settings, 'PRE_REGISTRO_LOTE', 500)
+
+def recibir(datos):
+    """Guarda una solicitud ya validada en formato (cleaned_data de RecepcionPreRegistroForm)"""
+    return SolicitudPreRegistro.objects.create(datos=datos)
+
+# ==========================================
+# PROCESADOR
+# ==========================================
+
+def _existentes(solicitudes):
+    """{columna: valores del lote que ya existen} con una sola consulta"""
+    partes, params = [], []
+    for columna, (tablas, _) in COLUMNAS_UNICAS.items():
+        valores = list({s.datos[columna] for s in solicitudes if s.datos.get(columna)})
+        if not valores:
+            continue
+        for tabla in tablas:
+            partes.append(f"SELECT '{columna}', {columna} FROM {tabla} WHERE {columna} = ANY(%s)")
+            params.append(valores)
+
+    existentes = {columna: set() for columna in COLUMNAS_UNICAS}
+    if partes:
+        with connection.cursor() as cursor:
+            cursor.execute(' UNION ALL '.join(partes), params)
+            for columna, valor in cursor.fetchall():
+                existentes[columna].add(valor)
+    return existentes
+
+def _motivo_descarte(datos, existentes, vistos):
+    """Primer conflicto de unicidad de la solicitud, o None si es válida"""
+    for columna, (_, mensaje) in COLUMNAS_UNICAS.items():
+        valor = datos.get(columna)
+        if not valor:
+            continue
+        if valor in existentes[columna]:
+            return mensaje
+        if valor in vistos[columna]:
+            return f'{mensaje} (solicitud duplicada)'
+    return None
+
+def _preregistro(datos):
+    return PreRegistro(**{campo: datos.get(campo) for campo in PreRegistroForm.Meta.fields})
+
+def _insertar(validas):
+    """bulk_create del lote; si choca con una inserción concurrente, fila por fila"""
+    preregistros = [_preregistro(solicitud.datos) for solicitud in validas]
+    try:
+        with transaction.atomic():
+            PreRegistro.objects.bulk_create(preregistros)
+    except IntegrityError:
+        for solicitud, preregistro in zip(validas, preregistros):
+            preregistro.pk = None
+            try:
+                with transaction.atomic():
+                    preregistro.save()
+            except IntegrityError:
+                solicitud.estado = 'DESCARTADA'
+                solicitud.motivo = 'Los datos ya están registrados.'
+                preregistro.pk = None
+    return preregistros
+
+def procesar_lote(tamano=None):
+    """
+    Procesa hasta ``tamano`` solicitudes recibidas. Devuelve (procesadas, descartadas).
+    """
+    with transaction.atomic():
+        solicitudes = list(
+            SolicitudPreRegistro.objects.select_for_update(skip_locked=True)
+            .filter(estado='RECIBIDA').order_by('id')[:tamano or tamano_lote()]
+        )
+        if not solicitudes:
+            return 0, 0
+
+        existentes = _existentes(solicitudes)
+        vistos = {columna: set() for columna in COLUMNAS_UNICAS}
+        validas = []
+        for solicitud in solicitudes:
+            motivo = _motivo_descarte(solicitud.datos, existentes, vistos)
+            if motivo:
+                solicitud.estado, solicitud.motivo = 'DESCARTADA', motivo
+                continue
+            for columna in COLUMNAS_UNICAS:
+                if solicitud.datos.get(columna):
+                    vistos[columna].add(solicitud.datos[columna])
+            solicitud.estado = 'PROCESADA'
+            validas.append(solicitud)
+
+        for solicitud, preregistro in zip(validas, _insertar(validas)):
+            if preregistro.pk:
+                solicitud.preregistro = preregistro
+
+        ahora = timezone.now()
+        for solicitud in solicitudes:
+            solicitud.fecha_proceso = ahora
+            solicitud.datos.pop('password', None)
+        SolicitudPreRegistro.objects.bulk_update(
+            solicitudes, ['estado', 'preregistro', 'motivo', 'fecha_proceso', 'datos']
+        )
+
+    # Los correos salen después del COMMIT, por una sola conexión SMTP
+    enviados = enviar_emails_solicitudes(solicitudes)
+    if enviados < sum(1 for solicitud in solicitudes if solicitud.datos.get('email')):
+        logger.warning('Solo se enviaron %d avisos de %d solicitudes', enviados, len(solicitudes))
+
+    procesadas = sum(1 for solicitud in solicitudes if solicitud.estado == 'PROCESADA')
+    return procesadas, len(solicitudes) - procesadas
@@ -0,0 +1,134 @@
+"""
+Difusión de las estadísticas del dashboard por Server-Sent Events (solo bajo ASGI).
+
+Un único productor por event loop consulta cada SSE_INTERVALO_MINIMO segundos la
+versión de las tablas del dashboard (version_datos, una lectura por índice) y calcula
+la instantánea cuando cambia, o cada SSE_INTERVALO segundos como mínimo (los vencidos
+cambian con la fecha). La reparte a todos los clientes conectados enviando solo los
+campos que cambiaron. El costo es un cálculo por cambio sin importar cuántos
+administradores estén conectados, y los escritores no pagan nada extra (sin NOTIFY).
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .condicional import version_tablas_async
+from .consultas_async import TABLAS_ESTADISTICAS, estadisticas_dashboard
+from .replicas import alias_lectura, lectura_en_replica
+
+# Campo que cambia en cada cálculo y no cuenta como cambio de datos
+CAMPO_MARCA_TIEMPO = 'timestamp'
+
+_difusores = {}
+
+def _formatear(evento, datos):
+    return f'event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n'
+
+class DifusorEstadisticas:
+    """Productor de instantáneas compartido por los clientes SSE de un event loop"""
+
+    def __init__(self):
+        self.suscriptores = set()
+        self.ultimo = None
+        self.calculos = 0
+        self._tarea = None
+
+    def suscribir(self):
+        # Cola corta: un cliente lento pierde cambios intermedios y recibe la instantánea completa
+        cola = asyncio.Queue(maxsize=5)
+        self.suscriptores.add(cola)
+        if self.ultimo is not None:
+            cola.put_nowait(('snapshot', self.ultimo))
+        if self._tarea is None:
+            self._tarea = asyncio.ensure_future(self._producir())
+        return cola
+
+    def desuscribir(self, cola):
+        self.suscriptores.discard(cola)
+        if not self.suscriptores:
+            # Sin clientes no se calcula nada
+            if self._tarea is not None:
+                self._tarea.cancel()
+            self._tarea = None
+            self.ultimo = None
+
+    def _publicar(self, evento, datos):
+        for cola in self.suscriptores:
+            mensaje = (evento, datos)
+            if cola.full():
+                # Solo este cliente se pone al día con la instantánea; los demás reciben el evento
+                while not cola.empty():
+                    cola.get_nowait()
+                mensaje = ('snapshot', self.ultimo)
+            cola.put_nowait(mensaje)
+
+    async def _producir(self):
+        intervalo = getattr(settings, 'SSE_INTERVALO', 30)
+        intervalo_minimo = getattr(settings, 'SSE_INTERVALO_MINIMO', 2)
+        version = None
+        calculado_en = float('-inf')
+
+        while True:
+            inicio = time.monotonic()
+            try:
+                with lectura_en_replica():
+                    alias = await sync_to_async(alias_lectura)()
+                nueva_version = (await version_tablas_async(TABLAS_ESTADISTICAS, alias))[0]
+            except Exception:
+                alias, nueva_version = None, None
+
+            # Las ráfagas de escrituras (p. ej. importaciones) se agrupan en un solo cálculo por intervalo
+            if alias is not None and (nueva_version != version or inicio - calculado_en >= intervalo):
+                try:
+                    datos = await estadisticas_dashboard(alias)
+                    self.calculos += 1
+                    version, calculado_en = nueva_version, inicio
+                except Exception:
+                    datos = None
+                if datos is not None:
+                    self._difundir(datos)
+
+            await asyncio.sleep(max(0, intervalo_minimo - (time.monotonic() - inicio)))
+
+    def _difundir(self, datos):
+        if self.ultimo is None:
+            self.ultimo = datos
+            self._publicar('snapshot', datos)
+            return
+        cambios = {
+            clave: valor for clave, valor in datos.items()
+            if clave != CAMPO_MARCA_TIEMPO and self.ultimo.get(clave) != valor
+        }
+        self.ultimo = datos
+        if cambios:
+            cambios[CAMPO_MARCA_TIEMPO] = datos[CAMPO_MARCA_TIEMPO]
+            self._publicar('cambios', cambios)
+
+def difusor():
+    """Difusor del event loop actual"""
+    clave = id(asyncio.get_running_loop())
+    if clave not in _difusores:
+        _difusores[clave] = DifusorEstadisticas()
+    return _difusores[clave]
+
+async def flujo_estadisticas():
+    """Generador asíncrono de eventos SSE para un cliente"""
+    actual = difusor()
+    cola = actual.suscribir()
+    latido = getattr(settings, 'SSE_LATIDO', 15)
+    try:
+        # El navegador reintenta tras 'retry' ms si se corta la conexión
+        yield f'retry: {latido * 1000}\n\n'
+        while True:
+            try:
+                evento, datos = await asyncio.wait_for(cola.get(), timeout=latido)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ': ping\n\n'
+                continue
+            yield _formatear(evento, datos)
+    finally:
+        actual.desuscribir(cola)
@@ -1,11 +1,16 @@
 from django import forms
 from django.db import connection
 from .models import PreRegistro
+from .archivo import preregistro_existe
 from .utils import get_sexo_choices, get_tipo_usuario_choices, get_grado_academico_choices, get_modalidad_ingreso_choices
+from .configuracion import errores_politica_password
 
 class PreRegistroForm(forms.ModelForm):
     """Formulario para el pre-registro que replica las tablas persona y usuario"""
     
+    # False: solo validaciones de formato, la unicidad la verifica el procesador de la entrada
+    verificar_unicidad = True
+    
     class Meta:
         model = PreRegistro
         fields = [
@@ -148,8 +153,11 @@ class PreRegistroForm(forms.ModelForm):
             if len(ci) < 6 or len(ci) > 15:
                 raise forms.ValidationError('La cédula debe tener entre 6 y 15 dígitos.')
             
-            # Verificar en pre-registros
-            if PreRegistro.objects.filter(ci=ci).exists():
+            if not self.verificar_unicidad:
+                return ci
+            
+            # Verificar en pre-registros (vigentes y archivados)
+            if preregistro_existe('ci', ci):
                 raise forms.ValidationError('Ya existe un pre-registro pendiente con esta cédula de identidad.')
             
             # Verificar en base de datos principal
@@ -163,9 +171,9 @@ class PreRegistroForm(forms.ModelForm):
     def clean_email(self):
         """Validar que el email sea único en todo el sistema"""
         email = self.cleaned_data.get('email')
-        if email:
-            # Verificar en pre-registros
-            if PreRegistro.objects.filter(email=email).exists():
+        if email and self.verificar_unicidad:
+            # Verificar en pre-registros (vigentes y archivados)
+            if preregistro_existe('email', email):
                 raise forms.ValidationError('Ya existe un pre-registro pendiente con este correo electrónico.')
             
             # Verificar en base de datos principal
@@ -187,8 +195,11 @@ class PreRegistroForm(forms.ModelForm):
             if len(telefono) < 7 or len(telefono) > 15:
                 raise forms.ValidationError('El teléfono debe tener entre 7 y 15 dígitos.')
             
-            # Verificar en pre-registros
-            if PreRegistro.objects.filter(telefono=telefono).exists():
+            if not self.verificar_unicidad:
+                return telefono
+            
+            # Verificar en pre-registros (vigentes y archivados)
+            if preregistro_existe('telefono', telefono):
                 raise forms.ValidationError('Ya existe un pre-registro con este número de teléfono.')
             
             # Verificar en base de datos principal
@@ -203,7 +214,7 @@ class PreRegistroForm(forms.ModelForm):
         """Validar que el username sea único"""
         username = self.cleaned_data.get('username')
         if username:
-            if PreRegistro.objects.filter(username=username).exists():
+            if self.verificar_unicidad and preregistro_existe('username', username):
                 raise forms.ValidationError('Este nombre de usuario ya está en uso.')
             
             # Validar formato del username
@@ -213,11 +224,12 @@ class PreRegistroForm(forms.ModelForm):
         return username
     
     def clean_password(self):
-        """Validar que la contraseña sea segura"""
+        """Validar la contraseña según la política configurada por el superusuario"""
         password = self.cleaned_data.get('password')
         if password:
-            if len(password) < 6:
-                raise forms.ValidationError('La contraseña debe tener al menos 6 caracteres.')
+            errores = errores_politica_password(password)
+            if errores:
+                raise forms.ValidationError(errores)
         
         return password
     
@@ -226,6 +238,15 @@ class PreRegistroForm(forms.ModelForm):
         cleaned_data = super().clean()
         # Los campos académicos son opcionales, se llenan según corresponda
         return cleaned_data
+    
+    def validate_unique(self):
+        # La validación de unique=True del modelo también consulta la base de datos
+        if self.verificar_unicidad:
+            super().validate_unique()
+
+class RecepcionPreRegistroForm(PreRegistroForm):
+    """Pre-registro en modo diferido: solo formato, sin consultas (ver core/entrada_preregistros.py)"""
+    verificar_unicidad = False
 
 # ========================================
 # FORMULARIO PARA AGREGAR ADMINISTRADOR
@@ -452,6 +473,11 @@ class AgregarEmpleadoForm(forms.Form):
             
             if not re.search(r'[0-9]', password):
                 raise forms.ValidationError('❌ La contraseña debe contener al menos un número.')
+            
+            # Requisitos adicionales de la política de contraseñas
+            errores = errores_politica_password(password)
+            if errores:
+                raise forms.ValidationError(['❌ ' + error for error in errores])
         return password
     
     def clean_telefono(self):
@@ -690,6 +716,11 @@ class AgregarAdministradorForm(forms.Form):
             
             if not re.search(r'[0-9]', password):
                 raise forms.ValidationError('❌ La contraseña debe contener al menos un número.')
+            
+            # Requisitos adicionales de la política de contraseñas
+            errores = errores_politica_password(password)
+            if errores:
+                raise forms.ValidationError(['❌ ' + error for error in errores])
         return password
     
     def clean_telefono(self):
@@ -0,0 +1,19 @@
+"""
+Hashers de contraseñas calibrados para el hardware del servidor
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+class PBKDF2CalibradoHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con las iteraciones de settings.PASSWORD_PBKDF2_ITERATIONS
+    (calculadas con `python manage.py calibrar_hasher`).
+    
+    Conserva el identificador 'pbkdf2_sha256': los hashes existentes siguen
+    siendo válidos y Django los re-codifica con el nuevo costo en el
+    siguiente login exitoso (must_update compara las iteraciones).
+    """
+    
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,38 @@
+"""
+Historial de los pre-registros en la tabla append-only ``preregistro_evento``.
+
+Cada aprobación, rechazo, bloqueo o reactivación inserta una fila en lugar de
+reescribir un texto acumulado en ``pre_registro``. El historial se lee solo al abrir
+el detalle de un pre-registro, nunca en los listados.
+"""
+from django.db import connection
+from django.utils import timezone
+
+from .models import EventoPreRegistro
+
+SQL_REGISTRAR_VARIOS = """
+    INSERT INTO preregistro_evento (preregistro_id, ts, tipo, detalle)
+    SELECT preregistro_id, now(), %s, %s FROM unnest(%s::bigint[]) AS preregistro_id
+"""
+
+def registrar(preregistro_id, tipo, detalle=''):
+    return EventoPreRegistro.objects.create(preregistro_id=preregistro_id, tipo=tipo, detalle=detalle)
+
+def registrar_varios(ids, tipo, detalle=''):
+    """El mismo evento para varios pre-registros, con un solo INSERT"""
+    if not ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_REGISTRAR_VARIOS, [tipo, detalle, list(ids)])
+
+def historial(preregistro_id):
+    eventos = EventoPreRegistro.objects.filter(preregistro_id=preregistro_id).order_by('ts', 'id')
+    return [
+        {
+            'fecha': timezone.localtime(evento.ts).strftime('%d/%m/%Y %H:%M'),
+            'tipo': evento.tipo,
+            'tipo_display': evento.get_tipo_display(),
+            'detalle': evento.detalle,
+        }
+        for evento in eventos
+    ]
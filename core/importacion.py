@@ -0,0 +1,250 @@
+"""
+Importación masiva de usuarios desde CSV/XLSX.
+
+Las filas se cargan por bloques con COPY a una tabla temporal, se validan con
+sentencias SQL sobre todo el conjunto y las válidas se insertan en persona y
+usuario con una única sentencia INSERT ... SELECT.
+"""
+import csv
+import io
+from datetime import date, datetime
+
+from django.db import connection, transaction
+
+from .utils import copiar_csv
+
+COLUMNAS = [
+    'ci', 'nombres', 'paterno', 'materno', 'direccion', 'telefono', 'email',
+    'fecha_nacimiento', 'id_sexo', 'id_tipo_usuario', 'id_modalidad_ingreso', 'id_grado_academico',
+]
+COLUMNAS_REQUERIDAS = ['ci', 'nombres', 'id_sexo', 'id_tipo_usuario']
+
+# Tipos de usuario que se pueden importar (igual que en el pre-registro, sin administradores)
+TIPOS_USUARIO_IMPORTABLES = ('U-01', 'U-02', 'U-04')
+
+TAMANO_BLOQUE = 5000
+
+# Cada regla marca con su motivo las filas aún no rechazadas que cumplen la condición.
+# El orden importa: cada fila conserva el primer motivo de rechazo.
+REGLAS_VALIDACION = [
+    ("CI inválido (solo números, 6 a 15 dígitos)",
+     "ci IS NULL OR ci !~ '^[0-9]{6,15}$'"),
+    ("Nombres requeridos (máximo 50 caracteres)",
+     "nombres IS NULL OR length(nombres) > 50"),
+    ("Apellido o dirección demasiado largos",
+     "length(paterno) > 50 OR length(materno) > 50 OR length(direccion) > 100"),
+    ("Email inválido (máximo 30 caracteres)",
+     "email IS NOT NULL AND (length(email) > 30 OR email !~ '^[A-Za-z0-9._%%+-]+@[A-Za-z0-9.-]+\\.[A-Za-z]{2,}$')"),
+    ("Teléfono inválido (solo números, 7 a 15 dígitos)",
+     "telefono IS NOT NULL AND telefono !~ '^[0-9]{7,15}$'"),
+    ("Fecha de nacimiento inválida (AAAA-MM-DD)",
+     "fecha_nacimiento IS NOT NULL AND fecha_nacimiento !~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}$'"),
+    ("Sexo no existe en el catálogo",
+     "NOT EXISTS (SELECT 1 FROM sh_biblioteca.sexo c WHERE TRIM(c.id_sexo) = i.id_sexo)"),
+    ("Tipo de usuario no permitido",
+     "id_tipo_usuario <> ALL(%(tipos)s) OR NOT EXISTS "
+     "(SELECT 1 FROM sh_biblioteca.tipo_usuario c WHERE TRIM(c.id_tipo_usuario) = i.id_tipo_usuario)"),
+    ("Modalidad de ingreso no existe en el catálogo",
+     "id_modalidad_ingreso IS NOT NULL AND NOT EXISTS "
+     "(SELECT 1 FROM sh_biblioteca.modalidad_ingreso c WHERE TRIM(c.id_modalidad_ingreso) = i.id_modalidad_ingreso)"),
+    ("Grado académico no existe en el catálogo",
+     "id_grado_academico IS NOT NULL AND NOT EXISTS "
+     "(SELECT 1 FROM sh_biblioteca.grado_academico c WHERE TRIM(c.id_grado_academico) = i.id_grado_academico)"),
+    ("CI duplicado en el archivo",
+     "fila IN (SELECT fila FROM (SELECT fila, ROW_NUMBER() OVER (PARTITION BY ci ORDER BY fila) AS n "
+     "FROM importacion_usuario WHERE motivo IS NULL) d WHERE d.n > 1)"),
+    ("Email duplicado en el archivo",
+     "email IS NOT NULL AND fila IN (SELECT fila FROM (SELECT fila, ROW_NUMBER() OVER (PARTITION BY lower(email) ORDER BY fila) AS n "
+     "FROM importacion_usuario WHERE motivo IS NULL AND email IS NOT NULL) d WHERE d.n > 1)"),
+    ("CI ya registrado en el sistema",
+     "EXISTS (SELECT 1 FROM sh_biblioteca.persona p WHERE p.ci = i.ci)"),
+    ("Email ya registrado en el sistema",
+     "email IS NOT NULL AND EXISTS (SELECT 1 FROM sh_biblioteca.persona p WHERE p.email = i.email)"),
+    ("CI con pre-registro existente",
+     "EXISTS (SELECT 1 FROM pre_registro r WHERE r.ci = i.ci) "
+     "OR EXISTS (SELECT 1 FROM pre_registro_archivo r WHERE r.ci = i.ci)"),
+    ("Email con pre-registro existente",
+     "email IS NOT NULL AND (EXISTS (SELECT 1 FROM pre_registro r WHERE r.email = i.email) "
+     "OR EXISTS (SELECT 1 FROM pre_registro_archivo r WHERE r.email = i.email))"),
+]
+
+class ErrorImportacion(Exception):
+    """Error en el formato del archivo de importación"""
+
+# ========================================
+# LECTURA DEL ARCHIVO POR BLOQUES
+# ========================================
+
+def _normalizar_encabezados(encabezados):
+    columnas = [str(e or '').strip().lower() for e in encabezados]
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in columnas]
+    if faltantes:
+        raise ErrorImportacion(f"Faltan columnas requeridas: {', '.join(faltantes)}")
+    return columnas
+
+def _normalizar_valor(columna, valor):
+    """Limpieza sintáctica mínima; la validación real se hace en SQL"""
+    if valor is None:
+        return None
+    if columna == 'fecha_nacimiento':
+        if isinstance(valor, (datetime, date)):
+            return valor.strftime('%Y-%m-%d')
+        texto = str(valor).strip()
+        try:
+            return date.fromisoformat(texto).isoformat() if texto else None
+        except ValueError:
+            # Conserva el texto para que la regla SQL lo rechace
+            return f'invalida:{texto}'
+    if isinstance(valor, float) and valor.is_integer():
+        # Excel entrega los CI y teléfonos numéricos como float
+        valor = int(valor)
+    texto = str(valor).strip()
+    if columna in ('id_sexo', 'id_tipo_usuario', 'id_modalidad_ingreso', 'id_grado_academico'):
+        texto = texto.upper()
+    return texto or None
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    lector = csv.reader(texto)
+    try:
+        encabezados = next(lector)
+    except StopIteration:
+        raise ErrorImportacion('El archivo está vacío')
+    yield _normalizar_encabezados(encabezados)
+    yield from lector
+
+def _filas_xlsx(archivo):
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        try:
+            encabezados = next(filas)
+        except StopIteration:
+            raise ErrorImportacion('El archivo está vacío')
+        yield _normalizar_encabezados(encabezados)
+        yield from filas
+    finally:
+        libro.close()
+
+def leer_bloques(archivo, nombre_archivo, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera bloques de filas (listas en el orden de COLUMNAS) precedidas por su
+    número de fila en el archivo. Acepta .csv y .xlsx.
+    """
+    nombre = nombre_archivo.lower()
+    if nombre.endswith('.csv'):
+        filas = _filas_csv(archivo)
+    elif nombre.endswith('.xlsx'):
+        filas = _filas_xlsx(archivo)
+    else:
+        raise ErrorImportacion('Formato no soportado: use .csv o .xlsx')
+
+    encabezados = next(filas)
+    indices = {columna: encabezados.index(columna) for columna in COLUMNAS if columna in encabezados}
+
+    bloque = []
+    for numero, fila in enumerate(filas, start=2):
+        if not any(fila):
+            continue
+        bloque.append([numero] + [
+            _normalizar_valor(columna, fila[indices[columna]] if columna in indices and indices[columna] < len(fila) else None)
+            for columna in COLUMNAS
+        ])
+        if len(bloque) >= tamano_bloque:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+# ========================================
+# CARGA, VALIDACIÓN Y MERGE
+# ========================================
+
+def _copiar_bloque(cursor, bloque):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for fila in bloque:
+        # COPY csv interpreta el campo sin comillas vacío como NULL
+        escritor.writerow(['' if v is None else v for v in fila])
+    copiar_csv(
+        cursor,
+        f"COPY importacion_usuario (fila, {', '.join(COLUMNAS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+def importar_usuarios(archivo, nombre_archivo, solo_validar=False, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Importa usuarios (persona + usuario) desde un archivo CSV/XLSX.
+    Devuelve un dict con los totales y la lista de filas rechazadas con su motivo.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            CREATE TEMP TABLE importacion_usuario (
+                fila integer PRIMARY KEY,
+                {', '.join(f'{columna} text' for columna in COLUMNAS)},
+                motivo text
+            ) ON COMMIT DROP
+        """)
+
+        total = 0
+        for bloque in leer_bloques(archivo, nombre_archivo, tamano_bloque):
+            _copiar_bloque(cursor, bloque)
+            total += len(bloque)
+
+        cursor.execute("CREATE INDEX ON importacion_usuario (ci)")
+        cursor.execute("ANALYZE importacion_usuario")
+
+        for motivo, condicion in REGLAS_VALIDACION:
+            cursor.execute(
+                f"UPDATE importacion_usuario i SET motivo = %(motivo)s WHERE motivo IS NULL AND ({condicion})",
+                {'motivo': motivo, 'tipos': list(TIPOS_USUARIO_IMPORTABLES)},
+            )
+
+        insertados = 0
+        if not solo_validar:
+            cursor.execute("""
+                WITH nuevas AS (
+                    INSERT INTO sh_biblioteca.persona
+                    (ci, nombres, paterno, materno, direccion, telefono, email, fecha_nacimiento, id_sexo)
+                    SELECT ci, nombres, paterno, materno, direccion, telefono, email,
+                           fecha_nacimiento::date, id_sexo
+                    FROM importacion_usuario
+                    WHERE motivo IS NULL
+                    ORDER BY fila
+                    RETURNING id_persona, ci
+                )
+                INSERT INTO sh_biblioteca.usuario
+                (id_persona, id_tipo_usuario, id_modalidad_ingreso, id_grado_academico, id_estado_usuario, fecha_registro)
+                SELECT n.id_persona, i.id_tipo_usuario, i.id_modalidad_ingreso, i.id_grado_academico,
+                       'EU-01', CURRENT_DATE
+                FROM nuevas n
+                -- Las copias de un CI duplicado quedan rechazadas: solo la fila válida
+                JOIN importacion_usuario i ON i.ci = n.ci AND i.motivo IS NULL
+            """)
+            insertados = cursor.rowcount
+
+        cursor.execute("""
+            SELECT fila, ci, nombres, email, motivo
+            FROM importacion_usuario
+            WHERE motivo IS NOT NULL
+            ORDER BY fila
+        """)
+        rechazados = [
+            {'fila': fila, 'ci': ci, 'nombres': nombres, 'email': email, 'motivo': motivo}
+            for fila, ci, nombres, email, motivo in cursor.fetchall()
+        ]
+
+    return {
+        'total': total,
+        'insertados': insertados,
+        'validos': total - len(rechazados),
+        'rechazados': rechazados,
+    }
+
+def escribir_reporte_rechazados(rechazados, destino):
+    """Escribe el reporte de filas rechazadas en formato CSV"""
+    escritor = csv.DictWriter(destino, fieldnames=['fila', 'ci', 'nombres', 'email', 'motivo'])
+    escritor.writeheader()
+    escritor.writerows(rechazados)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reportes import REPORTES, ReporteNoDisponible, actualizar
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula las vistas materializadas de los reportes con REFRESH MATERIALIZED VIEW '
+        'CONCURRENTLY (las páginas de reportes siguen respondiendo mientras tanto)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reporte', action='append', choices=list(REPORTES),
+                            help='Reporte a actualizar (repetible; por defecto todos)')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Repite la actualización cada --intervalo segundos en lugar de terminar')
+        parser.add_argument('--intervalo', type=float, default=900.0,
+                            help='Segundos entre actualizaciones en modo continuo (por defecto 900)')
+
+    def handle(self, *args, **options):
+        nombres = options['reporte'] or list(REPORTES)
+
+        try:
+            while True:
+                inicio = time.perf_counter()
+                for nombre in nombres:
+                    try:
+                        filas, duracion_ms = actualizar(nombre)
+                    except ReporteNoDisponible as e:
+                        raise CommandError(str(e))
+                    self.stdout.write(f'  {nombre:<28} {filas:>8} filas  {duracion_ms:>9.1f} ms')
+
+                self.stdout.write(self.style.SUCCESS(
+                    f'{len(nombres)} reportes actualizados en {time.perf_counter() - inicio:.2f} s'
+                ))
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
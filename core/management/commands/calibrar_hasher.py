@@ -0,0 +1,120 @@
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from core.hashers import PBKDF2CalibradoHasher
+
+PASSWORD_PRUEBA = 'Calibracion2024'
+SALT_PRUEBA = 'calibracionsalt0'
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo de los hashers de contraseña en este servidor y calcula las '
+        'iteraciones de PBKDF2 que alcanzan la latencia objetivo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objetivo-ms', type=float, default=100.0,
+                            help='Latencia objetivo por hash en milisegundos (por defecto 100)')
+        parser.add_argument('--muestras', type=int, default=5,
+                            help='Mediciones por configuración; se usa la mediana (por defecto 5)')
+        parser.add_argument('--minimo', type=int, default=600000,
+                            help='Iteraciones mínimas aceptadas para PBKDF2 (por defecto 600000, OWASP)')
+        parser.add_argument('--escribir', action='store_true',
+                            help='Escribe PASSWORD_PBKDF2_ITERATIONS en el archivo de settings')
+
+    def handle(self, *args, **options):
+        objetivo = options['objetivo_ms'] / 1000
+        muestras = max(1, options['muestras'])
+
+        # 1. Costo actual de cada hasher configurado
+        self.stdout.write(self.style.MIGRATE_HEADING('Hashers configurados (parámetros actuales):'))
+        for hasher in get_hashers():
+            try:
+                duracion = self._medir(lambda: hasher.encode(PASSWORD_PRUEBA, SALT_PRUEBA), muestras)
+            except ValueError:
+                # La librería opcional (argon2-cffi, bcrypt) no está instalada
+                self.stdout.write(f'  {hasher.algorithm:<24} no disponible')
+                continue
+            self.stdout.write(f'  {hasher.algorithm:<24} {duracion * 1000:8.1f} ms  {self._parametros(hasher)}')
+
+        # 2. Calibración de PBKDF2
+        hasher = PBKDF2CalibradoHasher()
+        muestra = 100000
+        por_iteracion = self._medir(
+            lambda: hasher.encode(PASSWORD_PRUEBA, SALT_PRUEBA, muestra), muestras
+        ) / muestra
+        iteraciones = self._redondear(objetivo / por_iteracion)
+
+        # Segunda pasada con el valor estimado para corregir el costo fijo
+        real = self._medir(lambda: hasher.encode(PASSWORD_PRUEBA, SALT_PRUEBA, iteraciones), muestras)
+        iteraciones = self._redondear(iteraciones * objetivo / real)
+
+        if iteraciones < options['minimo']:
+            self.stdout.write(self.style.WARNING(
+                f'\n{iteraciones} iteraciones está por debajo del mínimo ({options["minimo"]}); '
+                f'se usará el mínimo. Use --minimo para aceptar un costo menor.'
+            ))
+            iteraciones = options['minimo']
+
+        final = self._medir(lambda: hasher.encode(PASSWORD_PRUEBA, SALT_PRUEBA, iteraciones), muestras)
+        actual = settings.PASSWORD_PBKDF2_ITERATIONS
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nCalibración PBKDF2-SHA256:'))
+        self.stdout.write(f'  Objetivo:              {options["objetivo_ms"]:.1f} ms')
+        self.stdout.write(f'  Iteraciones actuales:  {actual}')
+        self.stdout.write(f'  Iteraciones sugeridas: {iteraciones} ({final * 1000:.1f} ms)')
+
+        if not isinstance(get_hasher(), PBKDF2CalibradoHasher):
+            self.stdout.write(self.style.WARNING(
+                'core.hashers.PBKDF2CalibradoHasher no es el primer elemento de PASSWORD_HASHERS; '
+                'el valor calibrado no tendrá efecto.'
+            ))
+
+        if not options['escribir']:
+            self.stdout.write(f'\nAgregue a settings: PASSWORD_PBKDF2_ITERATIONS = {iteraciones}')
+            self.stdout.write('o vuelva a ejecutar con --escribir.')
+            return
+
+        self._escribir_settings(iteraciones)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nPASSWORD_PBKDF2_ITERATIONS = {iteraciones} guardado. '
+            f'Los hashes existentes se actualizarán en el siguiente login exitoso de cada usuario.'
+        ))
+
+    def _medir(self, funcion, muestras):
+        """Mediana en segundos de varias ejecuciones de la función"""
+        tiempos = []
+        for _ in range(muestras):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        return statistics.median(tiempos)
+
+    def _redondear(self, iteraciones):
+        return max(10000, int(round(iteraciones, -4)))
+
+    def _parametros(self, hasher):
+        for atributo in ('iterations', 'time_cost', 'rounds', 'work_factor'):
+            if hasattr(hasher, atributo):
+                return f'{atributo}={getattr(hasher, atributo)}'
+        return ''
+
+    def _escribir_settings(self, iteraciones):
+        archivo = Path(sys.modules[settings.SETTINGS_MODULE].__file__)
+        contenido = archivo.read_text(encoding='utf-8')
+        nuevo, reemplazos = re.subn(
+            r'^PASSWORD_PBKDF2_ITERATIONS\s*=.*$',
+            f'PASSWORD_PBKDF2_ITERATIONS = {iteraciones}',
+            contenido,
+            flags=re.MULTILINE,
+        )
+        if not reemplazos:
+            raise CommandError(f'No se encontró PASSWORD_PBKDF2_ITERATIONS en {archivo}')
+        archivo.write_text(nuevo, encoding='utf-8')
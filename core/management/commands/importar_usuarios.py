@@ -0,0 +1,51 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacion import ErrorImportacion, TAMANO_BLOQUE, escribir_reporte_rechazados, importar_usuarios
+
+class Command(BaseCommand):
+    help = 'Importa usuarios masivamente (persona + usuario) desde un archivo CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv o .xlsx')
+        parser.add_argument('--reporte', help='Ruta del CSV de filas rechazadas (por defecto se imprime en pantalla)')
+        parser.add_argument('--solo-validar', action='store_true',
+                            help='Valida el archivo y genera el reporte sin insertar datos')
+        parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE,
+                            help=f'Filas por bloque de COPY (por defecto {TAMANO_BLOQUE})')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resultado = importar_usuarios(
+                    archivo,
+                    options['archivo'],
+                    solo_validar=options['solo_validar'],
+                    tamano_bloque=options['bloque'],
+                )
+        except (OSError, ErrorImportacion) as e:
+            raise CommandError(str(e))
+        duracion = time.perf_counter() - inicio
+
+        rechazados = resultado['rechazados']
+        if rechazados:
+            if options['reporte']:
+                with open(options['reporte'], 'w', newline='', encoding='utf-8') as destino:
+                    escribir_reporte_rechazados(rechazados, destino)
+                self.stdout.write(self.style.WARNING(
+                    f"{len(rechazados)} filas rechazadas. Reporte: {options['reporte']}"
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(f'{len(rechazados)} filas rechazadas:'))
+                escribir_reporte_rechazados(rechazados, sys.stdout)
+
+        filas_por_segundo = resultado['total'] / duracion if duracion else 0
+        self.stdout.write(f"Filas leídas: {resultado['total']} ({duracion:.1f} s, {filas_por_segundo:.0f} filas/s)")
+
+        if options['solo_validar']:
+            self.stdout.write(self.style.SUCCESS(f"Validación completa: {resultado['validos']} filas válidas"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Usuarios importados: {resultado['insertados']}"))
@@ -0,0 +1,97 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Proceso nuevo que carga biblioteca.wsgi y atiende dos peticiones GET seguidas
+SCRIPT = """
+import io, json, os, sys, time
+inicio = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'biblioteca.settings')
+from django.conf import settings
+settings.PRECALENTAR = {precalentar}
+from biblioteca.wsgi import application
+listo = time.perf_counter()
+
+def pedir(ruta):
+    estados = []
+    environ = {{
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': ruta, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+    }}
+    t = time.perf_counter()
+    respuesta = application(environ, lambda estado, cabeceras, exc_info=None: estados.append(estado))
+    try:
+        b''.join(respuesta)
+    finally:
+        respuesta.close()
+    return (time.perf_counter() - t) * 1000, estados[0]
+
+primera, estado = pedir({ruta!r})
+segunda, _ = pedir({ruta!r})
+print(json.dumps({{
+    'arranque_ms': (listo - inicio) * 1000,
+    'primera_ms': primera,
+    'hasta_primera_ms': (listo - inicio) * 1000 + primera,
+    'segunda_ms': segunda,
+    'estado': estado,
+}}))
+"""
+
+# (clave, etiqueta)
+METRICAS = [
+    ('arranque_ms', 'Carga de wsgi.py'),
+    ('primera_ms', 'Primera petición'),
+    ('hasta_primera_ms', 'Hasta la primera respuesta'),
+    ('segunda_ms', 'Segunda petición'),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Mide en procesos nuevos el tiempo hasta la primera respuesta con y sin '
+        'precalentamiento (PRECALENTAR)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5,
+                            help='Procesos lanzados por variante (por defecto 5)')
+        parser.add_argument('--ruta', default='/pre-registro/',
+                            help='Ruta pedida por cada proceso (por defecto /pre-registro/)')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] <= 0:
+            raise CommandError('--repeticiones debe ser positivo')
+
+        resultados = {False: [], True: []}
+        # Alternadas para que la caché del sistema operativo favorezca por igual a ambas
+        for _ in range(options['repeticiones']):
+            for precalentar in (False, True):
+                resultados[precalentar].append(self._medir(precalentar, options['ruta']))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Arranque de un proceso y GET {options['ruta']} "
+            f"({options['repeticiones']} procesos por variante, mediana en ms):"
+        ))
+        self.stdout.write(f"  {'':<28}{'sin precalentar':>16}{'precalentado':>16}")
+        for clave, etiqueta in METRICAS:
+            sin = statistics.median(medicion[clave] for medicion in resultados[False])
+            con = statistics.median(medicion[clave] for medicion in resultados[True])
+            self.stdout.write(f'  {etiqueta:<28}{sin:>16.1f}{con:>16.1f}')
+
+    def _medir(self, precalentar, ruta):
+        proceso = subprocess.run(
+            [sys.executable, '-c', SCRIPT.format(precalentar=precalentar, ruta=ruta)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proceso.returncode != 0:
+            raise CommandError(f'El proceso de medición falló:\n{proceso.stderr}')
+
+        medicion = json.loads(proceso.stdout.strip().splitlines()[-1])
+        if not medicion['estado'].startswith('200'):
+            raise CommandError(f"GET {ruta} respondió {medicion['estado']}")
+        return medicion
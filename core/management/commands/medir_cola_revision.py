@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import PreRegistro
+
+# Fuera de los rangos de poblar_datos (9xxxxxxx) y de medir_rendimiento (5xxxxxxxx)
+PREFIJO_CI = 600000000
+PREFIJO_TELEFONO = 40000000
+PREFIJO_REVISOR = 'bench_revisor_'
+
+MODOS = ('lista', 'cola')
+
+class Command(BaseCommand):
+    help = (
+        'Simula varios revisores aprobando pre-registros a la vez, primero sobre la lista '
+        'completa y después con la cola de revisión, y compara rendimiento y colisiones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--revisores', type=int, default=4,
+                            help='Revisores simultáneos (por defecto 4)')
+        parser.add_argument('--preregistros', type=int, default=200,
+                            help='Pre-registros pendientes a revisar por modo (por defecto 200)')
+        parser.add_argument('--lote', type=int, default=5,
+                            help='Pre-registros por reclamo en modo cola (por defecto 5)')
+        parser.add_argument('--modo', choices=MODOS, action='append', default=None,
+                            help='Mide solo los modos indicados (se puede repetir)')
+
+    def handle(self, *args, **options):
+        maximo = settings.DATABASES['default'].get('OPTIONS', {}).get('pool', {}).get('max_size')
+        if maximo and options['revisores'] > maximo:
+            raise CommandError(f'--revisores no puede superar el tamaño del pool ({maximo})')
+
+        modos = options['modo'] or MODOS
+        revisores = self._crear_revisores(options['revisores'])
+        apartados = self._apartar_pendientes()
+        try:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+            ):
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"{options['preregistros']} pre-registros, {len(revisores)} revisores:"
+                ))
+                for modo in modos:
+                    self._limpiar()
+                    self._crear_preregistros(options['preregistros'])
+                    resultado = self._medir(modo, revisores, options['lote'])
+                    self._imprimir(modo, resultado)
+        finally:
+            self._limpiar()
+            self._restaurar_pendientes(apartados)
+            User.objects.filter(username__startswith=PREFIJO_REVISOR).delete()
+
+    # ==========================================
+    # DATOS
+    # ==========================================
+
+    def _crear_revisores(self, cantidad):
+        revisores = []
+        for i in range(cantidad):
+            revisor, _ = User.objects.get_or_create(
+                username=f'{PREFIJO_REVISOR}{i}', defaults={'is_staff': True}
+            )
+            revisores.append(revisor)
+        return revisores
+
+    def _apartar_pendientes(self):
+        """
+        Reserva los pendientes reales a un revisor ficticio durante la medición para que
+        la cola solo reparta los del benchmark. Devuelve sus reservas originales.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT id, revisor_id, reserva_hasta FROM pre_registro
+                WHERE estado = 'PENDIENTE' AND aprobado = false
+            """)
+            originales = cursor.fetchall()
+        apartador, _ = User.objects.get_or_create(username=f'{PREFIJO_REVISOR}apartado')
+        PreRegistro.objects.filter(id__in=[fila[0] for fila in originales]).update(
+            revisor=apartador, reserva_hasta=timezone.now() + timedelta(days=1)
+        )
+        return originales
+
+    def _restaurar_pendientes(self, originales):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "UPDATE pre_registro SET revisor_id = %s, reserva_hasta = %s WHERE id = %s",
+                [(revisor_id, reserva_hasta, preregistro_id) for preregistro_id, revisor_id, reserva_hasta in originales],
+            )
+
+    def _crear_preregistros(self, cantidad):
+        PreRegistro.objects.bulk_create([
+            PreRegistro(
+                ci=str(PREFIJO_CI + i),
+                nombres='Benchmark',
+                paterno='Cola',
+                materno='Revision',
+                direccion='Zona Central calle 1',
+                telefono=str(PREFIJO_TELEFONO + i),
+                email=f'cola{i}@bench.edu.bo',
+                fecha_nacimiento='1995-05-10',
+                id_sexo='M',
+                id_tipo_usuario='U-01',
+                id_modalidad_ingreso='MIE-01',
+                id_grado_academico='GA-03',
+                username=f'bench_cola_{i}',
+                password='Bench12345',
+            )
+            for i in range(cantidad)
+        ])
+
+    def _preregistros(self):
+        return PreRegistro.objects.filter(username__startswith='bench_cola_')
+
+    def _limpiar(self):
+        """Borra los pre-registros del benchmark y las personas/usuarios creados al aprobarlos"""
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM sh_biblioteca.usuario
+                WHERE id_persona IN (SELECT id_persona FROM sh_biblioteca.persona WHERE email LIKE %s)
+            """, ['cola%@bench.edu.bo'])
+            cursor.execute("DELETE FROM sh_biblioteca.persona WHERE email LIKE %s", ['cola%@bench.edu.bo'])
+        self._preregistros().delete()
+
+    # ==========================================
+    # REVISORES SIMULADOS
+    # ==========================================
+
+    def _medir(self, modo, revisores, lote):
+        contadores = [{'aprobados': 0, 'fallidos': 0, 'peticiones': 0} for _ in revisores]
+        ids = list(self._preregistros().order_by('fecha_registro', 'id').values_list('id', flat=True))
+        objetivo = self._revisar_lista if modo == 'lista' else self._revisar_cola
+        argumento = ids if modo == 'lista' else lote
+
+        hilos = [
+            threading.Thread(target=self._revisor, args=(objetivo, revisor, argumento, contador))
+            for revisor, contador in zip(revisores, contadores)
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        aprobados = sum(contador['aprobados'] for contador in contadores)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sh_biblioteca.persona WHERE email LIKE %s", ['cola%@bench.edu.bo']
+            )
+            personas = cursor.fetchone()[0]
+        return {
+            'segundos': duracion,
+            'aprobados': aprobados,
+            'fallidos': sum(contador['fallidos'] for contador in contadores),
+            'peticiones': sum(contador['peticiones'] for contador in contadores),
+            'personas': personas,
+            'activos': self._preregistros().filter(estado='ACTIVO').count(),
+        }
+
+    def _revisor(self, objetivo, revisor, argumento, contador):
+        cliente = Client()
+        cliente.force_login(revisor)
+        try:
+            objetivo(cliente, argumento, contador)
+        finally:
+            connections.close_all()
+
+    def _aprobar(self, cliente, preregistro_id, contador):
+        respuesta = cliente.post(reverse('core:aprobar_preregistro', args=[preregistro_id]))
+        contador['peticiones'] += 1
+        if respuesta.json()['success']:
+            contador['aprobados'] += 1
+        else:
+            contador['fallidos'] += 1
+
+    def _revisar_lista(self, cliente, ids, contador):
+        """Sin cola: todos recorren la misma lista y chocan en las mismas filas"""
+        for preregistro_id in ids:
+            self._aprobar(cliente, preregistro_id, contador)
+
+    def _revisar_cola(self, cliente, lote, contador):
+        """Con cola: cada revisor reclama su lote y aprueba solo lo reservado"""
+        while True:
+            respuesta = cliente.post(
+                reverse('core:reclamar_preregistros'),
+                json.dumps({'cantidad': lote}), content_type='application/json',
+            )
+            contador['peticiones'] += 1
+            reservados = respuesta.json()['preregistros']
+            if not reservados:
+                return
+            for preregistro in reservados:
+                self._aprobar(cliente, preregistro['id'], contador)
+
+    def _imprimir(self, modo, resultado):
+        por_segundo = resultado['aprobados'] / resultado['segundos'] if resultado['segundos'] else 0.0
+        linea = (
+            f"  {modo:<6} {resultado['segundos']:7.2f} s  {por_segundo:7.1f} aprobados/s  "
+            f"{resultado['peticiones']:5d} peticiones  {resultado['fallidos']:5d} fallidas  "
+            f"{resultado['personas']:5d} personas creadas"
+        )
+        if resultado['personas'] != resultado['aprobados'] or resultado['activos'] != resultado['aprobados']:
+            self.stdout.write(self.style.ERROR(linea + '  DUPLICADOS'))
+        else:
+            self.stdout.write(linea)
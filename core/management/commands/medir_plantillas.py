@@ -0,0 +1,121 @@
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.template.backends.django import DjangoTemplates
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core import views
+
+# Páginas medidas: (nombre, url, cliente)
+PAGINAS = [
+    ('home', 'core:home', 'anonimo'),
+    ('pre_registro', 'core:pre_registro', 'anonimo'),
+    ('dashboard', 'core:superuser_dashboard', 'superusuario'),
+]
+
+CARGADORES = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# Variantes: (nombre, cargador en caché, caché de fragmentos)
+VARIANTES = [
+    ('sin caché', False, False),
+    ('cargador en caché', True, False),
+    ('cargador + fragmentos', True, True),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Mide el tiempo de renderizado de las páginas principales sin caché, con el '
+        'cargador de plantillas en caché y con los fragmentos cacheados'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=200,
+                            help='Renderizados medidos por página y variante (por defecto 200)')
+        parser.add_argument('--pagina', action='append', default=None,
+                            help='Mide solo las páginas indicadas (se puede repetir)')
+
+    def handle(self, *args, **options):
+        paginas = PAGINAS
+        if options['pagina']:
+            nombres = {nombre for nombre, _, _ in PAGINAS}
+            desconocidas = set(options['pagina']) - nombres
+            if desconocidas:
+                raise CommandError(f"Páginas desconocidas: {', '.join(sorted(desconocidas))}")
+            paginas = [pagina for pagina in PAGINAS if pagina[0] in options['pagina']]
+
+        with override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+            capturas = {nombre: self._capturar(url, cliente) for nombre, url, cliente in paginas}
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Renderizado de plantillas ({options["iteraciones"]} iteraciones, mediana en ms):'
+        ))
+        self.stdout.write(f"  {'página':<16}" + ''.join(f'{nombre:>24}' for nombre, _, _ in VARIANTES))
+
+        for nombre, (plantilla, contexto, request) in capturas.items():
+            medianas = []
+            for _, en_cache, fragmentos in VARIANTES:
+                medianas.append(self._medir(plantilla, contexto, request, en_cache, fragmentos, options['iteraciones']))
+
+            base = medianas[0]
+            celdas = [f'{base:24.3f}'] + [
+                f'{mediana:14.3f} ({(1 - mediana / base) * 100:5.1f}% menos)' for mediana in medianas[1:]
+            ]
+            self.stdout.write(f'  {nombre:<16}' + ''.join(celdas))
+
+    def _capturar(self, nombre_url, tipo_cliente):
+        """Ejecuta la vista una vez y guarda la plantilla, el contexto y la petición que renderizó"""
+        cliente = Client()
+        if tipo_cliente == 'superusuario':
+            superusuario = User.objects.filter(is_superuser=True, is_active=True).first()
+            if superusuario is None:
+                raise CommandError('No hay superusuarios activos; ejecute create_test_users')
+            cliente.force_login(superusuario)
+
+        capturado = {}
+        render_original = views.render
+
+        def capturar(request, plantilla, contexto=None, *args, **kwargs):
+            capturado.update(plantilla=plantilla, contexto=contexto or {}, request=request)
+            return render_original(request, plantilla, contexto, *args, **kwargs)
+
+        with mock.patch.object(views, 'render', capturar):
+            respuesta = cliente.get(reverse(nombre_url))
+        if respuesta.status_code != 200 or not capturado:
+            raise CommandError(f'{nombre_url} respondió {respuesta.status_code} sin renderizar una plantilla')
+        return capturado['plantilla'], capturado['contexto'], capturado['request']
+
+    def _motor(self, en_cache):
+        configuracion = settings.TEMPLATES[0]
+        opciones = {clave: valor for clave, valor in configuracion['OPTIONS'].items() if clave != 'loaders'}
+        opciones['loaders'] = [('django.template.loaders.cached.Loader', CARGADORES)] if en_cache else CARGADORES
+        return DjangoTemplates({
+            'NAME': 'medicion',
+            'DIRS': configuracion['DIRS'],
+            'APP_DIRS': False,
+            'OPTIONS': opciones,
+        })
+
+    def _medir(self, plantilla, contexto, request, en_cache, fragmentos, iteraciones):
+        cache_fragmentos = settings.CACHES['fragmentos'] if fragmentos else {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+        with override_settings(CACHES={**settings.CACHES, 'fragmentos': cache_fragmentos}):
+            motor = self._motor(en_cache)
+            # Calentamiento: compila las plantillas (cargador en caché) y llena los fragmentos
+            motor.get_template(plantilla).render(contexto, request)
+
+            tiempos = []
+            for _ in range(iteraciones):
+                inicio = time.perf_counter()
+                motor.get_template(plantilla).render(contexto, request)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
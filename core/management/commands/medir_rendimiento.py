@@ -0,0 +1,318 @@
+import contextlib
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.configuracion import obtener_configuracion
+from core.context_processors import version_catalogos
+from core.models import PreRegistro
+
+LINEA_BASE_POR_DEFECTO = Path(settings.BASE_DIR) / 'benchmarks' / 'linea_base.json'
+
+# Prefijos fuera de los rangos de poblar_datos (persona 1xxxxxxx, pre-registro 9xxxxxxx)
+PREFIJO_CI = 500000000
+PREFIJO_TELEFONO = 30000000
+
+class _Rollback(Exception):
+    """Deshace los cambios de una iteración"""
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia (p50/p95/p99) y número de consultas de las vistas críticas y '
+        'las compara con una línea base en JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=20,
+                            help='Mediciones por escenario (por defecto 20)')
+        parser.add_argument('--calentamiento', type=int, default=2,
+                            help='Ejecuciones previas no medidas por escenario (por defecto 2)')
+        parser.add_argument('--escenario', action='append', default=None,
+                            help='Ejecuta solo los escenarios indicados (se puede repetir)')
+        parser.add_argument('--poblar', action='store_true',
+                            help='Genera datos con poblar_datos antes de medir')
+        parser.add_argument('--usuarios', type=int, default=10000,
+                            help='Usuarios a generar con --poblar (por defecto 10000)')
+        parser.add_argument('--preregistros', type=int, default=2000,
+                            help='Pre-registros a generar con --poblar (por defecto 2000)')
+        parser.add_argument('--linea-base', default=str(LINEA_BASE_POR_DEFECTO),
+                            help='Archivo JSON con la línea base')
+        parser.add_argument('--guardar', action='store_true',
+                            help='Guarda los resultados como nueva línea base')
+        parser.add_argument('--tolerancia', type=float, default=0.5,
+                            help='Aumento relativo de p95 permitido (por defecto 0.5 = 50%%)')
+        parser.add_argument('--tolerancia-consultas', type=int, default=0,
+                            help='Consultas adicionales permitidas por escenario (por defecto 0)')
+
+    def handle(self, *args, **options):
+        if options['poblar']:
+            call_command(
+                'poblar_datos',
+                usuarios=options['usuarios'],
+                preregistros=options['preregistros'],
+                stdout=self.stdout,
+            )
+
+        escenarios = self._escenarios()
+        if options['escenario']:
+            desconocidos = set(options['escenario']) - set(escenarios)
+            if desconocidos:
+                raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+            escenarios = {nombre: escenarios[nombre] for nombre in options['escenario']}
+
+        resultados = {}
+        # Configuración y catálogos se cargan una vez: su verificación periódica agregaría
+        # consultas en iteraciones al azar
+        obtener_configuracion()
+        version_catalogos()
+        # Los correos se envían a memoria y el host del cliente de pruebas debe ser válido
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+            CONFIGURACION_INTERVALO_VERIFICACION=10 ** 9,
+        ):
+            clientes = self._clientes()
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Midiendo {len(escenarios)} escenarios ({options["iteraciones"]} iteraciones):'
+            ))
+            for nombre, escenario in escenarios.items():
+                resultados[nombre] = self._medir(
+                    clientes[escenario['cliente']], escenario,
+                    options['iteraciones'], options['calentamiento'],
+                )
+                self._imprimir(nombre, resultados[nombre])
+
+        archivo = Path(options['linea_base'])
+        if options['guardar']:
+            self._guardar(archivo, resultados, options)
+            return
+
+        if not archivo.exists():
+            self.stdout.write(self.style.WARNING(
+                f'\nNo existe la línea base {archivo}; ejecute con --guardar para crearla.'
+            ))
+            return
+
+        regresiones = self._comparar(archivo, resultados, options)
+        if regresiones:
+            raise CommandError(f'{regresiones} regresiones respecto a la línea base')
+        self.stdout.write(self.style.SUCCESS('\nSin regresiones respecto a la línea base.'))
+
+    # ==========================================
+    # ESCENARIOS
+    # ==========================================
+
+    def _escenarios(self):
+        """
+        Cada escenario indica el cliente a usar, los ajustes que sobrescribe (opcional) y una
+        función que, dado el número de iteración, prepara los datos necesarios y devuelve
+        (método, url, datos, extra).
+        """
+        return {
+            'pre_registro_post': {
+                'cliente': 'anonimo',
+                'preparar': lambda i: ('post', reverse('core:pre_registro'), self._datos_preregistro(i), {}),
+            },
+            'pre_registro_post_diferido': {
+                'cliente': 'anonimo',
+                'ajustes': {'PRE_REGISTRO_DIFERIDO': True},
+                'preparar': lambda i: ('post', reverse('core:pre_registro'), self._datos_preregistro(i), {}),
+            },
+            'gestionar_preregistros': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: ('get', reverse('core:gestionar_preregistros'), None, {}),
+            },
+            'aprobar_preregistro': {
+                'cliente': 'superusuario',
+                'preparar': self._preparar_aprobacion,
+            },
+            'estadisticas_dashboard': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: ('get', reverse('core:obtener_estadisticas_dashboard'), None, {}),
+            },
+            'grafico_usuarios': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: ('get', reverse('core:obtener_datos_grafico_usuarios'), None, {}),
+            },
+            'exportar_datos_excel': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: (
+                    'post', reverse('core:exportar_datos_excel'),
+                    json.dumps({'tablas': ['usuarios', 'empleados', 'preregistros']}),
+                    {'content_type': 'application/json'},
+                ),
+            },
+            'crear_empleado_ajax': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: ('post', reverse('core:crear_empleado_ajax'), self._datos_empleado(i, 'C-02'), {}),
+            },
+            'crear_administrador_ajax': {
+                'cliente': 'superusuario',
+                'preparar': lambda i: ('post', reverse('core:crear_administrador_ajax'), self._datos_empleado(i, 'C-01'), {}),
+            },
+        }
+
+    def _datos_persona(self, i, prefijo):
+        return {
+            'ci': str(PREFIJO_CI + i),
+            'nombres': 'Benchmark',
+            'paterno': 'Rendimiento',
+            'materno': 'Prueba',
+            'direccion': 'Zona Central calle 1',
+            'telefono': str(PREFIJO_TELEFONO + i),
+            'email': f'{prefijo}{i}@bench.edu.bo',
+            'fecha_nacimiento': '1995-05-10',
+            'id_sexo': 'M',
+        }
+
+    def _datos_preregistro(self, i):
+        return {
+            **self._datos_persona(i, 'r'),
+            'id_tipo_usuario': 'U-01',
+            'id_modalidad_ingreso': 'MIE-01',
+            'id_grado_academico': 'GA-03',
+            'username': f'bench_{i}',
+            'password': 'Bench12345',
+        }
+
+    def _datos_empleado(self, i, cargo):
+        return {
+            **self._datos_persona(i, 'e'),
+            'id_cargo': cargo,
+            'id_turno': 'T-01',
+            'fecha_contratacion': '2024-01-15',
+            'username': f'bench_{i}',
+            'password': 'Bench12345',
+        }
+
+    def _preparar_aprobacion(self, i):
+        # Se crea dentro de la transacción de la iteración y se deshace al terminar
+        preregistro = PreRegistro.objects.create(**self._datos_preregistro(i))
+        return 'post', reverse('core:aprobar_preregistro', args=[preregistro.id]), None, {}
+
+    def _clientes(self):
+        superusuario = User.objects.filter(is_superuser=True, is_active=True).first()
+        if superusuario is None:
+            raise CommandError('No hay superusuarios activos; ejecute create_test_users')
+        cliente = Client()
+        cliente.force_login(superusuario)
+        return {'anonimo': Client(), 'superusuario': cliente}
+
+    # ==========================================
+    # MEDICIÓN
+    # ==========================================
+
+    def _medir(self, cliente, escenario, iteraciones, calentamiento):
+        """
+        El cliente de pruebas es WSGI: también las vistas asíncronas ejecutan sus consultas
+        en las conexiones de Django (core/consultas_async.py), así que se cuentan todas, en
+        cada base configurada (la réplica incluida).
+        """
+        tiempos = []
+        consultas = []
+
+        def contar(execute, sql, params, many, context):
+            # Los savepoints los agrega la transacción que revierte cada iteración: en
+            # producción los atomic() de las vistas son BEGIN/COMMIT, que no se cuentan
+            if not sql.lstrip().upper().startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')):
+                consultas[-1] += 1
+            return execute(sql, params, many, context)
+
+        for i in range(calentamiento + iteraciones):
+            consultas.append(0)
+            try:
+                with transaction.atomic():
+                    metodo, url, datos, extra = escenario['preparar'](i)
+                    with override_settings(**escenario.get('ajustes', {})), contextlib.ExitStack() as pila:
+                        for alias in settings.DATABASES:
+                            pila.enter_context(connections[alias].execute_wrapper(contar))
+                        inicio = time.perf_counter()
+                        respuesta = getattr(cliente, metodo)(url, datos, **extra)
+                        duracion = time.perf_counter() - inicio
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            if respuesta.status_code >= 400:
+                raise CommandError(f'{url} respondió {respuesta.status_code}')
+            if i >= calentamiento:
+                tiempos.append(duracion * 1000)
+            else:
+                consultas.pop()
+
+        if min(consultas) != max(consultas):
+            self.stdout.write(self.style.WARNING(
+                f'  Número de consultas variable entre iteraciones: {min(consultas)} a {max(consultas)}'
+            ))
+        return {
+            'p50_ms': round(self._percentil(tiempos, 50), 2),
+            'p95_ms': round(self._percentil(tiempos, 95), 2),
+            'p99_ms': round(self._percentil(tiempos, 99), 2),
+            # El máximo: una iteración con consultas de más es una regresión, no ruido
+            'consultas': max(consultas),
+        }
+
+    def _percentil(self, valores, percentil):
+        if len(valores) < 2:
+            return valores[0]
+        return statistics.quantiles(valores, n=100, method='inclusive')[percentil - 1]
+
+    def _imprimir(self, nombre, resultado):
+        self.stdout.write(
+            f"  {nombre:<26} p50 {resultado['p50_ms']:8.1f} ms  p95 {resultado['p95_ms']:8.1f} ms  "
+            f"p99 {resultado['p99_ms']:8.1f} ms  {resultado['consultas']:4d} consultas"
+        )
+
+    # ==========================================
+    # LÍNEA BASE
+    # ==========================================
+
+    def _guardar(self, archivo, resultados, options):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.usuario")
+            usuarios = cursor.fetchone()[0]
+        contenido = {
+            'datos': {'usuarios': usuarios, 'preregistros': PreRegistro.objects.count()},
+            'iteraciones': options['iteraciones'],
+            'escenarios': resultados,
+        }
+        archivo.parent.mkdir(parents=True, exist_ok=True)
+        archivo.write_text(json.dumps(contenido, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'\nLínea base guardada en {archivo}'))
+
+    def _comparar(self, archivo, resultados, options):
+        base = json.loads(archivo.read_text(encoding='utf-8'))['escenarios']
+        regresiones = 0
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nComparación con la línea base:'))
+        for nombre, resultado in resultados.items():
+            if nombre not in base:
+                self.stdout.write(f'  {nombre:<26} sin línea base')
+                continue
+
+            p95_base = base[nombre]['p95_ms']
+            limite_p95 = p95_base * (1 + options['tolerancia'])
+            limite_consultas = base[nombre]['consultas'] + options['tolerancia_consultas']
+            variacion = (resultado['p95_ms'] - p95_base) / p95_base * 100 if p95_base else 0.0
+            linea = (
+                f"  {nombre:<26} p95 {p95_base:8.1f} -> {resultado['p95_ms']:8.1f} ms ({variacion:+6.1f}%)  "
+                f"consultas {base[nombre]['consultas']} -> {resultado['consultas']}"
+            )
+
+            if resultado['p95_ms'] > limite_p95 or resultado['consultas'] > limite_consultas:
+                regresiones += 1
+                self.stdout.write(self.style.ERROR(linea + '  REGRESIÓN'))
+            else:
+                self.stdout.write(linea)
+
+        return regresiones
@@ -0,0 +1,346 @@
+import csv
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.utils import timezone
+
+from core.utils import copiar_csv
+
+NOMBRES = [
+    'Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Lucía', 'Jorge', 'Sofía', 'Pedro', 'Camila',
+    'Diego', 'Valeria', 'Miguel', 'Daniela', 'José', 'Gabriela', 'Andrés', 'Paola', 'Fernando', 'Carla',
+]
+APELLIDOS = [
+    'Mamani', 'Quispe', 'Flores', 'Choque', 'Condori', 'Rojas', 'Vargas', 'Gutiérrez', 'López', 'Pérez',
+    'García', 'Fernández', 'Torrez', 'Morales', 'Limachi', 'Apaza', 'Huanca', 'Cruz', 'Rodríguez', 'Ticona',
+]
+ZONAS = ['Sopocachi', 'Miraflores', 'Obrajes', 'Calacoto', 'Villa Fátima', 'San Pedro', 'El Alto', 'Achumani']
+
+# Distribuciones (valor, peso)
+TIPOS_USUARIO = [('U-01', 80), ('U-02', 15), ('U-04', 5)]
+GRADOS_POR_TIPO = {
+    'U-01': [('GA-03', 85), ('GA-04', 15)],
+    'U-02': [('GA-05', 40), ('GA-06', 45), ('GA-07', 15)],
+    'U-04': [('GA-03', 30), ('GA-05', 70)],
+}
+MODALIDADES_POR_TIPO = {
+    'U-01': [('MIE-01', 45), ('MIE-02', 35), ('MIE-03', 5), ('MIE-04', 10), ('MIE-05', 5)],
+    'U-02': [('MID-08', 50), ('MID-09', 20), ('MID-10', 25), ('MID-11', 5)],
+    'U-04': [('MIE-06', 100)],
+}
+ESTADOS_PREREGISTRO = [('PENDIENTE', 10), ('ACTIVO', 60), ('INACTIVO', 10), ('RECHAZADO', 20)]
+ESTADOS_PRESTAMO = [('DEVUELTO', 80), ('ACTIVO', 15), ('VENCIDO', 5)]
+
+COLUMNAS = {
+    'persona': ['id_persona', 'ci', 'nombres', 'paterno', 'materno', 'direccion', 'telefono', 'email',
+                'fecha_nacimiento', 'id_sexo'],
+    'usuario': ['id_usuario', 'id_persona', 'id_tipo_usuario', 'id_modalidad_ingreso', 'id_grado_academico',
+                'id_estado_usuario', 'fecha_registro'],
+    'empleado': ['id_empleado', 'id_persona', 'id_turno', 'id_cargo', 'fecha_contratacion'],
+    'pre_registro': ['id', 'ci', 'nombres', 'paterno', 'materno', 'direccion', 'telefono', 'email',
+                     'fecha_nacimiento', 'id_sexo', 'id_tipo_usuario', 'id_modalidad_ingreso', 'id_grado_academico',
+                     'username', 'password', 'fecha_registro', 'aprobado', 'fecha_aprobacion', 'estado'],
+    'libro': ['id_libro', 'isbn', 'titulo', 'autor', 'id_categoria', 'anio_publicacion', 'ejemplares'],
+    'prestamo': ['id_prestamo', 'id_libro', 'id_usuario', 'id_empleado', 'fecha_prestamo', 'fecha_devolucion',
+                 'fecha_entrega', 'estado'],
+}
+
+# Desplazamientos de semilla por tabla para que cada bloque sea reproducible
+# sin importar el orden en que terminen los hilos
+SEMILLA_TABLA = {'persona': 1, 'usuario': 2, 'empleado': 3, 'pre_registro': 4, 'libro': 5, 'prestamo': 6}
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos de prueba a gran escala (personas, usuarios, empleados, pre-registros, '
+        'libros y préstamos) de forma determinista y los carga con COPY en bloques paralelos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=10000, help='Usuarios a generar (por defecto 10000)')
+        parser.add_argument('--empleados', type=int, default=200, help='Empleados a generar (por defecto 200)')
+        parser.add_argument('--preregistros', type=int, default=2000, help='Pre-registros a generar (por defecto 2000)')
+        parser.add_argument('--libros', type=int, default=5000, help='Libros a generar (por defecto 5000)')
+        parser.add_argument('--prestamos', type=int, default=50000, help='Préstamos a generar (por defecto 50000)')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla aleatoria (por defecto 42)')
+        parser.add_argument('--hilos', type=int, default=4, help='Conexiones paralelas para COPY (por defecto 4)')
+        parser.add_argument('--bloque', type=int, default=20000, help='Filas por bloque de COPY (por defecto 20000)')
+
+    def handle(self, *args, **options):
+        # Usuarios de acceso al sistema (admin / empleado / usuario)
+        call_command('create_test_users', stdout=self.stdout)
+
+        self.semilla = options['semilla']
+        self.hilos = max(1, options['hilos'])
+        self.bloque = max(1, options['bloque'])
+        self.hoy = date.today()
+        inicio = time.perf_counter()
+        total = 0
+
+        n_usuarios = options['usuarios']
+        n_empleados = options['empleados']
+
+        # 1. Personas: primero los usuarios, luego los empleados
+        base_persona = self._siguiente_id('sh_biblioteca.persona', 'id_persona')
+        total += self._cargar('persona', n_usuarios + n_empleados, base_persona, self._filas_persona,
+                              'sh_biblioteca.persona', COLUMNAS['persona'])
+
+        # 2. Usuarios y empleados (dependen de persona)
+        base_usuario = self._siguiente_id('sh_biblioteca.usuario', 'id_usuario')
+        total += self._cargar('usuario', n_usuarios, base_usuario,
+                              lambda rng, ids: self._filas_usuario(rng, ids, base_usuario, base_persona),
+                              'sh_biblioteca.usuario', COLUMNAS['usuario'])
+
+        base_empleado = self._siguiente_id('sh_biblioteca.empleado', 'id_empleado')
+        total += self._cargar('empleado', n_empleados, base_empleado,
+                              lambda rng, ids: self._filas_empleado(rng, ids, base_empleado, base_persona + n_usuarios),
+                              'sh_biblioteca.empleado', COLUMNAS['empleado'])
+
+        # 3. Pre-registros en todos los estados y su historial
+        base_pre = self._siguiente_id('pre_registro', 'id')
+        total += self._cargar('pre_registro', options['preregistros'], base_pre, self._filas_preregistro,
+                              'pre_registro', COLUMNAS['pre_registro'])
+        total += self._historial_preregistros(base_pre)
+
+        # 4. Libros y préstamos (solo si el esquema incluye esas tablas)
+        categorias = self._categorias()
+        if categorias is None:
+            self.stdout.write(self.style.WARNING(
+                'Las tablas libro/prestamo/categoria no existen en sh_biblioteca; se omiten libros y préstamos'
+            ))
+        else:
+            base_libro = self._siguiente_id('sh_biblioteca.libro', 'id_libro')
+            total += self._cargar('libro', options['libros'], base_libro,
+                                  lambda rng, ids: self._filas_libro(rng, ids, categorias),
+                                  'sh_biblioteca.libro', COLUMNAS['libro'])
+
+            if options['libros'] and n_usuarios:
+                base_prestamo = self._siguiente_id('sh_biblioteca.prestamo', 'id_prestamo')
+                rango_libros = (base_libro, options['libros'])
+                rango_usuarios = (base_usuario, n_usuarios)
+                rango_empleados = (base_empleado, n_empleados)
+                total += self._cargar('prestamo', options['prestamos'], base_prestamo,
+                                      lambda rng, ids: self._filas_prestamo(
+                                          rng, ids, rango_libros, rango_usuarios, rango_empleados),
+                                      'sh_biblioteca.prestamo', COLUMNAS['prestamo'])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'\n¡Datos generados! {total} filas en {duracion:.1f} s ({total / duracion if duracion else 0:.0f} filas/s)'
+        ))
+
+    # ==========================================
+    # CARGA PARALELA
+    # ==========================================
+
+    def _siguiente_id(self, tabla, columna):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX({columna}), 0) + 1 FROM {tabla}')
+            return cursor.fetchone()[0]
+
+    def _cargar(self, nombre, cantidad, base, generador, tabla, columnas, opciones=''):
+        """
+        Genera y copia `cantidad` filas en bloques, cada bloque en su propia conexión.
+        La primera columna es la clave primaria, con ids explícitos desde `base`.
+        """
+        if cantidad <= 0:
+            return 0
+
+        inicio = time.perf_counter()
+        bloques = [
+            (indice, range(base + desde, base + min(desde + self.bloque, cantidad)))
+            for indice, desde in enumerate(range(0, cantidad, self.bloque))
+        ]
+
+        def copiar_bloque(bloque):
+            indice, ids = bloque
+            rng = random.Random(self.semilla * 1000003 + SEMILLA_TABLA[nombre] * 10007 + indice)
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(generador(rng, ids))
+            try:
+                with connections['default'].cursor() as cursor:
+                    copiar_csv(
+                        cursor,
+                        f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv{opciones})",
+                        buffer
+                    )
+            finally:
+                connections['default'].close()
+
+        with ThreadPoolExecutor(max_workers=self.hilos) as executor:
+            list(executor.map(copiar_bloque, bloques))
+
+        # Ajustar la secuencia a los ids explícitos
+        columna = columnas[0]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), (SELECT MAX({columna}) FROM {tabla}))",
+                [tabla, columna]
+            )
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(f'  {nombre:<14} {cantidad:>10} filas  {duracion:6.1f} s')
+        return cantidad
+
+    def _categorias(self):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT to_regclass('sh_biblioteca.libro') IS NOT NULL
+                   AND to_regclass('sh_biblioteca.prestamo') IS NOT NULL
+                   AND to_regclass('sh_biblioteca.categoria') IS NOT NULL
+            """)
+            if not cursor.fetchone()[0]:
+                return None
+            cursor.execute('SELECT TRIM(id_categoria) FROM sh_biblioteca.categoria ORDER BY id_categoria')
+            return [row[0] for row in cursor.fetchall()] or None
+
+    # ==========================================
+    # GENERADORES DE FILAS
+    # ==========================================
+
+    def _elegir(self, rng, opciones):
+        valores, pesos = zip(*opciones)
+        return rng.choices(valores, weights=pesos)[0]
+
+    def _fecha_reciente(self, rng, dias_max):
+        """Fecha en el pasado con más densidad en los días recientes"""
+        return self.hoy - timedelta(days=int(dias_max * rng.random() ** 2))
+
+    def _filas_persona(self, rng, ids):
+        for id_persona in ids:
+            nacimiento = self.hoy - timedelta(days=rng.randint(17 * 365, 65 * 365))
+            yield (
+                id_persona,
+                str(10000000 + id_persona),
+                rng.choice(NOMBRES),
+                rng.choice(APELLIDOS),
+                rng.choice(APELLIDOS) if rng.random() < 0.9 else '',
+                f'{rng.choice(ZONAS)} calle {rng.randint(1, 99)} #{rng.randint(1, 2000)}',
+                str(rng.choice((6, 7)) * 10000000 + rng.randint(0, 9999999)),
+                f'p{id_persona}@seed.edu.bo',
+                nacimiento.isoformat(),
+                rng.choice('MF'),
+            )
+
+    def _filas_usuario(self, rng, ids, base_usuario, base_persona):
+        for id_usuario in ids:
+            tipo = self._elegir(rng, TIPOS_USUARIO)
+            yield (
+                id_usuario,
+                base_persona + (id_usuario - base_usuario),
+                tipo,
+                self._elegir(rng, MODALIDADES_POR_TIPO[tipo]),
+                self._elegir(rng, GRADOS_POR_TIPO[tipo]),
+                'EU-01' if rng.random() < 0.95 else 'EU-02',
+                self._fecha_reciente(rng, 5 * 365).isoformat(),
+            )
+
+    def _filas_empleado(self, rng, ids, base_empleado, base_persona):
+        for id_empleado in ids:
+            yield (
+                id_empleado,
+                base_persona + (id_empleado - base_empleado),
+                self._elegir(rng, [('T-01', 45), ('T-02', 40), ('T-03', 15)]),
+                self._elegir(rng, [('C-02', 70), ('C-03', 30)]),
+                self._fecha_reciente(rng, 15 * 365).isoformat(),
+            )
+
+    def _filas_preregistro(self, rng, ids):
+        ahora = timezone.now()
+        for id_pre in ids:
+            tipo = self._elegir(rng, TIPOS_USUARIO)
+            estado = self._elegir(rng, ESTADOS_PREREGISTRO)
+            # Los pendientes son recientes; los resueltos se reparten en el último año
+            registro = ahora - timedelta(minutes=rng.randint(0, 14 * 24 * 60 if estado == 'PENDIENTE' else 365 * 24 * 60))
+            aprobado = estado in ('ACTIVO', 'INACTIVO')
+            aprobacion = registro + timedelta(hours=rng.randint(1, 48)) if aprobado else None
+            yield (
+                id_pre,
+                str(90000000 + id_pre),
+                rng.choice(NOMBRES),
+                rng.choice(APELLIDOS),
+                rng.choice(APELLIDOS),
+                f'{rng.choice(ZONAS)} calle {rng.randint(1, 99)}',
+                str(7 * 10000000 + rng.randint(0, 9999999)),
+                f'r{id_pre}@seed.edu.bo',
+                (self.hoy - timedelta(days=rng.randint(17 * 365, 50 * 365))).isoformat(),
+                rng.choice('MF'),
+                tipo,
+                self._elegir(rng, MODALIDADES_POR_TIPO[tipo]),
+                self._elegir(rng, GRADOS_POR_TIPO[tipo]),
+                f'seed_{id_pre}',
+                'Seed12345',
+                registro.isoformat(),
+                'true' if aprobado else 'false',
+                aprobacion.isoformat() if aprobacion else '',
+                estado,
+            )
+
+    def _historial_preregistros(self, base):
+        """Eventos derivados del estado de cada pre-registro generado, con un INSERT ... SELECT"""
+        inicio = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO preregistro_evento (preregistro_id, ts, tipo, detalle)
+                SELECT id, fecha_aprobacion, 'APROBADO', 'Usuario ID: 0'
+                FROM pre_registro WHERE id >= %(base)s AND aprobado
+                UNION ALL
+                SELECT id, fecha_aprobacion + interval '30 days', 'BLOQUEADO', 'Usuario bloqueado por el administrador'
+                FROM pre_registro WHERE id >= %(base)s AND estado = 'INACTIVO'
+                UNION ALL
+                SELECT id, fecha_registro + interval '1 day', 'RECHAZADO', 'Datos incompletos'
+                FROM pre_registro WHERE id >= %(base)s AND estado = 'RECHAZADO'
+            """, {'base': base})
+            cantidad = cursor.rowcount
+        self.stdout.write(f"  {'historial':<14} {cantidad:>10} filas  {time.perf_counter() - inicio:6.1f} s")
+        return cantidad
+
+    def _filas_libro(self, rng, ids, categorias):
+        for id_libro in ids:
+            yield (
+                id_libro,
+                f'978{id_libro:010d}',
+                f'{rng.choice(["Introducción a", "Manual de", "Fundamentos de", "Tratado de", "Historia de"])} '
+                f'{rng.choice(["Álgebra", "Derecho", "Medicina", "Economía", "Programación", "Química", "Filosofía"])} '
+                f'Vol. {rng.randint(1, 9)}',
+                f'{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}',
+                # Las primeras categorías concentran la mayor parte del catálogo
+                categorias[min(int(rng.paretovariate(1.2)) - 1, len(categorias) - 1)],
+                rng.randint(1960, self.hoy.year),
+                rng.randint(1, 10),
+            )
+
+    def _filas_prestamo(self, rng, ids, rango_libros, rango_usuarios, rango_empleados):
+        base_libro, n_libros = rango_libros
+        base_usuario, n_usuarios = rango_usuarios
+        base_empleado, n_empleados = rango_empleados
+        for id_prestamo in ids:
+            # Popularidad de títulos con cola larga (Pareto)
+            libro = base_libro + min(int(rng.paretovariate(1.1)) - 1, n_libros - 1)
+            estado = self._elegir(rng, ESTADOS_PRESTAMO)
+            if estado == 'DEVUELTO':
+                prestamo = self._fecha_reciente(rng, 3 * 365)
+            elif estado == 'ACTIVO':
+                prestamo = self.hoy - timedelta(days=rng.randint(0, 6))
+            else:
+                prestamo = self.hoy - timedelta(days=rng.randint(8, 90))
+            devolucion = prestamo + timedelta(days=7)
+            entrega = prestamo + timedelta(days=rng.randint(1, 10)) if estado == 'DEVUELTO' else None
+            yield (
+                id_prestamo,
+                libro,
+                base_usuario + rng.randrange(n_usuarios),
+                base_empleado + rng.randrange(n_empleados) if n_empleados else '',
+                prestamo.isoformat(),
+                devolucion.isoformat(),
+                entrega.isoformat() if entrega else '',
+                estado,
+            )
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.test_runner import asegurar_plantilla, clonar_plantilla
+
+class Command(BaseCommand):
+    help = (
+        'Construye la plantilla de la base de datos de pruebas (esquema sh_biblioteca, '
+        'catálogos y migraciones) y opcionalmente la clona en una base de datos nueva'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconstruir', action='store_true',
+                            help='Vuelve a construir la plantilla aunque ya exista')
+        parser.add_argument('--clonar', metavar='NOMBRE',
+                            help='Crea la base de datos NOMBRE como copia de la plantilla (la reemplaza si existe)')
+        parser.add_argument('--database', default='default',
+                            help='Alias de la conexión a usar (por defecto default)')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+
+        inicio = time.perf_counter()
+        plantilla = asegurar_plantilla(connection, reconstruir=options['reconstruir'], verbosity=options['verbosity'])
+        self.stdout.write(f'Plantilla {plantilla} lista en {time.perf_counter() - inicio:.2f} s')
+
+        if options['clonar']:
+            inicio = time.perf_counter()
+            clonar_plantilla(connection, options['clonar'], verbosity=options['verbosity'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Base de datos {options['clonar']} creada en {time.perf_counter() - inicio:.2f} s"
+            ))
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.entrada_preregistros import procesar_lote, tamano_lote
+
+class Command(BaseCommand):
+    help = (
+        'Procesa las solicitudes del pre-registro diferido: verifica unicidad, inserta '
+        'por lotes y avisa a los solicitantes (se pueden ejecutar varios a la vez)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Solicitudes por lote (por defecto PRE_REGISTRO_LOTE)')
+        parser.add_argument('--continuo', action='store_true',
+                            help='Sigue esperando solicitudes nuevas en lugar de terminar')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera con la entrada vacía en modo continuo (por defecto 2)')
+
+    def handle(self, *args, **options):
+        lote = options['lote'] or tamano_lote()
+        total_procesadas = total_descartadas = 0
+        inicio = time.perf_counter()
+
+        try:
+            while True:
+                inicio_lote = time.perf_counter()
+                procesadas, descartadas = procesar_lote(lote)
+
+                if procesadas or descartadas:
+                    total_procesadas += procesadas
+                    total_descartadas += descartadas
+                    duracion = time.perf_counter() - inicio_lote
+                    self.stdout.write(
+                        f'  lote: {procesadas} insertadas, {descartadas} descartadas '
+                        f'({(procesadas + descartadas) / duracion:.0f} solicitudes/s)'
+                    )
+                    continue
+
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_procesadas} pre-registros insertados, {total_descartadas} solicitudes '
+            f'descartadas en {duracion:.2f} s'
+        ))
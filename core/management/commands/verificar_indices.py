@@ -0,0 +1,141 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Consultas frecuentes de la aplicación: (nombre, sql, parámetros, índices esperados).
+# Sin índices esperados la consulta lee la tabla completa a propósito (exportaciones,
+# agregados de todo el padrón) y un Seq Scan es el plan correcto.
+CONSULTAS = [
+    ('telefono_persona (clean_telefono)',
+     "SELECT COUNT(*) FROM sh_biblioteca.persona WHERE telefono = %s", ['70000000'],
+     ['persona_telefono_idx']),
+    ('telefono_preregistro (preregistro_existe)',
+     "SELECT EXISTS (SELECT 1 FROM pre_registro WHERE telefono = %s) "
+     "OR EXISTS (SELECT 1 FROM pre_registro_archivo WHERE telefono = %s)", ['70000000', '70000000'],
+     ['pre_registro_telefono_idx', 'pre_registro_archivo_tel_idx']),
+    ('serie_grafico_usuarios',
+     "SELECT COUNT(*) FILTER (WHERE fecha_registro <= CURRENT_DATE - 30), COUNT(*) FILTER (WHERE fecha_registro <= CURRENT_DATE) "
+     "FROM sh_biblioteca.usuario WHERE id_tipo_usuario = %s", ['U-04'],
+     ['usuario_tipo_fecha_idx']),
+    ('prestamos_activos',
+     "SELECT COUNT(*) FROM sh_biblioteca.prestamo WHERE estado = 'ACTIVO'", [],
+     ['prestamo_estado_idx']),
+    ('ultimos_usuarios_registrados',
+     "SELECT id_usuario FROM sh_biblioteca.usuario ORDER BY fecha_registro DESC LIMIT 50", [],
+     ['usuario_fecha_registro_idx']),
+    ('ultimos_empleados_contratados',
+     "SELECT id_empleado FROM sh_biblioteca.empleado ORDER BY fecha_contratacion DESC LIMIT 50", [],
+     ['empleado_fecha_contratacion_idx']),
+    ('cola_revision (reclamar)',
+     "SELECT id FROM pre_registro WHERE estado = 'PENDIENTE' AND aprobado = false "
+     "ORDER BY fecha_registro LIMIT 20 FOR UPDATE SKIP LOCKED", [],
+     ['pre_registro_cola_idx']),
+    ('historial_preregistro',
+     "SELECT id, ts, tipo, detalle FROM preregistro_evento WHERE preregistro_id = %s ORDER BY ts, id", [1],
+     ['preregistro_evento_pre_ts_idx']),
+    ('usuarios_por_tipo (dashboard)',
+     "SELECT tu.tipo_usuario, COUNT(*) FROM sh_biblioteca.usuario u "
+     "JOIN sh_biblioteca.tipo_usuario tu ON u.id_tipo_usuario = tu.id_tipo_usuario GROUP BY tu.tipo_usuario", [],
+     []),
+    ('exportar_usuarios',
+     "SELECT p.ci, u.fecha_registro FROM sh_biblioteca.persona p "
+     "JOIN sh_biblioteca.usuario u ON p.id_persona = u.id_persona ORDER BY u.fecha_registro DESC", [],
+     []),
+]
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta EXPLAIN sobre las consultas frecuentes, verifica que usen sus índices y '
+        'señala los Seq Scan sobre tablas grandes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-filas', type=int, default=1000,
+                            help='Tablas con menos filas estimadas pueden recorrerse enteras (por defecto 1000)')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Actualiza las estadísticas (ANALYZE) de las tablas antes de verificar')
+        parser.add_argument('--planes', action='store_true',
+                            help='Muestra el plan completo de cada consulta')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            if options['analyze']:
+                for tabla in ('sh_biblioteca.persona', 'sh_biblioteca.usuario', 'sh_biblioteca.empleado',
+                              'sh_biblioteca.prestamo', 'pre_registro', 'pre_registro_archivo', 'preregistro_evento'):
+                    cursor.execute(f'ANALYZE {tabla}')
+
+            invalidos = self._indices_invalidos(cursor)
+            self.stdout.write(self.style.MIGRATE_HEADING('Planes de las consultas frecuentes:'))
+            fallas = []
+            for nombre, sql, params, esperados in CONSULTAS:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                indices, recorridos = set(), []
+                self._recorrer(plan[0]['Plan'], indices, recorridos)
+                problema = self._evaluar(cursor, nombre, esperados, indices, recorridos, options['min_filas'])
+                if problema:
+                    fallas.append(problema)
+                if options['planes']:
+                    cursor.execute(f'EXPLAIN {sql}', params)
+                    for (linea,) in cursor.fetchall():
+                        self.stdout.write(f'      {linea}')
+
+        for indice in invalidos:
+            fallas.append(f'Índice inválido (CREATE INDEX CONCURRENTLY interrumpido): {indice}')
+            self.stdout.write(self.style.ERROR(f'  Índice inválido: {indice}; vuelva a ejecutar migrate'))
+
+        if fallas:
+            raise CommandError(f'{len(fallas)} consultas sin el índice esperado o con Seq Scan sobre tablas grandes')
+        self.stdout.write(self.style.SUCCESS('Todas las consultas frecuentes usan sus índices'))
+
+    def _recorrer(self, nodo, indices, recorridos):
+        if 'Index Name' in nodo:
+            indices.add(nodo['Index Name'])
+        if nodo['Node Type'] == 'Seq Scan':
+            recorridos.append(nodo['Relation Name'])
+        for hijo in nodo.get('Plans', ()):
+            self._recorrer(hijo, indices, recorridos)
+
+    def _filas(self, cursor, tabla):
+        cursor.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(%s)", [tabla])
+        fila = cursor.fetchone()
+        return fila[0] if fila else 0
+
+    def _evaluar(self, cursor, nombre, esperados, indices, recorridos, min_filas):
+        """Imprime el resultado de la consulta y devuelve la falla, o None"""
+        grandes = [tabla for tabla in recorridos if self._filas(cursor, tabla) >= min_filas]
+        faltantes = [indice for indice in esperados if indice not in indices]
+        usados = ', '.join(sorted(indices)) or 'ninguno'
+
+        if not esperados:
+            detalle = f"lectura completa de {', '.join(recorridos)}" if recorridos else f'índices: {usados}'
+            self.stdout.write(f'  {nombre:<44} {self.style.WARNING("COMPLETA")}  {detalle}')
+            return None
+        if not faltantes and not grandes:
+            self.stdout.write(f'  {nombre:<44} {self.style.SUCCESS("OK")}        índices: {usados}')
+            return None
+        if faltantes and recorridos and not grandes:
+            # Una tabla con pocas filas se recorre entera aunque el índice exista
+            pequenas = ', '.join(recorridos) or '-'
+            self.stdout.write(
+                f'  {nombre:<44} {self.style.WARNING("PEQUEÑA")}   Seq Scan sobre {pequenas} '
+                f'(menos de {min_filas} filas); sin usar: {", ".join(faltantes)}'
+            )
+            return None
+
+        detalle = f"Seq Scan sobre {', '.join(grandes)}" if grandes else f"sin usar: {', '.join(faltantes)}"
+        self.stdout.write(f'  {nombre:<44} {self.style.ERROR("FALLA")}     {detalle}; índices: {usados}')
+        return f'{nombre}: {detalle}'
+
+    def _indices_invalidos(self, cursor):
+        cursor.execute("""
+            SELECT n.nspname || '.' || c.relname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE NOT i.indisvalid AND n.nspname IN ('sh_biblioteca', 'public')
+        """)
+        return [fila[0] for fila in cursor.fetchall()]
@@ -0,0 +1,402 @@
+"""
+Middlewares de la aplicación principal.
+
+Todos funcionan en modo síncrono y asíncrono: bajo ASGI un middleware solo síncrono
+obliga a Django a pasar por un hilo el resto de la cadena, incluidas las vistas
+asíncronas del dashboard.
+"""
+import contextlib
+import cProfile
+import hashlib
+import math
+import random
+import time
+from importlib import import_module
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.core import signing
+from django.db import connections
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from . import consultas_lentas, perfilado
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .configuracion import obtener_configuracion, obtener_configuracion_async
+from .replicas import ALIAS_PRINCIPAL, COOKIE_ULTIMA_ESCRITURA, replica_configurada
+
+# Cookie firmada de un superusuario: salta el modo mantenimiento y permite pedir perfiles.
+# Va ligada a la sesión de su login (huella de la clave): al cerrar sesión deja de valer
+COOKIE_BYPASS_MANTENIMIENTO = 'biblioteca_mantenimiento'
+SALT_BYPASS_MANTENIMIENTO = 'core.middleware.mantenimiento'
+
+PAGINAS_NO_DISPONIBLE = {
+    'mantenimiento': {
+        'titulo': 'Sistema en mantenimiento',
+        'mensaje': 'Estamos realizando tareas de mantenimiento. Por favor, vuelve a intentarlo en unos minutos.',
+        'icono': 'fa-tools',
+    },
+    'registro_cerrado': {
+        'titulo': 'Pre-registro deshabilitado',
+        'mensaje': 'El pre-registro público está deshabilitado temporalmente. Consulta en la biblioteca las fechas de apertura.',
+        'icono': 'fa-user-lock',
+    },
+}
+
+class MiddlewareDual:
+    """
+    Base de los middlewares síncronos y asíncronos: ``__call__`` atiende peticiones
+    WSGI y ``__acall__`` las ASGI, según la cadena que reciba el middleware.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.atender(request)
+    
+    async def _responder_con(self, contexto, request):
+        """
+        ``get_response`` con ``contexto`` activo en el hilo donde se ejecuta el código
+        síncrono de la petición. Las conexiones de Django son por hilo: un
+        execute_wrapper instalado en el hilo del event loop no lo ven las vistas
+        síncronas ni los sync_to_async de las asíncronas (todos van al hilo de la
+        petición, ThreadSensitiveContext de ASGIHandler).
+        """
+        await sync_to_async(contexto.__enter__)()
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(contexto.__exit__)(None, None, None)
+
+class EstaticosMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware también en modo asíncrono (WhiteNoise 6 solo es síncrono).
+    Las rutas que no son archivos estáticos siguen sin cambiar de hilo.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+    
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+def _huella_sesion(session_key):
+    return hashlib.sha256(session_key.encode()).hexdigest()[:32]
+
+def marcar_bypass_mantenimiento(response, request):
+    """Agrega la cookie firmada de bypass a la respuesta de login de un superusuario"""
+    user = request.user
+    if user.is_superuser and request.session.session_key:
+        response.set_signed_cookie(
+            COOKIE_BYPASS_MANTENIMIENTO,
+            f'{user.pk}:{_huella_sesion(request.session.session_key)}',
+            salt=SALT_BYPASS_MANTENIMIENTO,
+            max_age=settings.SESSION_COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+def quitar_bypass_mantenimiento(response):
+    """Elimina la cookie de bypass (logout)"""
+    response.delete_cookie(COOKIE_BYPASS_MANTENIMIENTO, samesite='Lax')
+    return response
+
+def superusuario_vigente(request):
+    """
+    True si la cookie de bypass es de la sesión actual y su usuario sigue siendo un
+    superusuario activo. Sin cookie, con otra firma o con otra sesión se descarta sin BD;
+    solo una cookie válida carga la sesión y el usuario (una vez por petición).
+    """
+    if not hasattr(request, '_superusuario_vigente'):
+        request._superusuario_vigente = _verificar_superusuario(request)
+    return request._superusuario_vigente
+
+def _verificar_superusuario(request):
+    try:
+        valor = request.get_signed_cookie(
+            COOKIE_BYPASS_MANTENIMIENTO,
+            salt=SALT_BYPASS_MANTENIMIENTO,
+            max_age=settings.SESSION_COOKIE_AGE,
+        )
+    except (KeyError, signing.BadSignature):
+        return False
+    
+    usuario_id, _, huella = valor.partition(':')
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key or not constant_time_compare(huella, _huella_sesion(session_key)):
+        return False
+    
+    # Sesión cerrada o expirada: la carga devuelve una sesión vacía
+    sesion = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    if str(sesion.get(SESSION_KEY)) != usuario_id:
+        return False
+    return get_user_model()._default_manager.filter(pk=usuario_id, is_active=True, is_superuser=True).exists()
+
+class MantenimientoMiddleware(MiddlewareDual):
+    """
+    Aplica los interruptores 'mantenimiento' y 'registro_publico' de la configuración.
+    Debe ubicarse antes de SessionMiddleware: responde con una página estática
+    pre-renderizada sin tocar sesión, autenticación ni BD. Solo una cookie de bypass
+    válida, en mantenimiento, verifica sesión y usuario (``superusuario_vigente``).
+    """
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._paginas = {}
+        self._rutas = None
+    
+    def atender(self, request):
+        configuracion = obtener_configuracion()
+        bypass = self._requiere_bypass(request, configuracion) and superusuario_vigente(request)
+        no_disponible = self._cerrada(request, configuracion, bypass)
+        return no_disponible or self.get_response(request)
+    
+    async def __acall__(self, request):
+        configuracion = await obtener_configuracion_async()
+        bypass = (
+            self._requiere_bypass(request, configuracion)
+            and COOKIE_BYPASS_MANTENIMIENTO in request.COOKIES
+            and await sync_to_async(superusuario_vigente)(request)
+        )
+        no_disponible = self._cerrada(request, configuracion, bypass)
+        return no_disponible or await self.get_response(request)
+    
+    def _requiere_bypass(self, request, configuracion):
+        """En mantenimiento solo un superusuario pasa, salvo login y archivos estáticos"""
+        if not configuracion['mantenimiento']:
+            return False
+        path = request.path_info
+        return path != self._rutas_exentas()['login'] and not path.startswith(settings.STATIC_URL)
+    
+    def _cerrada(self, request, configuracion, bypass):
+        """Página 503 si un interruptor cierra la ruta pedida, o None"""
+        if self._requiere_bypass(request, configuracion) and not bypass:
+            return self._no_disponible('mantenimiento')
+        
+        if not configuracion['registro_publico'] and request.path_info == self._rutas_exentas()['pre_registro']:
+            return self._no_disponible('registro_cerrado')
+        
+        return None
+    
+    def _rutas_exentas(self):
+        # Se resuelven en la primera petición, cuando el URLconf ya está cargado
+        if self._rutas is None:
+            self._rutas = {
+                'login': reverse('core:login'),
+                'pre_registro': reverse('core:pre_registro'),
+            }
+        return self._rutas
+    
+    def _no_disponible(self, motivo):
+        # La página se renderiza una sola vez por proceso; cada respuesta es un objeto nuevo
+        if motivo not in self._paginas:
+            self._paginas[motivo] = render_to_string(
+                'errors/servicio_no_disponible.html', PAGINAS_NO_DISPONIBLE[motivo]
+            ).encode()
+        
+        return HttpResponse(self._paginas[motivo], status=503, headers={'Cache-Control': 'no-store'})
+
+@contextlib.contextmanager
+def _envoltura(alias, wrapper):
+    """execute_wrapper de la conexión del hilo que entra al contexto (no del que lo crea)"""
+    with connections[alias].execute_wrapper(wrapper):
+        yield
+
+# Sentencias que modifican datos en la base principal
+# (EXECUTE: las sentencias preparadas de core/personas.py, todas de escritura)
+PREFIJOS_ESCRITURA = ('INSERT', 'UPDATE', 'DELETE', 'MERGE', 'COPY', 'TRUNCATE', 'EXECUTE')
+
+class LecturaPropiaMiddleware(MiddlewareDual):
+    """
+    Si la petición escribió en la base principal, marca al cliente con una cookie para que
+    sus lecturas de los siguientes segundos no vayan a la réplica (lectura de lo propio).
+    Sin réplica configurada no instala nada.
+    """
+    
+    def atender(self, request):
+        if not replica_configurada():
+            return self.get_response(request)
+        
+        escrituras = []
+        with connections[ALIAS_PRINCIPAL].execute_wrapper(self._detector(escrituras)):
+            response = self.get_response(request)
+        return self._marcar(response, escrituras)
+    
+    async def __acall__(self, request):
+        if not replica_configurada():
+            return await self.get_response(request)
+        
+        escrituras = []
+        response = await self._responder_con(
+            _envoltura(ALIAS_PRINCIPAL, self._detector(escrituras)), request
+        )
+        return self._marcar(response, escrituras)
+    
+    def _detector(self, escrituras):
+        def detectar_escritura(execute, sql, params, many, context):
+            if not escrituras and sql.lstrip().upper().startswith(PREFIJOS_ESCRITURA):
+                escrituras.append(sql)
+            return execute(sql, params, many, context)
+        return detectar_escritura
+    
+    def _marcar(self, response, escrituras):
+        if escrituras:
+            response.set_cookie(
+                COOKIE_ULTIMA_ESCRITURA,
+                f'{time.time():.3f}',
+                max_age=math.ceil(getattr(settings, 'REPLICA_LECTURA_PROPIA', 5)),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+# Perfilado a pedido: cabecera "X-Perfilar: 1" o parámetro ?perfilar=1
+CABECERA_PERFILADO = 'HTTP_X_PERFILAR'
+PARAMETRO_PERFILADO = 'perfilar'
+
+class PerfiladoMiddleware(MiddlewareDual):
+    """
+    Ejecuta la petición bajo cProfile y guarda el perfil (core/perfilado.py) cuando un
+    superusuario lo pide con la cabecera o el parámetro, o al azar con probabilidad
+    PERFILADO_MUESTREO. El superusuario se reconoce por la cookie de bypass ligada a su
+    sesión (``superusuario_vigente``), que solo se verifica si la petición pide el perfil.
+    Debe ubicarse al principio para medir también el resto de middlewares.
+    Bajo ASGI el perfil cubre el hilo del event loop (también las otras peticiones que
+    avancen mientras tanto) y no el código que la vista ejecuta con sync_to_async.
+    """
+    
+    def atender(self, request):
+        solicitado = self._solicitado(request) and superusuario_vigente(request)
+        motivo = self._motivo(solicitado)
+        perfil = self._iniciar(motivo)
+        if perfil is None:
+            return self.get_response(request)
+        
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            perfil.disable()
+        return self._guardar(perfil, request, response, time.perf_counter() - inicio, motivo)
+    
+    async def __acall__(self, request):
+        solicitado = self._solicitado(request) and await sync_to_async(superusuario_vigente)(request)
+        motivo = self._motivo(solicitado)
+        perfil = self._iniciar(motivo)
+        if perfil is None:
+            return await self.get_response(request)
+        
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perfil.disable()
+        return await sync_to_async(self._guardar)(perfil, request, response, time.perf_counter() - inicio, motivo)
+    
+    def _iniciar(self, motivo):
+        if motivo is None:
+            return None
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Otro perfilador activo en el proceso (p. ej. un depurador)
+            return None
+        return perfil
+    
+    def _guardar(self, perfil, request, response, duracion, motivo):
+        perfil_id = perfilado.guardar(perfil, {
+            'fecha': timezone.now().isoformat(),
+            'metodo': request.method,
+            'ruta': request.path,
+            'estado': response.status_code,
+            'duracion_ms': round(duracion * 1000, 2),
+            'motivo': motivo,
+        })
+        response['X-Perfil-Id'] = perfil_id
+        return response
+    
+    def _solicitado(self, request):
+        return request.META.get(CABECERA_PERFILADO) == '1' or request.GET.get(PARAMETRO_PERFILADO) == '1'
+    
+    def _motivo(self, solicitado):
+        if solicitado:
+            return 'solicitado'
+        
+        tasa = perfilado.tasa_muestreo()
+        if tasa and random.random() < tasa:
+            return 'muestreo'
+        return None
+
+class ConsultasLentasMiddleware(MiddlewareDual):
+    """
+    Registra en core/consultas_lentas.py las sentencias de la petición que superan
+    CONSULTAS_LENTAS_UMBRAL_MS, en todas las bases configuradas, junto con la vista que
+    las ejecutó. Con el umbral en None no instala nada. Las consultas en paralelo del
+    pool asíncrono (core/consultas_async.py) no pasan por las conexiones de Django.
+    """
+    
+    def atender(self, request):
+        umbral = consultas_lentas.umbral_ms()
+        if umbral is None:
+            return self.get_response(request)
+        
+        with self._medidores(request, umbral):
+            return self.get_response(request)
+    
+    async def __acall__(self, request):
+        umbral = consultas_lentas.umbral_ms()
+        if umbral is None:
+            return await self.get_response(request)
+        
+        return await self._responder_con(self._medidores(request, umbral), request)
+    
+    @contextlib.contextmanager
+    def _medidores(self, request, umbral):
+        # Se instalan al entrar al contexto, en la conexión del hilo que entra
+        with contextlib.ExitStack() as pila:
+            for alias in settings.DATABASES:
+                pila.enter_context(connections[alias].execute_wrapper(self._medidor(request, alias, umbral)))
+            yield
+    
+    def _medidor(self, request, alias, umbral):
+        def medir(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duracion_ms = (time.perf_counter() - inicio) * 1000
+                if duracion_ms >= umbral:
+                    # Las consultas de sesión/autenticación ocurren antes de resolver la vista
+                    vista = request.resolver_match.view_name if request.resolver_match else request.path
+                    consultas_lentas.registrar(alias, sql, params, many, duracion_ms, vista)
+        return medir
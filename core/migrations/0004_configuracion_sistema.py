@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_preregistro_estado_preregistro_password_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfiguracionSistema',
+            fields=[
+                ('clave', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Clave')),
+                ('valor', models.JSONField(verbose_name='Valor')),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'configuracion_sistema',
+            },
+        ),
+        migrations.CreateModel(
+            name='VersionConfiguracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'configuracion_version',
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Tablas que alimentan los contadores del dashboard (ver core/eventos.py)
+TABLAS_ESTADISTICAS = ('usuario', 'empleado', 'libro', 'prestamo', 'pre_registro')
+
+CREAR_TRIGGERS = """
+CREATE OR REPLACE FUNCTION sh_biblioteca.notificar_cambio_estadisticas() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('biblioteca_estadisticas', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tabla text;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY[%s] LOOP
+        -- libro/prestamo pueden no existir en instalaciones antiguas
+        IF to_regclass('sh_biblioteca.' || tabla) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS estadisticas_cambio ON sh_biblioteca.%%I', tabla);
+            EXECUTE format(
+                'CREATE TRIGGER estadisticas_cambio AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+                'ON sh_biblioteca.%%I FOR EACH STATEMENT '
+                'EXECUTE FUNCTION sh_biblioteca.notificar_cambio_estadisticas()',
+                tabla
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+""" % ', '.join(f"'{tabla}'" for tabla in TABLAS_ESTADISTICAS)
+
+ELIMINAR_TRIGGERS = """
+DO $$
+DECLARE
+    tabla text;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY[%s] LOOP
+        IF to_regclass('sh_biblioteca.' || tabla) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS estadisticas_cambio ON sh_biblioteca.%%I', tabla);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS sh_biblioteca.notificar_cambio_estadisticas();
+""" % ', '.join(f"'{tabla}'" for tabla in TABLAS_ESTADISTICAS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_configuracion_sistema'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREAR_TRIGGERS, ELIMINAR_TRIGGERS),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Contador de cambios por tabla para las respuestas condicionales (ver core/condicional.py).
+# Lo incrementa el mismo trigger de sentencia que notifica al dashboard; al ser una tabla
+# normal se replica junto con los datos y la réplica nunca adelanta su versión.
+CREAR_VERSION_DATOS = """
+CREATE TABLE IF NOT EXISTS sh_biblioteca.version_datos (
+    tabla varchar(63) PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0,
+    fecha_modificacion timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION sh_biblioteca.notificar_cambio_estadisticas() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sh_biblioteca.version_datos AS v (tabla, version, fecha_modificacion)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = v.version + 1, fecha_modificacion = now();
+    PERFORM pg_notify('biblioteca_estadisticas', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ELIMINAR_VERSION_DATOS = """
+CREATE OR REPLACE FUNCTION sh_biblioteca.notificar_cambio_estadisticas() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('biblioteca_estadisticas', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TABLE IF EXISTS sh_biblioteca.version_datos;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notificar_cambio_estadisticas'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREAR_VERSION_DATOS, ELIMINAR_VERSION_DATOS),
+    ]
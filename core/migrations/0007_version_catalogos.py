@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Catálogos cuyas opciones se muestran en formularios y fragmentos de plantilla cacheados
+TABLAS_CATALOGO = (
+    'sexo', 'tipo_usuario', 'grado_academico', 'modalidad_ingreso',
+    'estado_usuario', 'turno', 'cargo', 'categoria',
+)
+
+CREAR_TRIGGERS = """
+CREATE OR REPLACE FUNCTION sh_biblioteca.incrementar_version_datos() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sh_biblioteca.version_datos AS v (tabla, version, fecha_modificacion)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = v.version + 1, fecha_modificacion = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tabla text;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY[%s] LOOP
+        IF to_regclass('sh_biblioteca.' || tabla) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS version_datos_cambio ON sh_biblioteca.%%I', tabla);
+            EXECUTE format(
+                'CREATE TRIGGER version_datos_cambio AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+                'ON sh_biblioteca.%%I FOR EACH STATEMENT '
+                'EXECUTE FUNCTION sh_biblioteca.incrementar_version_datos()',
+                tabla
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+""" % ', '.join(f"'{tabla}'" for tabla in TABLAS_CATALOGO)
+
+ELIMINAR_TRIGGERS = """
+DO $$
+DECLARE
+    tabla text;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY[%s] LOOP
+        IF to_regclass('sh_biblioteca.' || tabla) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS version_datos_cambio ON sh_biblioteca.%%I', tabla);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS sh_biblioteca.incrementar_version_datos();
+""" % ', '.join(f"'{tabla}'" for tabla in TABLAS_CATALOGO)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_version_datos'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREAR_TRIGGERS, ELIMINAR_TRIGGERS),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_version_catalogos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='preregistro',
+            name='reserva_hasta',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reservado hasta'),
+        ),
+        migrations.AddField(
+            model_name='preregistro',
+            name='revisor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='preregistros_reservados', to=settings.AUTH_USER_MODEL, verbose_name='Revisor'),
+        ),
+        migrations.AddIndex(
+            model_name='preregistro',
+            index=models.Index(condition=models.Q(('aprobado', False), ('estado', 'PENDIENTE')), fields=['fecha_registro'], name='pre_registro_cola_idx'),
+        ),
+    ]
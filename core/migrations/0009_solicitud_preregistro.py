@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:38
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_preregistro_reserva_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitudPreRegistro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datos', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Datos del formulario')),
+                ('fecha_recepcion', models.DateTimeField(auto_now_add=True)),
+                ('estado', models.CharField(choices=[('RECIBIDA', 'Recibida'), ('PROCESADA', 'Procesada'), ('DESCARTADA', 'Descartada')], default='RECIBIDA', max_length=10, verbose_name='Estado')),
+                ('motivo', models.TextField(blank=True, verbose_name='Motivo del descarte')),
+                ('fecha_proceso', models.DateTimeField(blank=True, null=True)),
+                ('preregistro', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='solicitudes', to='core.preregistro')),
+            ],
+            options={
+                'db_table': 'pre_registro_entrada',
+                'indexes': [models.Index(condition=models.Q(('estado', 'RECIBIDA')), fields=['id'], name='pre_registro_entrada_rec_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:41
+
+import re
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Formatos que escribían las vistas en observaciones
+APROBADO = re.compile(r'^Aprobado - (?P<detalle>.*)$')
+RECHAZADO = re.compile(r'^RECHAZADO: (?P<detalle>.*)$')
+MARCA = re.compile(r'^\[(?P<tipo>BLOQUEADO|REACTIVADO)\] (?P<detalle>.*?)(?: - (?P<fecha>\d{2}/\d{2}/\d{4} \d{2}:\d{2}))?$')
+
+LOTE = 2000
+
+def _eventos(preregistro, zona):
+    """(tipo, detalle, ts) de cada línea de observaciones, en orden"""
+    # Las líneas sin fecha toman la última conocida (aprobación o registro como base)
+    ts = preregistro.fecha_aprobacion or preregistro.fecha_registro
+    for linea in preregistro.observaciones.splitlines():
+        linea = linea.strip()
+        if not linea:
+            continue
+        if coincidencia := APROBADO.match(linea):
+            yield 'APROBADO', coincidencia['detalle'], ts
+        elif coincidencia := RECHAZADO.match(linea):
+            yield 'RECHAZADO', coincidencia['detalle'], ts
+        elif coincidencia := MARCA.match(linea):
+            if coincidencia['fecha']:
+                ts = datetime.strptime(coincidencia['fecha'], '%d/%m/%Y %H:%M').replace(tzinfo=zona)
+            else:
+                ts = ts + timedelta(seconds=1)
+            yield coincidencia['tipo'], coincidencia['detalle'], ts
+        else:
+            yield 'NOTA', linea, ts
+
+def historial_desde_observaciones(apps, schema_editor):
+    PreRegistro = apps.get_model('core', 'PreRegistro')
+    EventoPreRegistro = apps.get_model('core', 'EventoPreRegistro')
+    zona = ZoneInfo(settings.TIME_ZONE)
+
+    eventos = []
+    preregistros = (
+        PreRegistro.objects.exclude(observaciones='')
+        .only('id', 'observaciones', 'fecha_registro', 'fecha_aprobacion')
+        .order_by('id')
+    )
+    for preregistro in preregistros.iterator(chunk_size=LOTE):
+        for tipo, detalle, ts in _eventos(preregistro, zona):
+            eventos.append(EventoPreRegistro(preregistro_id=preregistro.id, tipo=tipo, detalle=detalle, ts=ts))
+        if len(eventos) >= LOTE:
+            EventoPreRegistro.objects.bulk_create(eventos)
+            eventos = []
+    EventoPreRegistro.objects.bulk_create(eventos)
+
+def observaciones_desde_historial(apps, schema_editor):
+    PreRegistro = apps.get_model('core', 'PreRegistro')
+    EventoPreRegistro = apps.get_model('core', 'EventoPreRegistro')
+    zona = ZoneInfo(settings.TIME_ZONE)
+
+    lineas = {}
+    for evento in EventoPreRegistro.objects.order_by('preregistro_id', 'ts', 'id').iterator(chunk_size=LOTE):
+        if evento.tipo == 'APROBADO':
+            linea = f'Aprobado - {evento.detalle}'
+        elif evento.tipo == 'RECHAZADO':
+            linea = f'RECHAZADO: {evento.detalle}'
+        elif evento.tipo == 'NOTA':
+            linea = evento.detalle
+        else:
+            linea = f'[{evento.tipo}] {evento.detalle} - {evento.ts.astimezone(zona):%d/%m/%Y %H:%M}'
+        lineas.setdefault(evento.preregistro_id, []).append(linea)
+
+    for preregistro_id, texto in lineas.items():
+        PreRegistro.objects.filter(id=preregistro_id).update(observaciones='\n'.join(texto))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_solicitud_preregistro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoPreRegistro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ts', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('tipo', models.CharField(choices=[('APROBADO', 'Aprobado'), ('RECHAZADO', 'Rechazado'), ('BLOQUEADO', 'Bloqueado'), ('REACTIVADO', 'Reactivado'), ('NOTA', 'Nota')], max_length=10, verbose_name='Tipo')),
+                ('detalle', models.TextField(blank=True, verbose_name='Detalle')),
+                ('preregistro', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='core.preregistro')),
+            ],
+            options={
+                'db_table': 'preregistro_evento',
+                'ordering': ['ts', 'id'],
+                'indexes': [models.Index(fields=['preregistro', 'ts'], name='preregistro_evento_pre_ts_idx')],
+            },
+        ),
+        migrations.RunPython(historial_desde_observaciones, observaciones_desde_historial),
+        migrations.RemoveField(
+            model_name='preregistro',
+            name='observaciones',
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_historial_preregistro'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventopreregistro',
+            name='preregistro',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='core.preregistro'),
+        ),
+        migrations.AlterField(
+            model_name='solicitudpreregistro',
+            name='preregistro',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='solicitudes', to='core.preregistro'),
+        ),
+        migrations.CreateModel(
+            name='PreRegistroArchivo',
+            fields=[
+                ('ci', models.CharField(max_length=15, unique=True, verbose_name='Cédula de Identidad')),
+                ('nombres', models.CharField(max_length=50, verbose_name='Nombres')),
+                ('paterno', models.CharField(blank=True, max_length=50, null=True, verbose_name='Apellido Paterno')),
+                ('materno', models.CharField(blank=True, max_length=50, null=True, verbose_name='Apellido Materno')),
+                ('direccion', models.CharField(blank=True, max_length=100, null=True, verbose_name='Dirección')),
+                ('telefono', models.CharField(blank=True, max_length=15, null=True, verbose_name='Teléfono')),
+                ('email', models.EmailField(blank=True, max_length=30, null=True, unique=True, verbose_name='Correo Electrónico')),
+                ('fecha_nacimiento', models.DateField(blank=True, null=True, verbose_name='Fecha de Nacimiento')),
+                ('id_sexo', models.CharField(choices=[('M', 'Masculino'), ('F', 'Femenino'), ('O', 'Otro')], max_length=2, verbose_name='Sexo')),
+                ('id_tipo_usuario', models.CharField(choices=[('U-01', 'Estudiante'), ('U-02', 'Docente'), ('U-04', 'Invitado')], max_length=4, verbose_name='Tipo de Usuario')),
+                ('id_modalidad_ingreso', models.CharField(blank=True, choices=[('MIE-01', 'Prueba de Suficiencia Académica (PSA)'), ('MIE-02', 'Curso Preuniversitario (CPU)'), ('MIE-03', 'Examen de Dispensación (Excelencia Académica)'), ('MIE-04', 'Transferencia Externa'), ('MIE-05', 'Cambio de Carrera'), ('MIE-06', 'Convenios Especiales'), ('MIE-07', 'Titulados'), ('MID-08', 'Concurso de Méritos y Examen de Competencia'), ('MID-09', 'Interinato (Designación Temporal)'), ('MID-10', 'Contrato Docente'), ('MID-11', 'Titularización por Antigüedad'), ('MID-12', 'Designación Directa (Autoridades)')], max_length=6, null=True, verbose_name='Modalidad de Ingreso')),
+                ('id_grado_academico', models.CharField(blank=True, choices=[('GA-01', 'Primaria'), ('GA-02', 'Secundaria'), ('GA-03', 'Bachillerato'), ('GA-04', 'Técnico'), ('GA-05', 'Licenciatura'), ('GA-06', 'Maestría'), ('GA-07', 'Doctorado')], max_length=5, null=True, verbose_name='Grado Académico')),
+                ('username', models.CharField(default='temp_user', max_length=30, unique=True, verbose_name='Nombre de Usuario')),
+                ('password', models.CharField(default='temp123', max_length=128, verbose_name='Contraseña')),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True)),
+                ('aprobado', models.BooleanField(default=False)),
+                ('fecha_aprobacion', models.DateTimeField(blank=True, null=True)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente de Revisión'), ('ACTIVO', 'Activo'), ('INACTIVO', 'Inactivo'), ('RECHAZADO', 'Rechazado')], default='PENDIENTE', max_length=10, verbose_name='Estado')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha_archivo', models.DateTimeField(auto_now_add=True)),
+                ('revisor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Revisor')),
+            ],
+            options={
+                'db_table': 'pre_registro_archivo',
+                'ordering': ['-fecha_registro'],
+                'indexes': [models.Index(fields=['telefono'], name='pre_registro_archivo_tel_idx')],
+            },
+        ),
+    ]
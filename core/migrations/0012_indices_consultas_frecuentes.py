@@ -0,0 +1,61 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Índices de las tablas no administradas de sh_biblioteca para las consultas frecuentes
+# (verificados con 'manage.py verificar_indices'): nombre, tabla, columnas
+INDICES = (
+    # clean_telefono de los formularios de pre-registro, administrador y empleado
+    ('persona_telefono_idx', 'persona', 'telefono'),
+    # Usuarios por tipo del dashboard y series del gráfico (solo índice)
+    ('usuario_tipo_fecha_idx', 'usuario', 'id_tipo_usuario, fecha_registro'),
+    # Exportación de usuarios ordenada por fecha de registro
+    ('usuario_fecha_registro_idx', 'usuario', 'fecha_registro'),
+    # Préstamos activos del dashboard
+    ('prestamo_estado_idx', 'prestamo', 'estado'),
+    # Exportación de empleados ordenada por fecha de contratación
+    ('empleado_fecha_contratacion_idx', 'empleado', 'fecha_contratacion'),
+)
+
+# Un CREATE INDEX CONCURRENTLY interrumpido deja el índice marcado como inválido, e
+# IF NOT EXISTS no lo reconstruiría
+ELIMINAR_INVALIDO = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'sh_biblioteca' AND c.relname = '{nombre}' AND NOT i.indisvalid
+    ) THEN
+        DROP INDEX sh_biblioteca.{nombre};
+    END IF;
+END;
+$$;
+"""
+
+def _crear_indice(nombre, tabla, columnas):
+    return migrations.RunSQL(
+        sql=[
+            ELIMINAR_INVALIDO.format(nombre=nombre),
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON sh_biblioteca.{tabla} ({columnas})',
+        ],
+        reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS sh_biblioteca.{nombre}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no admite transacciones: las tablas siguen aceptando escrituras
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_pre_registro_archivo'),
+    ]
+
+    operations = [
+        *(_crear_indice(nombre, tabla, columnas) for nombre, tabla, columnas in INDICES),
+        AddIndexConcurrently(
+            model_name='preregistro',
+            index=models.Index(fields=['telefono'], name='pre_registro_telefono_idx'),
+        ),
+    ]
@@ -0,0 +1,127 @@
+from django.db import migrations
+
+# Vistas materializadas de los reportes del superusuario (ver core/reportes.py). Cada una
+# tiene un índice único, requisito de REFRESH MATERIALIZED VIEW CONCURRENTLY, y las
+# actualiza 'manage.py actualizar_reportes'. Las fechas relativas (vencidos, últimos 90
+# días) se evalúan al actualizar.
+VENCIDO = "(p.estado = 'VENCIDO' OR (p.estado = 'ACTIVO' AND p.fecha_devolucion < CURRENT_DATE))"
+
+VISTAS = [
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS sh_biblioteca.reporte_prestamos_categoria_mes AS
+    SELECT date_trunc('month', p.fecha_prestamo)::date AS mes,
+           COALESCE(TRIM(l.id_categoria), '-') AS id_categoria,
+           COALESCE(c.categoria, 'Sin categoría') AS categoria,
+           COUNT(*) AS prestamos,
+           COUNT(*) FILTER (WHERE p.estado = 'DEVUELTO') AS devueltos,
+           COUNT(*) FILTER (WHERE {VENCIDO}) AS vencidos
+    FROM sh_biblioteca.prestamo p
+    JOIN sh_biblioteca.libro l ON l.id_libro = p.id_libro
+    LEFT JOIN sh_biblioteca.categoria c ON c.id_categoria = l.id_categoria
+    GROUP BY 1, 2, 3
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS reporte_prestamos_categoria_mes_uk "
+    "ON sh_biblioteca.reporte_prestamos_categoria_mes (mes, id_categoria)",
+
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS sh_biblioteca.reporte_libros_prestados AS
+    SELECT l.id_libro, l.titulo, l.autor,
+           COALESCE(c.categoria, 'Sin categoría') AS categoria,
+           COUNT(*) AS prestamos,
+           COUNT(*) FILTER (WHERE p.fecha_prestamo >= CURRENT_DATE - 90) AS prestamos_90_dias,
+           MAX(p.fecha_prestamo) AS ultimo_prestamo
+    FROM sh_biblioteca.prestamo p
+    JOIN sh_biblioteca.libro l ON l.id_libro = p.id_libro
+    LEFT JOIN sh_biblioteca.categoria c ON c.id_categoria = l.id_categoria
+    GROUP BY l.id_libro, c.categoria
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS reporte_libros_prestados_uk "
+    "ON sh_biblioteca.reporte_libros_prestados (id_libro)",
+    # Los más prestados se leen con ORDER BY prestamos DESC LIMIT n
+    "CREATE INDEX IF NOT EXISTS reporte_libros_prestados_prestamos_idx "
+    "ON sh_biblioteca.reporte_libros_prestados (prestamos DESC, id_libro)",
+
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS sh_biblioteca.reporte_prestatarios_tipo AS
+    SELECT TRIM(tu.id_tipo_usuario) AS id_tipo_usuario, tu.tipo_usuario,
+           COUNT(DISTINCT p.id_usuario) FILTER (WHERE p.estado = 'ACTIVO') AS prestatarios_activos,
+           COUNT(p.id_prestamo) FILTER (WHERE p.estado = 'ACTIVO') AS prestamos_activos,
+           COUNT(DISTINCT p.id_usuario) FILTER (WHERE {VENCIDO}) AS usuarios_con_vencidos
+    FROM sh_biblioteca.tipo_usuario tu
+    LEFT JOIN sh_biblioteca.usuario u ON u.id_tipo_usuario = tu.id_tipo_usuario
+    LEFT JOIN sh_biblioteca.prestamo p ON p.id_usuario = u.id_usuario
+    GROUP BY tu.id_tipo_usuario, tu.tipo_usuario
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS reporte_prestatarios_tipo_uk "
+    "ON sh_biblioteca.reporte_prestatarios_tipo (id_tipo_usuario)",
+
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS sh_biblioteca.reporte_vencidos_categoria AS
+    SELECT COALESCE(TRIM(l.id_categoria), '-') AS id_categoria,
+           COALESCE(c.categoria, 'Sin categoría') AS categoria,
+           COUNT(*) AS vencidos,
+           COUNT(DISTINCT p.id_usuario) AS usuarios,
+           ROUND(AVG(GREATEST(CURRENT_DATE - p.fecha_devolucion, 0)), 1) AS dias_atraso_promedio,
+           MAX(GREATEST(CURRENT_DATE - p.fecha_devolucion, 0)) AS dias_atraso_maximo
+    FROM sh_biblioteca.prestamo p
+    JOIN sh_biblioteca.libro l ON l.id_libro = p.id_libro
+    LEFT JOIN sh_biblioteca.categoria c ON c.id_categoria = l.id_categoria
+    WHERE {VENCIDO}
+    GROUP BY 1, 2
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS reporte_vencidos_categoria_uk "
+    "ON sh_biblioteca.reporte_vencidos_categoria (id_categoria)",
+]
+
+NOMBRES_VISTAS = (
+    'reporte_prestamos_categoria_mes', 'reporte_libros_prestados',
+    'reporte_prestatarios_tipo', 'reporte_vencidos_categoria',
+)
+
+def _dolar(sentencia):
+    return f'$vista${sentencia.strip()}$vista$'
+
+# Fecha de la última actualización de cada vista ("datos al ..."). Las vistas solo se
+# crean si existen las tablas de préstamos (ver la nota de core/consultas_async.py).
+CREAR_REPORTES = """
+CREATE TABLE IF NOT EXISTS sh_biblioteca.reporte_actualizacion (
+    vista varchar(63) PRIMARY KEY,
+    actualizado_en timestamptz NOT NULL,
+    duracion_ms numeric(12, 1) NOT NULL DEFAULT 0,
+    filas bigint NOT NULL DEFAULT 0
+);
+
+DO $$
+DECLARE
+    sentencia text;
+BEGIN
+    IF to_regclass('sh_biblioteca.prestamo') IS NOT NULL AND to_regclass('sh_biblioteca.libro') IS NOT NULL THEN
+        FOREACH sentencia IN ARRAY ARRAY[%s] LOOP
+            EXECUTE sentencia;
+        END LOOP;
+
+        INSERT INTO sh_biblioteca.reporte_actualizacion (vista, actualizado_en)
+        SELECT unnest(ARRAY[%s]), now()
+        ON CONFLICT (vista) DO NOTHING;
+    END IF;
+END;
+$$;
+""" % (
+    ', '.join(_dolar(sentencia) for sentencia in VISTAS),
+    ', '.join(f"'{vista}'" for vista in NOMBRES_VISTAS),
+)
+
+ELIMINAR_REPORTES = ''.join(
+    f'DROP MATERIALIZED VIEW IF EXISTS sh_biblioteca.{vista};\n' for vista in NOMBRES_VISTAS
+) + 'DROP TABLE IF EXISTS sh_biblioteca.reporte_actualizacion;\n'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREAR_REPORTES, ELIMINAR_REPORTES),
+    ]
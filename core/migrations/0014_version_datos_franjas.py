@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# version_datos tenía una fila por tabla: cada sentencia sobre usuario, prestamo o
+# pre_registro la actualizaba y la dejaba bloqueada hasta el COMMIT, así que todas las
+# transacciones que escriben en una misma tabla se serializaban en esa fila. Ahora cada
+# tabla tiene FRANJAS contadores y cada conexión incrementa el suyo (pid del backend):
+# dos escritores concurrentes solo se esperan si comparten franja. La versión de una
+# tabla es la suma de sus franjas (SQL_VERSION_TABLAS ya suma) y sigue siendo una tabla
+# normal, así que la réplica nunca adelanta su versión.
+#
+# El pg_notify por sentencia de la migración 0005 también se elimina: NOTIFY toma al
+# confirmar un bloqueo global de la cola de notificaciones. El difusor SSE
+# (core/eventos.py) consulta la suma de versiones en su lugar.
+FRANJAS = 32
+
+def _funcion_version(nombre):
+    return f"""
+CREATE OR REPLACE FUNCTION sh_biblioteca.{nombre}() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sh_biblioteca.version_datos AS v (tabla, franja, version, fecha_modificacion)
+    VALUES (TG_TABLE_NAME, pg_backend_pid() % {FRANJAS}, 1, now())
+    ON CONFLICT (tabla, franja) DO UPDATE
+        SET version = v.version + 1, fecha_modificacion = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Las filas existentes quedan como franja 0: la suma (y las ETag emitidas) no cambian
+CREAR_FRANJAS = """
+ALTER TABLE sh_biblioteca.version_datos ADD COLUMN IF NOT EXISTS franja smallint NOT NULL DEFAULT 0;
+ALTER TABLE sh_biblioteca.version_datos DROP CONSTRAINT version_datos_pkey;
+ALTER TABLE sh_biblioteca.version_datos ADD CONSTRAINT version_datos_pkey PRIMARY KEY (tabla, franja);
+""" + _funcion_version('notificar_cambio_estadisticas') + _funcion_version('incrementar_version_datos')
+
+ELIMINAR_FRANJAS = """
+CREATE TEMP TABLE version_datos_total ON COMMIT DROP AS
+    SELECT tabla, SUM(version)::bigint AS version, MAX(fecha_modificacion) AS fecha_modificacion
+    FROM sh_biblioteca.version_datos
+    GROUP BY tabla;
+
+DELETE FROM sh_biblioteca.version_datos;
+ALTER TABLE sh_biblioteca.version_datos DROP CONSTRAINT version_datos_pkey;
+ALTER TABLE sh_biblioteca.version_datos DROP COLUMN franja;
+ALTER TABLE sh_biblioteca.version_datos ADD CONSTRAINT version_datos_pkey PRIMARY KEY (tabla);
+INSERT INTO sh_biblioteca.version_datos (tabla, version, fecha_modificacion)
+    SELECT tabla, version, fecha_modificacion FROM version_datos_total;
+
+CREATE OR REPLACE FUNCTION sh_biblioteca.notificar_cambio_estadisticas() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sh_biblioteca.version_datos AS v (tabla, version, fecha_modificacion)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = v.version + 1, fecha_modificacion = now();
+    PERFORM pg_notify('biblioteca_estadisticas', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sh_biblioteca.incrementar_version_datos() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sh_biblioteca.version_datos AS v (tabla, version, fecha_modificacion)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = v.version + 1, fecha_modificacion = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_reportes_materializados'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREAR_FRANJAS, ELIMINAR_FRANJAS),
+    ]
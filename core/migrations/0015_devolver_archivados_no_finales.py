@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# El archivo solo guarda pre-registros RECHAZADO (estado final). Los ACTIVO archivados
+# antes seguían siendo usuarios que se pueden bloquear o reactivar, y esas acciones solo
+# buscan en pre_registro: vuelven a la tabla con el mismo id (el historial no cambia).
+
+def devolver_no_finales(apps, schema_editor):
+    PreRegistroArchivo = apps.get_model('core', 'PreRegistroArchivo')
+    columnas = ', '.join(
+        campo.column for campo in PreRegistroArchivo._meta.concrete_fields if campo.name != 'fecha_archivo'
+    )
+    schema_editor.execute(f"""
+        WITH devueltos AS (
+            DELETE FROM pre_registro_archivo
+            WHERE estado <> 'RECHAZADO'
+            RETURNING *
+        )
+        INSERT INTO pre_registro ({columnas})
+        SELECT {columnas} FROM devueltos
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_version_datos_franjas'),
+    ]
+
+    operations = [
+        # Sin reversa: volver a archivarlos es tarea de 'manage.py archivar_preregistros'
+        migrations.RunPython(devolver_no_finales, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+# El procesador borra la contraseña de cada solicitud que resuelve; las ya procesadas
+# antes de ese cambio la conservaban en texto plano
+BORRAR_PASSWORD = """
+UPDATE pre_registro_entrada
+SET datos = datos - 'password'
+WHERE estado <> 'RECIBIDA' AND datos ? 'password';
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_devolver_archivados_no_finales'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BORRAR_PASSWORD, migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,7 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 # ========================================
 # MODELOS DE TABLAS CATÁLOGO
@@ -138,7 +141,7 @@ class Empleado(models.Model):
 # MODELO TEMPORAL PARA PRE-REGISTRO
 # ========================================
 
-class PreRegistro(models.Model):
+class DatosPreRegistro(models.Model):
     """Modelo temporal que replica exactamente las tablas persona y usuario para pre-registro"""
     
     TIPO_USUARIO_CHOICES = [
@@ -218,11 +221,147 @@ class PreRegistro(models.Model):
     aprobado = models.BooleanField(default=False)
     fecha_aprobacion = models.DateTimeField(blank=True, null=True)
     estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='PENDIENTE', verbose_name="Estado")
-    observaciones = models.TextField(blank=True)
+    
+    class Meta:
+        abstract = True
+        
+    def __str__(self):
+        return f"{self.nombres} {self.paterno or ''} - {self.get_id_tipo_usuario_display()}"
+
+class PreRegistro(DatosPreRegistro):
+    """Pre-registros en curso y recientes; los resueltos antiguos pasan a PreRegistroArchivo"""
+    
+    # ========================================
+    # RESERVA EN LA COLA DE REVISIÓN (core/cola_revision.py)
+    # ========================================
+    revisor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True,
+        related_name='preregistros_reservados', verbose_name="Revisor"
+    )
+    reserva_hasta = models.DateTimeField(blank=True, null=True, verbose_name="Reservado hasta")
     
     class Meta:
         db_table = 'pre_registro'  # Esta tabla la creará Django
         ordering = ['-fecha_registro']
+        indexes = [
+            # Pendientes en orden de llegada: la consulta que reparte la cola
+            models.Index(
+                fields=['fecha_registro'], name='pre_registro_cola_idx',
+                condition=models.Q(estado='PENDIENTE', aprobado=False),
+            ),
+            # Verificación de teléfono repetido de los formularios
+            models.Index(fields=['telefono'], name='pre_registro_telefono_idx'),
+        ]
+
+class PreRegistroArchivo(DatosPreRegistro):
+    """
+    Pre-registros rechazados movidos fuera de la tabla caliente por
+    ``manage.py archivar_preregistros`` (core/archivo.py). Conservan su id, así que el
+    historial y las solicitudes siguen apuntando a ellos
+    """
+    id = models.BigIntegerField(primary_key=True)
+    revisor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True,
+        related_name='+', verbose_name="Revisor"
+    )
+    fecha_archivo = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'pre_registro_archivo'
+        ordering = ['-fecha_registro']
+        indexes = [
+            # El archivo crece sin límite: la verificación de teléfono no debe recorrerlo entero
+            models.Index(fields=['telefono'], name='pre_registro_archivo_tel_idx'),
+        ]
+
+class EventoPreRegistro(models.Model):
+    """
+    Historial append-only de un pre-registro (core/historial.py). Reemplaza al texto
+    acumulado en observaciones: pre_registro queda angosto y el historial solo se lee
+    en el detalle
+    """
+    
+    TIPO_CHOICES = [
+        ('APROBADO', 'Aprobado'),
+        ('RECHAZADO', 'Rechazado'),
+        ('BLOQUEADO', 'Bloqueado'),
+        ('REACTIVADO', 'Reactivado'),
+        ('NOTA', 'Nota'),
+    ]
+    
+    # Sin restricción en la base de datos: el historial sigue al pre-registro archivado
+    preregistro = models.ForeignKey(
+        PreRegistro, on_delete=models.CASCADE, related_name='eventos', db_index=False, db_constraint=False
+    )
+    ts = models.DateTimeField(default=timezone.now, verbose_name="Fecha")
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, verbose_name="Tipo")
+    detalle = models.TextField(blank=True, verbose_name="Detalle")
+    
+    class Meta:
+        db_table = 'preregistro_evento'
+        ordering = ['ts', 'id']
+        indexes = [
+            # El historial de un pre-registro en orden (cubre también la FK)
+            models.Index(fields=['preregistro', 'ts'], name='preregistro_evento_pre_ts_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.ts:%d/%m/%Y %H:%M})"
+
+class SolicitudPreRegistro(models.Model):
+    """
+    Entrada diferida del pre-registro (core/entrada_preregistros.py): la vista solo guarda
+    los datos ya validados en formato y el procesador los verifica e inserta por lotes
+    """
+    
+    ESTADO_CHOICES = [
+        ('RECIBIDA', 'Recibida'),
+        ('PROCESADA', 'Procesada'),
+        ('DESCARTADA', 'Descartada'),
+    ]
+    
+    datos = models.JSONField(encoder=DjangoJSONEncoder, verbose_name="Datos del formulario")
+    fecha_recepcion = models.DateTimeField(auto_now_add=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='RECIBIDA', verbose_name="Estado")
+    preregistro = models.ForeignKey(
+        PreRegistro, on_delete=models.SET_NULL, blank=True, null=True, related_name='solicitudes',
+        db_constraint=False
+    )
+    motivo = models.TextField(blank=True, verbose_name="Motivo del descarte")
+    fecha_proceso = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'pre_registro_entrada'
+        indexes = [
+            models.Index(fields=['id'], name='pre_registro_entrada_rec_idx', condition=models.Q(estado='RECIBIDA')),
+        ]
+        
+    def __str__(self):
+        return f"Solicitud {self.id} ({self.estado})"
+
+# ========================================
+# CONFIGURACIÓN PERSISTENTE DEL SISTEMA
+# ========================================
+
+class ConfiguracionSistema(models.Model):
+    """Valor de configuración por clave (ver core/configuracion.py para las claves tipadas)"""
+    clave = models.CharField(max_length=50, primary_key=True, verbose_name="Clave")
+    valor = models.JSONField(verbose_name="Valor")
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'configuracion_sistema'
+        
+    def __str__(self):
+        return f"{self.clave} = {self.valor}"
+
+class VersionConfiguracion(models.Model):
+    """Fila única con el contador de versión de la configuración"""
+    version = models.PositiveIntegerField(default=0)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'configuracion_version'
         
     def __str__(self):
-        return f"{self.nombres} {self.paterno or ''} - {self.get_id_tipo_usuario_display()}"
\ No newline at end of file
+        return f"Configuración v{self.version}"
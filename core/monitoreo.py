@@ -0,0 +1,41 @@
+"""
+Métricas de infraestructura para el endpoint de estado del sistema
+"""
+from django.db import connections
+
+def estadisticas_pool(alias='default'):
+    """
+    Métricas del pool de conexiones de psycopg 3 en este proceso.
+    Devuelve None si la conexión no usa pool.
+
+    Los contadores son acumulados desde que el proceso abrió el pool:
+    - ``agotamientos``: solicitudes que encontraron el pool sin conexiones libres y esperaron
+    - ``timeouts``: solicitudes que agotaron ``timeout`` sin obtener conexión
+    """
+    pool = connections[alias].pool
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    tamano = stats.get('pool_size', 0)
+    disponibles = stats.get('pool_available', 0)
+    solicitudes = stats.get('requests_num', 0)
+    en_espera = stats.get('requests_queued', 0)
+    espera_ms = stats.get('requests_wait_ms', 0)
+
+    return {
+        'min': stats.get('pool_min', pool.min_size),
+        'max': stats.get('pool_max', pool.max_size),
+        'tamano': tamano,
+        'en_uso': tamano - disponibles,
+        'disponibles': disponibles,
+        'esperando': stats.get('requests_waiting', 0),
+        'solicitudes': solicitudes,
+        'agotamientos': en_espera,
+        'timeouts': stats.get('requests_errors', 0),
+        'espera_promedio_ms': round(espera_ms / solicitudes, 2) if solicitudes else 0.0,
+        'espera_promedio_agotado_ms': round(espera_ms / en_espera, 2) if en_espera else 0.0,
+        'conexiones_abiertas': stats.get('connections_num', 0),
+        'conexiones_perdidas': stats.get('connections_lost', 0),
+        'devueltas_en_mal_estado': stats.get('returns_bad', 0),
+    }
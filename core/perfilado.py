@@ -0,0 +1,87 @@
+"""
+Perfiles cProfile de peticiones individuales (ver PerfiladoMiddleware).
+
+Cada perfil se guarda en ``PERFILADO_DIRECTORIO`` como ``<id>.prof`` (formato de
+``pstats``, se abre con snakeviz o ``python -m pstats``) junto a ``<id>.json`` con los
+datos de la petición. El directorio es un anillo: al superar ``PERFILADO_MAXIMO``
+perfiles se borran los más antiguos. Varios procesos pueden escribir a la vez; el id
+incluye el pid.
+"""
+import json
+import os
+import pstats
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+# <nanosegundos>-<pid>: ordena por antigüedad y no admite rutas
+FORMATO_ID = re.compile(r'^\d+-\d+$')
+
+def directorio():
+    return Path(getattr(settings, 'PERFILADO_DIRECTORIO', settings.BASE_DIR / 'perfiles'))
+
+def maximo_perfiles():
+    return getattr(settings, 'PERFILADO_MAXIMO', 50)
+
+def tasa_muestreo():
+    return getattr(settings, 'PERFILADO_MUESTREO', 0.0)
+
+def ruta_perfil(perfil_id, extension='prof'):
+    """Ruta del perfil, o None si el id no es válido o ya no existe"""
+    if not FORMATO_ID.match(perfil_id):
+        return None
+    ruta = directorio() / f'{perfil_id}.{extension}'
+    return ruta if ruta.exists() else None
+
+def guardar(perfil, datos):
+    """Guarda el perfil y sus datos, recorta el anillo y devuelve el id"""
+    carpeta = directorio()
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    perfil_id = f'{time.time_ns()}-{os.getpid()}'
+    perfil.dump_stats(carpeta / f'{perfil_id}.prof')
+    stats = pstats.Stats(perfil)
+    datos = {**datos, 'id': perfil_id, 'llamadas': stats.total_calls, 'tiempo_perfilado_ms': round(stats.total_tt * 1000, 2)}
+    # El .json se escribe al final: un perfil sin .json no se lista
+    (carpeta / f'{perfil_id}.json').write_text(json.dumps(datos))
+
+    _recortar(carpeta)
+    return perfil_id
+
+def _recortar(carpeta):
+    ids = sorted((ruta.stem for ruta in carpeta.glob('*.json')), key=lambda perfil_id: int(perfil_id.split('-')[0]))
+    for perfil_id in ids[:-maximo_perfiles()]:
+        for extension in ('json', 'prof'):
+            # Otro proceso puede haberlo borrado ya
+            (carpeta / f'{perfil_id}.{extension}').unlink(missing_ok=True)
+
+def listar():
+    """Datos de los perfiles guardados, del más reciente al más antiguo"""
+    perfiles = []
+    for ruta in directorio().glob('*.json'):
+        try:
+            perfiles.append(json.loads(ruta.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(perfiles, key=lambda datos: int(datos['id'].split('-')[0]), reverse=True)
+
+def funciones_principales(perfil_id, limite=30):
+    """Las ``limite`` funciones con más tiempo acumulado, o None si el perfil no existe"""
+    ruta = ruta_perfil(perfil_id)
+    if ruta is None:
+        return None
+
+    stats = pstats.Stats(str(ruta))
+    filas = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limite]
+    return [
+        {
+            'funcion': pstats.func_std_string(funcion),
+            'llamadas': llamadas_totales,
+            'llamadas_primitivas': llamadas_primitivas,
+            'tiempo_propio_ms': round(tiempo_propio * 1000, 3),
+            'tiempo_acumulado_ms': round(tiempo_acumulado * 1000, 3),
+        }
+        for funcion, (llamadas_primitivas, llamadas_totales, tiempo_propio, tiempo_acumulado, _) in filas
+    ]
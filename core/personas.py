@@ -0,0 +1,105 @@
+"""
+Repositorio de personas: altas compuestas en una sola sentencia.
+
+Cada alta (persona + usuario, persona + empleado, persona + usuario + empleado) es un
+INSERT con CTEs de modificación de datos, así que cuesta un solo viaje a la base de
+datos. Las sentencias se preparan con PREPARE la primera vez que se usan en cada
+conexión y después solo se envía EXECUTE con los parámetros. Un PREPARE sobrevive al
+rollback de la transacción en la que se ejecutó, así que basta con recordarlo por conexión.
+"""
+import weakref
+
+from django.db import connection
+
+# Columnas de persona en el orden de los parámetros $1..$9
+COLUMNAS_PERSONA = (
+    'ci', 'nombres', 'paterno', 'materno', 'direccion',
+    'telefono', 'email', 'fecha_nacimiento', 'id_sexo',
+)
+TIPOS_PERSONA = ('text',) * 7 + ('date', 'text')
+
+_INSERTAR_PERSONA = """
+    INSERT INTO sh_biblioteca.persona
+    (ci, nombres, paterno, materno, direccion, telefono, email, fecha_nacimiento, id_sexo)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id_persona
+"""
+
+# nombre -> (tipos de los parámetros, sentencia)
+SENTENCIAS = {
+    'persona_crear_usuario': (
+        TIPOS_PERSONA + ('text', 'text', 'text', 'text'),
+        f"""
+        WITH p AS ({_INSERTAR_PERSONA})
+        INSERT INTO sh_biblioteca.usuario
+        (id_persona, id_tipo_usuario, id_modalidad_ingreso, id_grado_academico, id_estado_usuario, fecha_registro)
+        SELECT id_persona, $10, $11, $12, $13, CURRENT_DATE FROM p
+        RETURNING id_persona, id_usuario
+        """,
+    ),
+    'persona_crear_empleado': (
+        TIPOS_PERSONA + ('text', 'text', 'date'),
+        f"""
+        WITH p AS ({_INSERTAR_PERSONA})
+        INSERT INTO sh_biblioteca.empleado
+        (id_persona, id_turno, id_cargo, fecha_contratacion)
+        SELECT id_persona, $10, $11, $12 FROM p
+        RETURNING id_persona, id_empleado
+        """,
+    ),
+    'persona_crear_administrador': (
+        TIPOS_PERSONA + ('text', 'text', 'text', 'text', 'text', 'date'),
+        f"""
+        WITH p AS ({_INSERTAR_PERSONA}),
+        u AS (
+            INSERT INTO sh_biblioteca.usuario
+            (id_persona, id_tipo_usuario, id_modalidad_ingreso, id_grado_academico, id_estado_usuario, fecha_registro)
+            SELECT id_persona, 'U-03', $10, $11, $12, CURRENT_DATE FROM p
+            RETURNING id_persona, id_usuario
+        )
+        INSERT INTO sh_biblioteca.empleado
+        (id_persona, id_turno, id_cargo, fecha_contratacion)
+        SELECT id_persona, $13, $14, $15 FROM u
+        RETURNING id_persona, (SELECT id_usuario FROM u), id_empleado
+        """,
+    ),
+}
+
+# Conexión DB-API -> nombres de las sentencias ya preparadas en esa sesión
+_preparadas = weakref.WeakKeyDictionary()
+
+def _ejecutar(nombre, params):
+    with connection.cursor() as cursor:
+        preparadas = _preparadas.setdefault(connection.connection, set())
+        if nombre not in preparadas:
+            tipos, sql = SENTENCIAS[nombre]
+            cursor.execute(f"PREPARE {nombre} ({', '.join(tipos)}) AS {sql}")
+            preparadas.add(nombre)
+        cursor.execute(f"EXECUTE {nombre} ({', '.join(['%s'] * len(params))})", params)
+        return cursor.fetchone()
+
+def _datos_persona(datos):
+    """Parámetros $1..$9 desde un dict (cleaned_data) o un objeto con esos atributos (PreRegistro)"""
+    if isinstance(datos, dict):
+        return [datos.get(columna) for columna in COLUMNAS_PERSONA]
+    return [getattr(datos, columna) for columna in COLUMNAS_PERSONA]
+
+def crear_persona_usuario(datos, id_tipo_usuario, id_modalidad_ingreso, id_grado_academico, id_estado_usuario):
+    """Inserta persona + usuario. Devuelve (id_persona, id_usuario)"""
+    return _ejecutar('persona_crear_usuario', _datos_persona(datos) + [
+        id_tipo_usuario, id_modalidad_ingreso, id_grado_academico, id_estado_usuario,
+    ])
+
+def crear_persona_empleado(datos, id_turno, id_cargo, fecha_contratacion):
+    """Inserta persona + empleado. Devuelve (id_persona, id_empleado)"""
+    return _ejecutar('persona_crear_empleado', _datos_persona(datos) + [
+        id_turno, id_cargo, fecha_contratacion,
+    ])
+
+def crear_persona_administrador(datos, id_modalidad_ingreso, id_grado_academico, id_estado_usuario,
+                                id_turno, id_cargo, fecha_contratacion):
+    """Inserta persona + usuario (tipo U-03) + empleado. Devuelve (id_persona, id_usuario, id_empleado)"""
+    return _ejecutar('persona_crear_administrador', _datos_persona(datos) + [
+        id_modalidad_ingreso, id_grado_academico, id_estado_usuario,
+        id_turno, id_cargo, fecha_contratacion,
+    ])
@@ -0,0 +1,107 @@
+"""
+Precalentamiento de cada proceso del servidor antes de su primera petición.
+
+Lo invocan biblioteca/wsgi.py y biblioteca/asgi.py al cargar la aplicación si
+``PRECALENTAR`` está activo (no AppConfig.ready: también se ejecutaría en cada comando
+de manage.py y Django desaconseja consultar la BD durante la inicialización). Cada paso
+es independiente y un fallo solo se registra: el proceso arranca igual.
+
+Pasos:
+- ``modulos``: importa las vistas y el URLconf, y los módulos de PRECALENTAR_MODULOS
+  (p. ej. pandas/openpyxl de la exportación e importación a Excel)
+- ``base_datos``: abre el pool de conexiones de cada base configurada
+- ``catalogos``: carga la configuración del sistema y la versión de los catálogos
+- ``plantillas``: compila en el cargador en caché todas las plantillas de templates/
+
+El pool asíncrono del dashboard (core/consultas_async.py) pertenece a un event loop y se
+abre con la primera petición ASGI.
+
+Con ``gunicorn --preload`` la aplicación se carga en el proceso maestro antes del fork:
+las conexiones abiertas ahí (y los hilos del pool) no sirven en los workers. Por eso
+gunicorn.conf.py define PRECALENTAR_CONEXIONES_POR_WORKER, la carga solo ejecuta los
+pasos sin conexiones y ``base_datos``/``catalogos`` se ejecutan en cada worker desde el
+hook post_worker_init (``precalentar_worker``).
+"""
+import importlib
+import os
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+def precalentar_activo():
+    return getattr(settings, 'PRECALENTAR', False)
+
+def _modulos():
+    importlib.import_module('core.views')
+    get_resolver().url_patterns
+    for modulo in getattr(settings, 'PRECALENTAR_MODULOS', ()):
+        importlib.import_module(modulo)
+
+def _base_datos():
+    for alias in settings.DATABASES:
+        # La primera conexión crea el pool (min_size conexiones); close() la devuelve
+        connections[alias].ensure_connection()
+        connections[alias].close()
+
+def _catalogos():
+    from .configuracion import obtener_configuracion
+    from .context_processors import version_catalogos
+
+    obtener_configuracion()
+    version_catalogos()
+    connections['default'].close()
+
+def _plantillas():
+    for motor in engines.all():
+        for directorio in motor.dirs:
+            for ruta in sorted(Path(directorio).rglob('*.html')):
+                motor.get_template(ruta.relative_to(directorio).as_posix())
+
+PASOS = (
+    ('modulos', _modulos),
+    ('base_datos', _base_datos),
+    ('catalogos', _catalogos),
+    ('plantillas', _plantillas),
+)
+
+# Pasos que abren conexiones: deben ejecutarse en el proceso que atiende las peticiones
+PASOS_CONEXIONES = ('base_datos', 'catalogos')
+
+def conexiones_por_worker():
+    return os.environ.get('PRECALENTAR_CONEXIONES_POR_WORKER') == '1'
+
+def precalentar(pasos=None):
+    """Ejecuta los pasos indicados (por defecto todos) y devuelve {paso: milisegundos}"""
+    tiempos = {}
+    for nombre, paso in PASOS:
+        if pasos is not None and nombre not in pasos:
+            continue
+        inicio = time.perf_counter()
+        try:
+            paso()
+        except Exception:
+            logger.warning('Precalentamiento: falló el paso %s', nombre, exc_info=True)
+        tiempos[nombre] = round((time.perf_counter() - inicio) * 1000, 1)
+    logger.info('Precalentamiento: %s', ', '.join(f'{nombre} {ms} ms' for nombre, ms in tiempos.items()))
+    return tiempos
+
+def precalentar_si_corresponde():
+    """Al cargar wsgi.py/asgi.py; sin los pasos con conexiones si los ejecuta cada worker"""
+    if not precalentar_activo():
+        return None
+    if conexiones_por_worker():
+        return precalentar([nombre for nombre, _ in PASOS if nombre not in PASOS_CONEXIONES])
+    return precalentar()
+
+def precalentar_worker():
+    """Pasos con conexiones, en cada worker ya creado (hook post_worker_init de gunicorn)"""
+    if precalentar_activo() and conexiones_por_worker():
+        return precalentar(PASOS_CONEXIONES)
+    return None
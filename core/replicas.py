@@ -0,0 +1,140 @@
+"""
+Lecturas en la réplica para dashboards, gráficos y exportaciones.
+
+Las vistas decoradas con ``solo_lectura`` leen de DATABASES['replica'] (ORM por el router
+y SQL crudo con ``conexion_lectura()``), salvo que:
+- el cliente haya escrito en la base principal hace menos de REPLICA_LECTURA_PROPIA segundos, o
+- el retraso de la réplica supere REPLICA_RETRASO_MAXIMO segundos o no responda.
+Sin alias 'replica' configurado todo se resuelve contra 'default'.
+"""
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+ALIAS_PRINCIPAL = 'default'
+ALIAS_REPLICA = 'replica'
+
+# Marca de tiempo de la última escritura del cliente (ver LecturaPropiaMiddleware)
+COOKIE_ULTIMA_ESCRITURA = 'biblioteca_escritura'
+
+_usar_replica = contextvars.ContextVar('usar_replica', default=False)
+
+_estado = {
+    'utilizable': True,
+    'retraso': 0.0,
+    'error': None,
+    'verificado_en': float('-inf'),
+}
+_lock = threading.Lock()
+
+def replica_configurada():
+    return ALIAS_REPLICA in settings.DATABASES
+
+def _medir_retraso():
+    """Segundos de retraso de la réplica; 0 si está al día o no es un standby"""
+    with connections[ALIAS_REPLICA].cursor() as cursor:
+        cursor.execute("""
+            SELECT CASE
+                WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+            END
+        """)
+        return float(cursor.fetchone()[0])
+
+def estado_replica():
+    """
+    Estado de la réplica, verificado como máximo una vez cada
+    REPLICA_INTERVALO_VERIFICACION segundos por proceso.
+    """
+    ahora = time.monotonic()
+    intervalo = getattr(settings, 'REPLICA_INTERVALO_VERIFICACION', 5)
+    if ahora - _estado['verificado_en'] >= intervalo and _lock.acquire(blocking=False):
+        try:
+            try:
+                retraso = _medir_retraso()
+                _estado.update(
+                    utilizable=retraso <= getattr(settings, 'REPLICA_RETRASO_MAXIMO', 10),
+                    retraso=round(retraso, 3),
+                    error=None,
+                )
+            except Exception as e:
+                # Cerrar el pool detiene sus reintentos de conexión en segundo plano
+                connections[ALIAS_REPLICA].close()
+                connections[ALIAS_REPLICA].close_pool()
+                _estado.update(utilizable=False, retraso=None, error=str(e))
+            _estado['verificado_en'] = ahora
+        finally:
+            _lock.release()
+    return {clave: valor for clave, valor in _estado.items() if clave != 'verificado_en'}
+
+def alias_lectura():
+    """Alias desde el que debe leer el código que se está ejecutando"""
+    if _usar_replica.get() and replica_configurada() and estado_replica()['utilizable']:
+        return ALIAS_REPLICA
+    return ALIAS_PRINCIPAL
+
+def conexion_lectura():
+    """Reemplazo de ``django.db.connection`` para SQL crudo de solo lectura"""
+    return connections[alias_lectura()]
+
+@contextlib.contextmanager
+def lectura_en_replica():
+    """Lecturas en la réplica fuera de una vista (p. ej. tareas en segundo plano)"""
+    token = _usar_replica.set(True)
+    try:
+        yield
+    finally:
+        _usar_replica.reset(token)
+
+def escribio_recientemente(request):
+    try:
+        ultima = float(request.COOKIES[COOKIE_ULTIMA_ESCRITURA])
+    except (KeyError, ValueError):
+        return False
+    return time.time() - ultima < getattr(settings, 'REPLICA_LECTURA_PROPIA', 5)
+
+def solo_lectura(vista):
+    """
+    Marca una vista de solo lectura: sus consultas van a la réplica.
+    Debe ser el decorador más interno para que la autenticación siga leyendo de la principal.
+    """
+    if iscoroutinefunction(vista):
+        @functools.wraps(vista)
+        async def envoltura_async(request, *args, **kwargs):
+            token = _usar_replica.set(not escribio_recientemente(request))
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                _usar_replica.reset(token)
+        return envoltura_async
+
+    @functools.wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        token = _usar_replica.set(not escribio_recientemente(request))
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            _usar_replica.reset(token)
+    return envoltura
+
+class ReplicaRouter:
+    """Router de BD: escrituras y migraciones en 'default', lecturas según ``alias_lectura``"""
+
+    def db_for_read(self, model, **hints):
+        return alias_lectura()
+
+    def db_for_write(self, model, **hints):
+        return ALIAS_PRINCIPAL
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == ALIAS_PRINCIPAL
@@ -0,0 +1,157 @@
+"""
+Reportes del superusuario sobre vistas materializadas (migración 0013).
+
+Las vistas resumen el historial de préstamos y se actualizan con
+``REFRESH MATERIALIZED VIEW CONCURRENTLY`` desde ``manage.py actualizar_reportes``
+(programado, p. ej. cada 15 minutos), que anota la fecha en ``reporte_actualizacion``.
+Las lecturas nunca tocan ``prestamo``: su costo depende del tamaño del reporte, no del
+historial, y cada reporte informa la fecha de sus datos.
+"""
+import time
+
+from django.db import connection, transaction
+
+# nombre -> vista, título, columnas (clave, encabezado), orden y filas por defecto (None = todas)
+REPORTES = {
+    'prestamos-categoria-mes': {
+        'vista': 'reporte_prestamos_categoria_mes',
+        'titulo': 'Préstamos por categoría y mes',
+        'columnas': [
+            ('mes', 'Mes'), ('categoria', 'Categoría'), ('prestamos', 'Préstamos'),
+            ('devueltos', 'Devueltos'), ('vencidos', 'Vencidos'),
+        ],
+        'orden': 'mes DESC, prestamos DESC',
+        'limite': None,
+    },
+    'libros-mas-prestados': {
+        'vista': 'reporte_libros_prestados',
+        'titulo': 'Libros más prestados',
+        'columnas': [
+            ('titulo', 'Título'), ('autor', 'Autor'), ('categoria', 'Categoría'),
+            ('prestamos', 'Préstamos'), ('prestamos_90_dias', 'Últimos 90 días'),
+            ('ultimo_prestamo', 'Último préstamo'),
+        ],
+        'orden': 'prestamos DESC, id_libro',
+        'limite': 20,
+    },
+    'prestatarios-por-tipo': {
+        'vista': 'reporte_prestatarios_tipo',
+        'titulo': 'Prestatarios activos por tipo de usuario',
+        'columnas': [
+            ('tipo_usuario', 'Tipo de usuario'), ('prestatarios_activos', 'Prestatarios activos'),
+            ('prestamos_activos', 'Préstamos activos'), ('usuarios_con_vencidos', 'Con vencidos'),
+        ],
+        'orden': 'prestatarios_activos DESC, id_tipo_usuario',
+        'limite': None,
+    },
+    'vencidos-por-categoria': {
+        'vista': 'reporte_vencidos_categoria',
+        'titulo': 'Préstamos vencidos por categoría',
+        'columnas': [
+            ('categoria', 'Categoría'), ('vencidos', 'Vencidos'), ('usuarios', 'Usuarios'),
+            ('dias_atraso_promedio', 'Días de atraso (promedio)'), ('dias_atraso_maximo', 'Días de atraso (máximo)'),
+        ],
+        'orden': 'vencidos DESC, id_categoria',
+        'limite': None,
+    },
+}
+
+# Filtros por rango de meses del reporte mensual (?desde=2025-01&hasta=2025-12)
+FILTROS_MES = {
+    'desde': "mes >= to_date(%s, 'YYYY-MM')",
+    'hasta': "mes <= to_date(%s, 'YYYY-MM')",
+}
+
+MAXIMO_FILAS = 1000
+
+class ReporteNoDisponible(Exception):
+    """Reporte desconocido o cuya vista aún no existe"""
+
+def _reporte(nombre):
+    reporte = REPORTES.get(nombre)
+    if reporte is None:
+        raise ReporteNoDisponible(f'Reporte no válido: {nombre}')
+    return reporte
+
+def disponibles(conexion=connection):
+    """Reportes con su fecha de datos; None en los que aún no tienen vista"""
+    with conexion.cursor() as cursor:
+        cursor.execute("SELECT vista, actualizado_en FROM sh_biblioteca.reporte_actualizacion")
+        fechas = dict(cursor.fetchall())
+    return [
+        {'reporte': nombre, 'titulo': reporte['titulo'], 'actualizado_en': fechas.get(reporte['vista'])}
+        for nombre, reporte in REPORTES.items()
+    ]
+
+def actualizado_en(nombre, conexion=connection):
+    """Fecha de los datos del reporte (una consulta por clave primaria)"""
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            "SELECT actualizado_en FROM sh_biblioteca.reporte_actualizacion WHERE vista = %s",
+            [_reporte(nombre)['vista']],
+        )
+        fila = cursor.fetchone()
+    if fila is None:
+        raise ReporteNoDisponible(f'El reporte {nombre} no está disponible')
+    return fila[0]
+
+def obtener(nombre, limite=None, filtros=None, conexion=connection):
+    """Filas del reporte leídas de su vista materializada, con la fecha de los datos"""
+    reporte = _reporte(nombre)
+    condiciones, params = [], []
+    for clave, valor in (filtros or {}).items():
+        if valor and nombre == 'prestamos-categoria-mes' and clave in FILTROS_MES:
+            condiciones.append(FILTROS_MES[clave])
+            params.append(valor)
+
+    limite = limite or reporte['limite'] or MAXIMO_FILAS
+    columnas = [clave for clave, _ in reporte['columnas']]
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    with conexion.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT {', '.join(columnas)}
+            FROM sh_biblioteca.{reporte['vista']}
+            {donde}
+            ORDER BY {reporte['orden']}
+            LIMIT %s
+        """, [*params, min(limite, MAXIMO_FILAS)])
+        filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    return {
+        'reporte': nombre,
+        'titulo': reporte['titulo'],
+        'columnas': [{'clave': clave, 'titulo': titulo} for clave, titulo in reporte['columnas']],
+        'filas': filas,
+        'actualizado_en': actualizado_en(nombre, conexion),
+    }
+
+# ==========================================
+# ACTUALIZACIÓN (manage.py actualizar_reportes)
+# ==========================================
+
+def actualizar(nombre):
+    """
+    Recalcula la vista del reporte sin bloquear sus lecturas y anota la fecha.
+    Devuelve (filas, milisegundos).
+    """
+    vista = _reporte(nombre)['vista']
+    inicio = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT ispopulated FROM pg_matviews WHERE schemaname = 'sh_biblioteca' AND matviewname = %s", [vista])
+        fila = cursor.fetchone()
+        if fila is None:
+            raise ReporteNoDisponible(f'La vista {vista} no existe (migración 0013)')
+        # CONCURRENTLY exige que la vista ya tenga datos
+        concurrente = 'CONCURRENTLY ' if fila[0] else ''
+        cursor.execute(f'REFRESH MATERIALIZED VIEW {concurrente}sh_biblioteca.{vista}')
+        cursor.execute(f'SELECT COUNT(*) FROM sh_biblioteca.{vista}')
+        filas = cursor.fetchone()[0]
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        # now() es el inicio de la transacción: el instante de los datos recalculados
+        cursor.execute("""
+            INSERT INTO sh_biblioteca.reporte_actualizacion AS r (vista, actualizado_en, duracion_ms, filas)
+            VALUES (%s, now(), %s, %s)
+            ON CONFLICT (vista) DO UPDATE
+                SET actualizado_en = EXCLUDED.actualizado_en, duracion_ms = EXCLUDED.duracion_ms, filas = EXCLUDED.filas
+        """, [vista, round(duracion_ms, 1), filas])
+    return filas, duracion_ms
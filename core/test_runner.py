@@ -0,0 +1,159 @@
+"""
+Base de datos de pruebas a partir de una plantilla.
+
+La plantilla se construye una sola vez con el DDL versionado de sql/sh_biblioteca.sql
+más las migraciones de Django, y cada ejecución de pruebas la clona con
+CREATE DATABASE ... TEMPLATE, que copia los archivos sin volver a ejecutar el DDL.
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.test.runner import DiscoverRunner
+from django.test.utils import get_unique_databases_and_mirrors
+
+ARCHIVO_DDL = Path(settings.BASE_DIR) / 'sql' / 'sh_biblioteca.sql'
+
+def version_plantilla(connection):
+    """
+    Huella del DDL y de las migraciones en disco (nombre y contenido de cada archivo):
+    si cambia cualquiera de los dos se construye una plantilla nueva.
+    """
+    huella = hashlib.sha1(ARCHIVO_DDL.read_bytes())
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for (app_label, nombre), migracion in sorted(loader.disk_migrations.items()):
+        huella.update(f'{app_label}.{nombre}'.encode())
+        # Editar una migración ya existente también debe invalidar la plantilla
+        huella.update(Path(sys.modules[type(migracion).__module__].__file__).read_bytes())
+    return huella.hexdigest()[:10]
+
+def nombre_plantilla(connection):
+    return f"{connection.settings_dict['NAME']}_plantilla_{version_plantilla(connection)}"
+
+def _existe(cursor, nombre):
+    cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", [nombre])
+    return cursor.fetchone() is not None
+
+def _eliminar(cursor, nombre, quote):
+    # Una plantilla no se puede eliminar mientras esté marcada como tal
+    cursor.execute(f"ALTER DATABASE {quote(nombre)} WITH IS_TEMPLATE false ALLOW_CONNECTIONS true")
+    cursor.execute(f"DROP DATABASE {quote(nombre)}")
+
+def _usar_base(connection, nombre):
+    # El pool se crea con el nombre de la base vigente, por eso se cierra al cambiarlo
+    connection.close()
+    connection.close_pool()
+    connection.settings_dict['NAME'] = nombre
+
+def asegurar_plantilla(connection, reconstruir=False, verbosity=1):
+    """
+    Devuelve el nombre de la plantilla, construyéndola si no existe.
+    Las plantillas de versiones anteriores se eliminan.
+    """
+    nombre = nombre_plantilla(connection)
+    prefijo = f"{connection.settings_dict['NAME']}_plantilla_"
+    quote = connection.ops.quote_name
+
+    with connection._nodb_cursor() as cursor:
+        if _existe(cursor, nombre) and not reconstruir:
+            return nombre
+
+        cursor.execute("SELECT datname FROM pg_database WHERE datname LIKE %s", [prefijo + '%'])
+        for (anterior,) in cursor.fetchall():
+            _eliminar(cursor, anterior, quote)
+        cursor.execute(f"CREATE DATABASE {quote(nombre)}")
+
+    if verbosity >= 1:
+        print(f"Construyendo la plantilla '{nombre}'...")
+
+    original = connection.settings_dict['NAME']
+    _usar_base(connection, nombre)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(ARCHIVO_DDL.read_text(encoding='utf-8'))
+        # Nueva conexión para que el search_path vuelva al de la configuración
+        _usar_base(connection, nombre)
+        call_command('migrate', verbosity=max(verbosity - 1, 0), interactive=False, database=connection.alias)
+    except Exception:
+        _usar_base(connection, original)
+        with connection._nodb_cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS {quote(nombre)}")
+        raise
+    _usar_base(connection, original)
+
+    # Sin conexiones permitidas nadie puede bloquear la clonación
+    with connection._nodb_cursor() as cursor:
+        cursor.execute(f"ALTER DATABASE {quote(nombre)} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false")
+
+    return nombre
+
+def clonar_plantilla(connection, destino, reconstruir=False, verbosity=1):
+    """Crea (o reemplaza) la base de datos ``destino`` como copia de la plantilla"""
+    plantilla = asegurar_plantilla(connection, reconstruir=reconstruir, verbosity=verbosity)
+    quote = connection.ops.quote_name
+    with connection._nodb_cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {quote(destino)}")
+        cursor.execute(f"CREATE DATABASE {quote(destino)} TEMPLATE {quote(plantilla)}")
+    return plantilla
+
+class BibliotecaTestRunner(DiscoverRunner):
+    """
+    Runner de pruebas que crea la base de datos de pruebas clonando la plantilla
+    en lugar de ejecutar el DDL y las migraciones en cada ejecución.
+    """
+
+    def setup_databases(self, **kwargs):
+        aliases = kwargs.get('aliases', connections)
+        serialized_aliases = kwargs.get('serialized_aliases')
+        test_databases, mirrored_aliases = get_unique_databases_and_mirrors(aliases)
+        old_config = []
+        serialize_connections = []
+
+        for db_name, aliases_db in test_databases.values():
+            first_alias = None
+            for alias in aliases_db:
+                connection = connections[alias]
+                old_config.append((connection, db_name, first_alias is None))
+
+                if first_alias is None:
+                    first_alias = alias
+                    test_name = connection.creation._get_test_db_name()
+                    with self.time_keeper.timed(f"  Clonando '{alias}'"):
+                        if self.keepdb:
+                            with connection._nodb_cursor() as cursor:
+                                clonar = not _existe(cursor, test_name)
+                        else:
+                            clonar = True
+                        if clonar:
+                            clonar_plantilla(connection, test_name, verbosity=self.verbosity)
+
+                    _usar_base(connection, test_name)
+                    settings.DATABASES[alias]['NAME'] = test_name
+                    connection.ensure_connection()
+                    if serialized_aliases is None or alias in serialized_aliases:
+                        serialize_connections.append(connection)
+
+                    if self.parallel > 1:
+                        for index in range(self.parallel):
+                            with self.time_keeper.timed(f"  Clonando '{alias}' ({index + 1})"):
+                                connection.creation.clone_test_db(
+                                    suffix=str(index + 1), verbosity=self.verbosity, keepdb=self.keepdb,
+                                )
+                else:
+                    connection.creation.set_as_test_mirror(connections[first_alias].settings_dict)
+
+        for alias, mirror_alias in mirrored_aliases.items():
+            connections[alias].creation.set_as_test_mirror(connections[mirror_alias].settings_dict)
+
+        for connection in serialize_connections:
+            connection._test_serialized_contents = connection.creation.serialize_db_to_string()
+
+        if self.debug_sql:
+            for alias in connections:
+                connections[alias].force_debug_cursor = True
+
+        return old_config
@@ -1,3 +1,894 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core import mail
+from django.db import DatabaseError, connection
+from django.http import HttpResponse, JsonResponse
+from django.test import AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+
+from . import consultas_lentas, precalentamiento, replicas, reportes
+from .entrada_preregistros import procesar_lote, recibir
+from .eventos import DifusorEstadisticas
+from .archivo import archivar_lote, preregistro_existe
+from .cola_revision import reclamar
+from .condicional import VersionNoDisponible, respuesta_condicional
+from .configuracion import (
+    ValorConfiguracionInvalido, _convertir, guardar_configuracion, invalidar_cache, obtener_configuracion
+)
+from .historial import historial, registrar as registrar_evento
+from .importacion import importar_usuarios
+from .forms import PreRegistroForm
+from .middleware import COOKIE_BYPASS_MANTENIMIENTO
+from .models import (
+    ConfiguracionSistema, PreRegistro, PreRegistroArchivo, SolicitudPreRegistro, VersionConfiguracion
+)
+from .replicas import COOKIE_ULTIMA_ESCRITURA
+
+def _preregistro(numero, **campos):
+    datos = {
+        'ci': f'2000{numero:04d}', 'nombres': f'Solicitante {numero}', 'email': f'sol{numero}@correo.com',
+        'id_sexo': 'F', 'id_tipo_usuario': 'U-01', 'username': f'sol{numero}',
+    }
+    datos.update(campos)
+    return PreRegistro.objects.create(**datos)
+
+# ==========================================
+# CONFIGURACIÓN DEL SISTEMA
+# ==========================================
+
+class ConfiguracionTests(TestCase):
+
+    def setUp(self):
+        invalidar_cache()
+        self.addCleanup(invalidar_cache)
+
+    def test_otro_proceso_se_detecta_por_la_version(self):
+        self.assertEqual(obtener_configuracion()['max_libros_usuario'], 3)
+        # Escritura de otro proceso: valor nuevo y versión incrementada, sin tocar esta caché
+        ConfiguracionSistema.objects.create(clave='max_libros_usuario', valor=5)
+        VersionConfiguracion.objects.update_or_create(pk=1, defaults={'version': 41})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_configuracion()['max_libros_usuario'], 3)
+
+        invalidar_cache()
+        self.assertEqual(obtener_configuracion()['max_libros_usuario'], 5)
+
+        # Misma versión: solo se consulta la versión, no los valores
+        invalidar_cache()
+        with CaptureQueriesContext(connection) as consultas:
+            obtener_configuracion()
+        sentencias = [consulta['sql'] for consulta in consultas if 'SAVEPOINT' not in consulta['sql']]
+        self.assertEqual(len(sentencias), 1)
+        self.assertIn('configuracion_version', sentencias[0])
+
+    def test_guardar_se_ve_de_inmediato(self):
+        obtener_configuracion()
+
+        guardar_configuracion({'multa_por_dia': '3.5'}, ['multa_por_dia'])
+
+        self.assertEqual(obtener_configuracion()['multa_por_dia'], 3.5)
+
+    def test_conversion(self):
+        self.assertIs(_convertir('mantenimiento', 'on'), True)
+        self.assertIs(_convertir('mantenimiento', 'no'), False)
+        self.assertEqual(_convertir('max_libros_usuario', '4'), 4)
+        self.assertEqual(_convertir('multa_por_dia', 2), 2.0)
+        self.assertEqual(_convertir('nombre_sistema', ' Biblioteca '), 'Biblioteca')
+        for clave, valor in (('multa_por_dia', None), ('multa_por_dia', ''), ('multa_por_dia', 'nan'),
+                             ('max_libros_usuario', 'tres'), ('nombre_sistema', None)):
+            with self.assertRaises(ValorConfiguracionInvalido):
+                _convertir(clave, valor)
+
+    def test_valor_invalido_responde_400_sin_guardar(self):
+        self.client.force_login(User.objects.create_superuser('director', password='x'))
+
+        respuesta = self.client.post(
+            '/superuser/api/configuracion-sistema/',
+            json.dumps({'multa_por_dia': None, 'max_libros_usuario': 4}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['campo'], 'multa_por_dia')
+        self.assertFalse(ConfiguracionSistema.objects.exists())
+
+    def test_error_de_bd_no_aborta_la_transaccion(self):
+        def tabla_inexistente(execute, sql, params, many, context):
+            if 'configuracion_version' in sql:
+                return execute('SELECT version FROM configuracion_inexistente', None, many, context)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(tabla_inexistente):
+            self.assertEqual(obtener_configuracion()['max_libros_usuario'], 3)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+# ==========================================
+# IMPORTACIÓN MASIVA DE USUARIOS
+# ==========================================
+
+def _csv(*filas):
+    encabezado = 'ci,nombres,paterno,email,id_sexo,id_tipo_usuario\n'
+    return io.BytesIO((encabezado + ''.join(f'{fila}\n' for fila in filas)).encode())
+
+class ImportacionUsuariosTests(TestCase):
+
+    def _usuarios_por_ci(self, ci):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT COUNT(*) FROM sh_biblioteca.usuario u
+                JOIN sh_biblioteca.persona p ON p.id_persona = u.id_persona
+                WHERE p.ci = %s
+            """, [ci])
+            return cursor.fetchone()[0]
+
+    def test_importa_filas_validas(self):
+        resultado = importar_usuarios(_csv(
+            '10000001,Ana,Pérez,ana@correo.com,F,U-01',
+            '10000002,Luis,Rojas,,M,U-02',
+        ), 'usuarios.csv')
+
+        self.assertEqual(resultado['total'], 2)
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual(resultado['rechazados'], [])
+        self.assertEqual(self._usuarios_por_ci('10000001'), 1)
+
+    def test_ci_duplicado_en_el_archivo_inserta_un_solo_usuario(self):
+        resultado = importar_usuarios(_csv(
+            '10000001,Ana,Pérez,ana@correo.com,F,U-01',
+            '10000001,Ana,Copia,copia@correo.com,F,U-01',
+            '10000002,Luis,Rojas,,M,U-02',
+        ), 'usuarios.csv')
+
+        self.assertEqual(resultado['total'], 3)
+        self.assertEqual(resultado['insertados'], 2)
+        self.assertEqual(resultado['validos'], 2)
+        self.assertEqual(
+            [(r['fila'], r['motivo']) for r in resultado['rechazados']],
+            [(3, 'CI duplicado en el archivo')],
+        )
+        self.assertEqual(self._usuarios_por_ci('10000001'), 1)
+
+    def test_solo_validar_no_inserta(self):
+        resultado = importar_usuarios(_csv('10000001,Ana,Pérez,,F,U-03'), 'usuarios.csv', solo_validar=True)
+
+        self.assertEqual(resultado['insertados'], 0)
+        self.assertEqual(resultado['rechazados'][0]['motivo'], 'Tipo de usuario no permitido')
+        self.assertEqual(self._usuarios_por_ci('10000001'), 0)
+
+# ==========================================
+# ENTRADA DIFERIDA DE PRE-REGISTROS
+# ==========================================
+
+def _solicitud(numero, **campos):
+    datos = {
+        'ci': f'3000{numero:04d}', 'nombres': f'Postulante {numero}', 'email': f'pos{numero}@correo.com',
+        'id_sexo': 'M', 'id_tipo_usuario': 'U-01', 'username': f'pos{numero}', 'password': 'Clave1234',
+    }
+    datos.update(campos)
+    return recibir(datos)
+
+class ProcesarLoteTests(TestCase):
+
+    def test_solicitud_aceptada(self):
+        solicitud = _solicitud(1)
+
+        self.assertEqual(procesar_lote(), (1, 0))
+
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.estado, 'PROCESADA')
+        self.assertEqual(solicitud.preregistro.ci, '30000001')
+        self.assertEqual(solicitud.preregistro.password, 'Clave1234')
+        self.assertNotIn('password', solicitud.datos)
+        self.assertEqual(mail.outbox[0].to, ['pos1@correo.com'])
+
+    def test_duplicados_contra_las_tablas_y_en_el_lote(self):
+        _preregistro(1, ci='30000001')
+        contra_tabla = _solicitud(1)
+        primera = _solicitud(2, email='repetido@correo.com')
+        repetida = _solicitud(3, email='repetido@correo.com')
+
+        self.assertEqual(procesar_lote(), (1, 2))
+
+        estados = {s.id: (s.estado, s.motivo) for s in SolicitudPreRegistro.objects.all()}
+        self.assertEqual(estados[contra_tabla.id], ('DESCARTADA', 'La cédula de identidad ya está registrada.'))
+        self.assertEqual(estados[primera.id], ('PROCESADA', ''))
+        self.assertEqual(
+            estados[repetida.id],
+            ('DESCARTADA', 'El correo electrónico ya está registrado. (solicitud duplicada)'),
+        )
+        self.assertFalse(SolicitudPreRegistro.objects.filter(datos__has_key='password').exists())
+
+    def test_insercion_fila_por_fila_si_el_lote_falla(self):
+        # Un pre-registro insertado entre la verificación y el INSERT, y datos incompletos
+        _preregistro(1, username='pos1')
+        concurrente = _solicitud(1)
+        incompleta = _solicitud(2, id_sexo=None)
+        valida = _solicitud(3)
+
+        with mock.patch('core.entrada_preregistros._existentes', return_value={
+            columna: set() for columna in ('ci', 'email', 'telefono', 'username')
+        }):
+            self.assertEqual(procesar_lote(), (1, 2))
+
+        for solicitud in (concurrente, incompleta):
+            solicitud.refresh_from_db()
+            self.assertEqual((solicitud.estado, solicitud.motivo), ('DESCARTADA', 'Los datos ya están registrados.'))
+            self.assertIsNone(solicitud.preregistro)
+        valida.refresh_from_db()
+        self.assertEqual(valida.preregistro.ci, '30000003')
+
+# ==========================================
+# COLA DE REVISIÓN
+# ==========================================
+
+class ColaRevisionTests(TestCase):
+
+    def setUp(self):
+        self.revisor = User.objects.create_user('revisor', password='x', is_staff=True)
+        self.otro_revisor = User.objects.create_user('otro_revisor', password='x', is_staff=True)
+        self.pendientes = [_preregistro(numero) for numero in range(4)]
+
+    def _reclamar(self, usuario, cantidad):
+        self.client.force_login(usuario)
+        return self.client.post(
+            '/gestionar-preregistros/reclamar/', json.dumps({'cantidad': cantidad}), content_type='application/json'
+        )
+
+    def test_revisores_reciben_filas_distintas(self):
+        primeros = {item['id'] for item in self._reclamar(self.revisor, 2).json()['preregistros']}
+        segundos = {item['id'] for item in self._reclamar(self.otro_revisor, 2).json()['preregistros']}
+
+        self.assertEqual(len(primeros), 2)
+        self.assertEqual(len(segundos), 2)
+        self.assertFalse(primeros & segundos)
+
+    def test_reserva_vencida_vuelve_a_la_cola(self):
+        reservados = reclamar(self.revisor, 4)
+        # now() en SQL es el inicio de la transacción de la prueba
+        PreRegistro.objects.filter(id=reservados[0].id).update(reserva_hasta=timezone.now() - timedelta(hours=1))
+
+        recuperados = reclamar(self.otro_revisor, 4)
+
+        self.assertEqual([preregistro.id for preregistro in recuperados], [reservados[0].id])
+
+    def test_liberar_devuelve_las_reservas(self):
+        reclamar(self.revisor, 4)
+        self.client.force_login(self.revisor)
+        respuesta = self.client.post('/gestionar-preregistros/liberar/', '{}', content_type='application/json')
+
+        self.assertEqual(respuesta.json()['liberados'], 4)
+        self.assertEqual(len(reclamar(self.otro_revisor, 4)), 4)
+
+    def test_rechazo_envia_el_correo_al_confirmar(self):
+        preregistro = self.pendientes[0]
+        self.client.force_login(self.revisor)
+        with self.captureOnCommitCallbacks() as callbacks:
+            respuesta = self.client.post(
+                f'/rechazar-preregistro/{preregistro.id}/', json.dumps({'motivo': 'CI ilegible'}),
+                content_type='application/json',
+            )
+            self.assertEqual(mail.outbox, [])
+
+        self.assertTrue(respuesta.json()['success'])
+        self.assertEqual(PreRegistro.objects.get(id=preregistro.id).estado, 'RECHAZADO')
+        for callback in callbacks:
+            callback()
+        self.assertEqual([mensaje.to for mensaje in mail.outbox], [[preregistro.email]])
+
+    def test_aprobacion_envia_el_correo_al_confirmar(self):
+        preregistro = self.pendientes[0]
+        self.client.force_login(self.revisor)
+        with self.captureOnCommitCallbacks() as callbacks:
+            respuesta = self.client.post(f'/aprobar-preregistro/{preregistro.id}/')
+            self.assertEqual(mail.outbox, [])
+
+        self.assertTrue(respuesta.json()['success'])
+        for callback in callbacks:
+            callback()
+        self.assertEqual([mensaje.to for mensaje in mail.outbox], [[preregistro.email]])
+
+    def test_usuario_sin_permisos_no_reclama(self):
+        usuario = User.objects.create_user('lector', password='x')
+        respuesta = self._reclamar(usuario, 4)
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertFalse(PreRegistro.objects.filter(revisor__isnull=False).exists())
+        respuesta = self.client.post('/gestionar-preregistros/liberar/', '{}', content_type='application/json')
+        self.assertEqual(respuesta.status_code, 302)
+
+# ==========================================
+# CAMBIOS DE ESTADO MASIVOS
+# ==========================================
+
+class TransicionMasivaTests(TestCase):
+
+    def setUp(self):
+        self.empleado = User.objects.create_user('empleado', password='x', is_staff=True)
+        self.estudiante_enero = _preregistro(1)
+        self.estudiante_marzo = _preregistro(2)
+        self.docente_enero = _preregistro(3, id_tipo_usuario='U-02')
+        self.activo_enero = _preregistro(4, estado='ACTIVO', aprobado=True)
+        # fecha_registro es auto_now_add: se ajusta después de crear
+        PreRegistro.objects.filter(id__in=[self.estudiante_enero.id, self.docente_enero.id, self.activo_enero.id]) \
+            .update(fecha_registro=timezone.make_aware(timezone.datetime(2025, 1, 15, 10)))
+        PreRegistro.objects.filter(id=self.estudiante_marzo.id) \
+            .update(fecha_registro=timezone.make_aware(timezone.datetime(2025, 3, 15, 10)))
+
+    def _transicion(self, accion, datos, usuario=None):
+        self.client.force_login(usuario or self.empleado)
+        return self.client.post(
+            f'/gestionar-preregistros/masivo/{accion}/', json.dumps(datos), content_type='application/json'
+        )
+
+    def _estado(self, preregistro):
+        return PreRegistro.objects.get(id=preregistro.id).estado
+
+    def test_rechazo_por_filtro_de_tipo_y_fechas(self):
+        respuesta = self._transicion('rechazar', {
+            'filtro': {'id_tipo_usuario': 'U-01', 'registrado_desde': '2025-01-01', 'registrado_hasta': '2025-01-31'},
+            'motivo': 'Documentación incompleta',
+        })
+
+        self.assertEqual(respuesta.json()['ids'], [self.estudiante_enero.id])
+        self.assertEqual(self._estado(self.estudiante_enero), 'RECHAZADO')
+        self.assertEqual(self._estado(self.estudiante_marzo), 'PENDIENTE')
+        self.assertEqual(self._estado(self.docente_enero), 'PENDIENTE')
+        self.assertEqual([mensaje.to for mensaje in mail.outbox], [[self.estudiante_enero.email]])
+        self.assertEqual(
+            [(evento['tipo'], evento['detalle']) for evento in historial(self.estudiante_enero.id)],
+            [('RECHAZADO', 'Documentación incompleta')],
+        )
+
+    def test_omite_filas_fuera_del_estado_de_origen(self):
+        respuesta = self._transicion('bloquear', {'ids': [self.activo_enero.id, self.estudiante_enero.id]}).json()
+
+        self.assertEqual(respuesta['ids'], [self.activo_enero.id])
+        self.assertEqual(respuesta['omitidos'], [self.estudiante_enero.id])
+        self.assertEqual(self._estado(self.activo_enero), 'INACTIVO')
+        self.assertEqual(self._estado(self.estudiante_enero), 'PENDIENTE')
+
+    def test_filtro_desconocido(self):
+        respuesta = self._transicion('rechazar', {'filtro': {'ci': '1'}})
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(PreRegistro.objects.filter(estado='RECHAZADO').count(), 0)
+
+    def test_usuario_sin_permisos(self):
+        usuario = User.objects.create_user('lector', password='x')
+        respuesta = self._transicion('rechazar', {'filtro': {'id_tipo_usuario': 'U-01'}}, usuario)
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(PreRegistro.objects.filter(estado='RECHAZADO').count(), 0)
+        self.assertEqual(mail.outbox, [])
+
+# ==========================================
+# HISTORIAL DE PRE-REGISTROS
+# ==========================================
+
+class HistorialPreRegistroTests(TestCase):
+
+    def test_eventos_desde_observaciones(self):
+        # Conversión de la migración 0010 del texto que escribían las vistas antes del historial
+        migracion = importlib.import_module('core.migrations.0010_historial_preregistro')
+        zona = ZoneInfo('America/La_Paz')
+        aprobado = datetime(2025, 2, 1, 9, 0, tzinfo=zona)
+        preregistro = SimpleNamespace(
+            fecha_registro=aprobado - timedelta(days=1),
+            fecha_aprobacion=aprobado,
+            observaciones=(
+                'Aprobado - Usuario ID: 42\n'
+                '[BLOQUEADO] Deuda pendiente - 03/02/2025 10:30\n'
+                '\n'
+                '[REACTIVADO] Usuario reactivado\n'
+                'Llamar antes de entregar el carnet'
+            ),
+        )
+
+        self.assertEqual(list(migracion._eventos(preregistro, zona)), [
+            ('APROBADO', 'Usuario ID: 42', aprobado),
+            ('BLOQUEADO', 'Deuda pendiente', datetime(2025, 2, 3, 10, 30, tzinfo=zona)),
+            ('REACTIVADO', 'Usuario reactivado', datetime(2025, 2, 3, 10, 30, 1, tzinfo=zona)),
+            ('NOTA', 'Llamar antes de entregar el carnet', datetime(2025, 2, 3, 10, 30, 1, tzinfo=zona)),
+        ])
+
+    def test_historial_solo_para_personal(self):
+        preregistro = _preregistro(1)
+        registrar_evento(preregistro.id, 'NOTA', 'Documentos en revisión')
+        ruta = f'/gestionar-preregistros/{preregistro.id}/historial/'
+
+        self.client.force_login(User.objects.create_user('lector', password='x'))
+        self.assertEqual(self.client.get(ruta).status_code, 302)
+
+        self.client.force_login(User.objects.create_user('empleado', password='x', is_staff=True))
+        eventos = self.client.get(ruta).json()['eventos']
+        self.assertEqual([(evento['tipo'], evento['detalle']) for evento in eventos], [('NOTA', 'Documentos en revisión')])
+
+# ==========================================
+# RÉPLICA DE LECTURA
+# ==========================================
+
+@replicas.solo_lectura
+def _vista_alias(request):
+    return replicas.alias_lectura()
+
+@replicas.solo_lectura
+async def _vista_alias_async(request):
+    return replicas.alias_lectura()
+
+@override_settings(REPLICA_RETRASO_MAXIMO=10, REPLICA_INTERVALO_VERIFICACION=0, REPLICA_LECTURA_PROPIA=5)
+class ReplicaTests(SimpleTestCase):
+
+    def setUp(self):
+        estado = dict(replicas._estado)
+        self.addCleanup(replicas._estado.update, estado)
+        replicas._estado.update(utilizable=True, retraso=0.0, error=None, verificado_en=float('-inf'))
+        for parche in (
+            mock.patch('core.replicas.replica_configurada', return_value=True),
+            mock.patch('core.replicas._medir_retraso', return_value=0.5),
+        ):
+            self.addCleanup(parche.stop)
+            parche.start()
+
+    def _peticion(self, ultima_escritura=None):
+        request = RequestFactory().get('/')
+        if ultima_escritura is not None:
+            request.COOKIES[replicas.COOKIE_ULTIMA_ESCRITURA] = f'{ultima_escritura:.3f}'
+        return request
+
+    def test_router(self):
+        router = replicas.ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(PreRegistro), 'default')
+        with replicas.lectura_en_replica():
+            self.assertEqual(router.db_for_read(PreRegistro), 'replica')
+            self.assertEqual(router.db_for_write(PreRegistro), 'default')
+        self.assertTrue(router.allow_migrate('default', 'core'))
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+
+    def test_solo_lectura_sigue_en_la_principal_tras_escribir(self):
+        self.assertEqual(_vista_alias(self._peticion()), 'replica')
+        self.assertEqual(_vista_alias(self._peticion(time.time() - 1)), 'default')
+        self.assertEqual(_vista_alias(self._peticion(time.time() - 60)), 'replica')
+        # Fuera de la vista se vuelve a leer de la principal
+        self.assertEqual(replicas.alias_lectura(), 'default')
+
+    async def test_solo_lectura_asincrona(self):
+        self.assertEqual(await _vista_alias_async(self._peticion()), 'replica')
+        self.assertEqual(await _vista_alias_async(self._peticion(time.time())), 'default')
+
+    def test_retraso_excesivo_vuelve_a_la_principal(self):
+        replicas._medir_retraso.return_value = 30.0
+        with replicas.lectura_en_replica():
+            self.assertEqual(replicas.alias_lectura(), 'default')
+        self.assertEqual(replicas.estado_replica(), {'utilizable': False, 'retraso': 30.0, 'error': None})
+
+        replicas._medir_retraso.return_value = 2.0
+        with replicas.lectura_en_replica():
+            self.assertEqual(replicas.alias_lectura(), 'replica')
+
+    def test_replica_sin_respuesta_vuelve_a_la_principal(self):
+        replicas._medir_retraso.side_effect = DatabaseError('sin conexión')
+
+        with mock.patch('core.replicas.connections') as conexiones:
+            with replicas.lectura_en_replica():
+                self.assertEqual(replicas.alias_lectura(), 'default')
+            self.assertEqual(replicas.estado_replica()['error'], 'sin conexión')
+
+        conexiones['replica'].close_pool.assert_called_with()
+
+    @override_settings(REPLICA_INTERVALO_VERIFICACION=60)
+    def test_retraso_se_verifica_una_vez_por_intervalo(self):
+        for _ in range(3):
+            replicas.estado_replica()
+        replicas._medir_retraso.assert_called_once_with()
+
+# ==========================================
+# BYPASS DEL MODO MANTENIMIENTO
+# ==========================================
+
+class BypassMantenimientoTests(TestCase):
+
+    def setUp(self):
+        self.superusuario = User.objects.create_superuser('director', password='clave-segura')
+        self.client.post('/login/', {'username': 'director', 'password': 'clave-segura'})
+        self.cookie = self.client.cookies[COOKIE_BYPASS_MANTENIMIENTO].value
+        guardar_configuracion({'mantenimiento': True}, ['mantenimiento'])
+
+    def tearDown(self):
+        invalidar_cache()
+
+    def test_superusuario_con_sesion_vigente_pasa(self):
+        self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(Client().get('/').status_code, 503)
+
+    def test_la_cookie_no_vale_tras_cerrar_sesion(self):
+        self.client.get('/logout/')
+        self.client.cookies[COOKIE_BYPASS_MANTENIMIENTO] = self.cookie
+
+        self.assertEqual(self.client.get('/').status_code, 503)
+
+    def test_la_cookie_no_vale_en_otra_sesion(self):
+        otro = Client()
+        otro.force_login(User.objects.create_user('lector', password='x'))
+        otro.cookies[COOKIE_BYPASS_MANTENIMIENTO] = self.cookie
+
+        self.assertEqual(otro.get('/').status_code, 503)
+
+    def test_superusuario_degradado_pierde_el_bypass(self):
+        User.objects.filter(pk=self.superusuario.pk).update(is_superuser=False)
+
+        self.assertEqual(self.client.get('/').status_code, 503)
+
+    async def test_bypass_bajo_asgi(self):
+        cliente = AsyncClient(headers={'host': 'localhost'})
+        cliente.cookies = self.client.cookies
+
+        self.assertEqual((await cliente.get('/')).status_code, 200)
+
+# ==========================================
+# PERFILADO A PEDIDO
+# ==========================================
+
+class PerfiladoTests(TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ajustes = override_settings(PERFILADO_DIRECTORIO=directorio, PERFILADO_MUESTREO=0.0)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        User.objects.create_superuser('director', password='clave-segura')
+        self.client.post('/login/', {'username': 'director', 'password': 'clave-segura'})
+
+    def test_solo_perfilar_igual_a_uno(self):
+        self.assertIn('X-Perfil-Id', self.client.get('/?perfilar=1'))
+        self.assertIn('X-Perfil-Id', self.client.get('/', headers={'x-perfilar': '1'}))
+        for ruta in ('/?perfilar=0', '/?xperfilar=1', '/?a=perfilar=1'):
+            self.assertNotIn('X-Perfil-Id', self.client.get(ruta), ruta)
+        self.assertNotIn('X-Perfil-Id', self.client.get('/', headers={'x-perfilar': '0'}))
+
+    def test_requiere_la_sesion_del_superusuario(self):
+        cookie = self.client.cookies[COOKIE_BYPASS_MANTENIMIENTO].value
+        self.client.get('/logout/')
+        self.client.cookies[COOKIE_BYPASS_MANTENIMIENTO] = cookie
+
+        self.assertNotIn('X-Perfil-Id', self.client.get('/?perfilar=1'))
+
+# ==========================================
+# RESPUESTAS CONDICIONALES
+# ==========================================
+
+MODIFICADO = datetime(2025, 3, 1, 12, 0, tzinfo=ZoneInfo('UTC'))
+
+def _version_fija(request):
+    if request.GET.get('sin_version'):
+        raise VersionNoDisponible
+    return (('libro', 7), MODIFICADO)
+
+@respuesta_condicional(_version_fija)
+def _vista_condicional(request):
+    if request.GET.get('fallar'):
+        return JsonResponse({'success': False, 'error': 'Sin datos'})
+    return JsonResponse({'success': True, 'data': []})
+
+async def _version_fija_async(request):
+    return _version_fija(request)
+
+@respuesta_condicional(_version_fija_async)
+async def _vista_condicional_async(request):
+    return _vista_condicional.__wrapped__(request)
+
+class RespuestaCondicionalTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_emite_validadores(self):
+        response = _vista_condicional(self.factory.get('/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertEqual(response['Last-Modified'], 'Sat, 01 Mar 2025 12:00:00 GMT')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_etag_coincidente_responde_304_sin_ejecutar_la_vista(self):
+        etag = _vista_condicional(self.factory.get('/'))['ETag']
+
+        with mock.patch('core.tests.JsonResponse') as vista:
+            response = _vista_condicional(self.factory.get('/', headers={'if-none-match': etag}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        vista.assert_not_called()
+
+        response = _vista_condicional(self.factory.get('/', headers={'if-none-match': 'W/"otra"'}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_errores_sin_validadores(self):
+        response = _vista_condicional(self.factory.get('/', {'fallar': '1'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_version_no_disponible_ejecuta_la_vista(self):
+        response = _vista_condicional(self.factory.get('/', {'sin_version': '1'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_otros_errores_de_la_version_se_propagan(self):
+        vista = respuesta_condicional(mock.Mock(side_effect=DatabaseError('caída')))(_vista_condicional.__wrapped__)
+        with self.assertRaises(DatabaseError):
+            vista(self.factory.get('/'))
+
+    async def test_vista_asincrona(self):
+        self.assertTrue(iscoroutinefunction(_vista_condicional_async))
+        response = await _vista_condicional_async(self.factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], _vista_condicional(self.factory.get('/'))['ETag'])
+
+        response = await _vista_condicional_async(self.factory.get('/', headers={'if-none-match': response['ETag']}))
+        self.assertEqual(response.status_code, 304)
+
+        response = await _vista_condicional_async(self.factory.get('/', {'fallar': '1'}))
+        self.assertNotIn('ETag', response)
+
+# ==========================================
+# API DE REPORTES
+# ==========================================
+
+class ReportesApiTests(TestCase):
+    ruta = '/superuser/api/reportes/prestamos-categoria-mes/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superusuario = User.objects.create_superuser('director', password='x')
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO sh_biblioteca.categoria (id_categoria, categoria) VALUES ('CT-01', 'Ciencia');
+                INSERT INTO sh_biblioteca.libro (titulo, id_categoria) VALUES ('Física', 'CT-01');
+                INSERT INTO sh_biblioteca.persona (ci, nombres, id_sexo) VALUES ('9100001', 'Lector', 'F');
+                INSERT INTO sh_biblioteca.usuario (id_persona, id_tipo_usuario)
+                    SELECT id_persona, 'U-01' FROM sh_biblioteca.persona WHERE ci = '9100001';
+                INSERT INTO sh_biblioteca.prestamo (id_libro, id_usuario, fecha_prestamo, fecha_devolucion, estado)
+                SELECT l.id_libro, u.id_usuario, fecha::date, fecha::date + 7, 'DEVUELTO'
+                FROM sh_biblioteca.libro l, sh_biblioteca.usuario u,
+                     unnest(ARRAY['2025-01-10', '2025-02-10', '2025-02-20', '2025-03-10']) AS fecha
+                WHERE l.titulo = 'Física';
+            """)
+        reportes.actualizar('prestamos-categoria-mes')
+
+    def setUp(self):
+        self.client.force_login(self.superusuario)
+
+    def _meses(self, respuesta):
+        return [(fila['mes'], fila['prestamos']) for fila in respuesta.json()['filas'] if fila['categoria'] == 'Ciencia']
+
+    def test_filtro_desde_hasta(self):
+        self.assertEqual(
+            self._meses(self.client.get(self.ruta)),
+            [('2025-03-01', 1), ('2025-02-01', 2), ('2025-01-01', 1)],
+        )
+        self.assertEqual(self._meses(self.client.get(self.ruta, {'desde': '2025-02', 'hasta': '2025-02'})), [('2025-02-01', 2)])
+        self.assertEqual(self._meses(self.client.get(self.ruta, {'desde': '2025-02'})), [('2025-03-01', 1), ('2025-02-01', 2)])
+
+    def test_parametros_no_validos(self):
+        respuesta = self.client.get(self.ruta, {'desde': '2025-13'})
+
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertNotIn('ETag', respuesta)
+
+    def test_304_con_la_misma_version(self):
+        primera = self.client.get(self.ruta)
+        self.assertIn('Last-Modified', primera)
+
+        repetida = self.client.get(self.ruta, headers={'if-none-match': primera['ETag']})
+        otro_filtro = self.client.get(self.ruta, {'desde': '2025-02'}, headers={'if-none-match': primera['ETag']})
+
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(otro_filtro.status_code, 200)
+
+    def test_reporte_desconocido_sin_calcular_version(self):
+        with mock.patch('core.views.reporte_actualizado_en') as version:
+            respuesta = self.client.get('/superuser/api/reportes/no-existe/')
+
+        self.assertEqual(respuesta.status_code, 404)
+        version.assert_not_called()
+
+    def test_error_de_bd_en_la_version_se_propaga(self):
+        with mock.patch('core.views.reporte_actualizado_en', side_effect=DatabaseError('sin conexión')):
+            with self.assertRaises(DatabaseError):
+                self.client.get(self.ruta)
+
+# ==========================================
+# ARCHIVO DE PRE-REGISTROS
+# ==========================================
+
+class ArchivoPreRegistrosTests(TestCase):
+
+    def setUp(self):
+        self.limite = timezone.now() - timedelta(days=180)
+
+    def _antiguo(self, numero, **campos):
+        preregistro = _preregistro(numero, **campos)
+        PreRegistro.objects.filter(id=preregistro.id).update(fecha_registro=self.limite - timedelta(days=30))
+        return preregistro
+
+    def test_archiva_solo_rechazados_antiguos(self):
+        rechazado = self._antiguo(1, estado='RECHAZADO')
+        activo = self._antiguo(2, estado='ACTIVO', aprobado=True)
+        pendiente = self._antiguo(3)
+        reciente = _preregistro(4, estado='RECHAZADO')
+
+        filas, bytes_filas = archivar_lote(self.limite, 100)
+
+        self.assertEqual(filas, 1)
+        self.assertGreater(bytes_filas, 0)
+        self.assertEqual(list(PreRegistroArchivo.objects.values_list('id', 'ci')), [(rechazado.id, rechazado.ci)])
+        self.assertEqual(
+            set(PreRegistro.objects.values_list('id', flat=True)),
+            {activo.id, pendiente.id, reciente.id},
+        )
+
+    def test_lotes_acotados(self):
+        for numero in range(3):
+            self._antiguo(numero, estado='RECHAZADO')
+
+        self.assertEqual([archivar_lote(self.limite, 2)[0] for _ in range(3)], [2, 1, 0])
+        self.assertEqual(PreRegistroArchivo.objects.count(), 3)
+
+    def test_unicidad_de_email_y_telefono_en_ambas_tablas(self):
+        self._antiguo(1, estado='RECHAZADO', telefono='70000001')
+        _preregistro(2, telefono='70000002')
+        archivar_lote(self.limite, 100)
+
+        for columna, valor in (('email', 'sol1@correo.com'), ('telefono', '70000001'),
+                               ('email', 'sol2@correo.com'), ('telefono', '70000002')):
+            self.assertTrue(preregistro_existe(columna, valor), valor)
+        self.assertFalse(preregistro_existe('email', 'nuevo@correo.com'))
+        self.assertFalse(preregistro_existe('telefono', '70000003'))
+
+        form = PreRegistroForm(data={'email': 'sol1@correo.com', 'telefono': '70000001'})
+        form.is_valid()
+        self.assertIn('Ya existe un pre-registro', form.errors['email'][0])
+        self.assertIn('Ya existe un pre-registro', form.errors['telefono'][0])
+
+# ==========================================
+# MIDDLEWARES BAJO ASGI
+# ==========================================
+
+# Vistas síncronas de las pruebas bajo ASGI (ROOT_URLCONF='core.tests')
+def _vista_escritura(request):
+    with connection.cursor() as cursor:
+        cursor.execute('UPDATE sh_biblioteca.version_datos SET version = version WHERE false')
+    return HttpResponse('ok')
+
+def _vista_lenta(request):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_sleep(0.05)')
+    return HttpResponse('ok')
+
+urlpatterns = [
+    path('prueba/escritura/', _vista_escritura, name='prueba_escritura'),
+    path('prueba/lenta/', _vista_lenta, name='prueba_lenta'),
+    path('', include('core.urls')),
+]
+
+class MiddlewaresAsincronosTests(TestCase):
+
+    def tearDown(self):
+        # La configuración vuelve a leerse de la BD (ya sin los cambios de la prueba)
+        invalidar_cache()
+
+    def test_cadena_asincrona_sin_adaptaciones(self):
+        with self.assertNoLogs('django.request', level='DEBUG'):
+            handler = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    async def test_mantenimiento_bajo_asgi(self):
+        await sync_to_async(guardar_configuracion)({'mantenimiento': True}, ['mantenimiento'])
+        cliente = AsyncClient(headers={'host': 'localhost'})
+
+        respuesta = await cliente.get('/pre-registro/')
+
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual((await cliente.get('/login/')).status_code, 200)
+
+    @override_settings(ROOT_URLCONF='core.tests')
+    async def test_escritura_de_vista_sincrona_marca_lectura_propia(self):
+        cliente = AsyncClient(headers={'host': 'localhost'})
+
+        with mock.patch('core.middleware.replica_configurada', return_value=True):
+            respuesta = await cliente.get('/prueba/escritura/')
+            lectura = await cliente.get('/prueba/lenta/')
+
+        self.assertIn(COOKIE_ULTIMA_ESCRITURA, respuesta.cookies)
+        self.assertNotIn(COOKIE_ULTIMA_ESCRITURA, lectura.cookies)
+
+    @override_settings(ROOT_URLCONF='core.tests', CONSULTAS_LENTAS_UMBRAL_MS=20, CONSULTAS_LENTAS_MUESTREO_PLAN=0)
+    async def test_consulta_lenta_de_vista_sincrona_se_registra(self):
+        consultas_lentas.limpiar()
+        self.addCleanup(consultas_lentas.limpiar)
+
+        await AsyncClient(headers={'host': 'localhost'}).get('/prueba/lenta/')
+
+        self.assertEqual(
+            [(grupo['sentencia'], grupo['vistas']) for grupo in consultas_lentas.resumen()],
+            [('SELECT pg_sleep(...)', {'prueba_lenta': 1})],
+        )
+
+# ==========================================
+# DIFUSIÓN SSE DE ESTADÍSTICAS
+# ==========================================
+
+class DifusorEstadisticasTests(SimpleTestCase):
+
+    def test_cliente_lento_recibe_la_instantanea_y_los_demas_el_cambio(self):
+        difusor = DifusorEstadisticas()
+        colas = [asyncio.Queue(maxsize=2) for _ in range(3)]
+        difusor.suscriptores = colas
+        lenta = colas[1]
+        difusor._difundir({'usuarios': 1, 'libros': 5, 'timestamp': 't1'})
+        lenta.put_nowait(('cambios', {}))
+
+        difusor._difundir({'usuarios': 2, 'libros': 5, 'timestamp': 't2'})
+
+        inicial = ('snapshot', {'usuarios': 1, 'libros': 5, 'timestamp': 't1'})
+        cambio = ('cambios', {'usuarios': 2, 'timestamp': 't2'})
+        instantanea = ('snapshot', {'usuarios': 2, 'libros': 5, 'timestamp': 't2'})
+        self.assertEqual(
+            [[cola.get_nowait() for _ in range(cola.qsize())] for cola in colas],
+            [[inicial, cambio], [instantanea], [inicial, cambio]],
+        )
+
+# ==========================================
+# PRECALENTAMIENTO CON GUNICORN --preload
+# ==========================================
+
+@override_settings(PRECALENTAR=True)
+class PrecalentamientoTests(SimpleTestCase):
+
+    def setUp(self):
+        self.ejecutados = []
+        pasos = [(nombre, lambda nombre=nombre: self.ejecutados.append(nombre)) for nombre, _ in precalentamiento.PASOS]
+        parche = mock.patch.object(precalentamiento, 'PASOS', tuple(pasos))
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_sin_gunicorn_la_carga_ejecuta_todos_los_pasos(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PRECALENTAR_CONEXIONES_POR_WORKER', None)
+            precalentamiento.precalentar_si_corresponde()
+            self.assertIsNone(precalentamiento.precalentar_worker())
+
+        self.assertEqual(self.ejecutados, ['modulos', 'base_datos', 'catalogos', 'plantillas'])
+
+    def test_con_gunicorn_las_conexiones_se_abren_en_cada_worker(self):
+        with mock.patch.dict(os.environ, {'PRECALENTAR_CONEXIONES_POR_WORKER': '1'}):
+            precalentamiento.precalentar_si_corresponde()
+            self.assertEqual(self.ejecutados, ['modulos', 'plantillas'])
+
+            precalentamiento.precalentar_worker()
+            self.assertEqual(self.ejecutados, ['modulos', 'plantillas', 'base_datos', 'catalogos'])
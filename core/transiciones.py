@@ -0,0 +1,88 @@
+"""
+Cambios de estado masivos de pre-registros (bloquear, reactivar, rechazar).
+
+Cada transición es un solo ``UPDATE ... RETURNING`` sobre una lista de ids o un filtro,
+limitado a los estados de origen permitidos: las filas en otro estado se omiten sin
+error. El evento de historial de todas las filas afectadas se inserta con un solo
+INSERT (core/historial.py), en la misma transacción.
+"""
+from django.db import connection, transaction
+
+from .historial import registrar_varios
+
+# accion -> estados de origen, estado destino, evento de historial, motivo por defecto
+TRANSICIONES = {
+    'bloquear': {
+        'origen': ['ACTIVO'],
+        'destino': 'INACTIVO',
+        'evento': 'BLOQUEADO',
+        'motivo': 'Usuario bloqueado por el administrador',
+    },
+    'activar': {
+        'origen': ['INACTIVO'],
+        'destino': 'ACTIVO',
+        'evento': 'REACTIVADO',
+        'motivo': 'Usuario reactivado',
+    },
+    'rechazar': {
+        'origen': ['PENDIENTE'],
+        'destino': 'RECHAZADO',
+        'evento': 'RECHAZADO',
+        'motivo': 'Sin motivo especificado',
+    },
+}
+
+# Filtros admitidos además de la lista de ids: clave -> condición SQL
+FILTROS = {
+    'id_tipo_usuario': 'id_tipo_usuario = %(id_tipo_usuario)s',
+    'registrado_desde': 'fecha_registro >= %(registrado_desde)s',
+    'registrado_hasta': "fecha_registro < %(registrado_hasta)s::date + 1",
+}
+
+class TransicionInvalida(Exception):
+    """Acción o filtro no admitidos"""
+
+def aplicar_transicion(accion, ids=None, filtro=None, motivo=None, usuario=None):
+    """
+    Aplica ``accion`` a los pre-registros indicados (``ids`` y/o ``filtro``) que estén en
+    un estado de origen permitido. Devuelve las filas afectadas como
+    ``(id, nombres, email)``.
+    """
+    transicion = TRANSICIONES.get(accion)
+    if transicion is None:
+        raise TransicionInvalida(f'Acción no válida: {accion}')
+
+    filtro = {clave: valor for clave, valor in (filtro or {}).items() if valor not in (None, '')}
+    desconocidos = set(filtro) - set(FILTROS)
+    if desconocidos:
+        raise TransicionInvalida(f"Filtros no válidos: {', '.join(sorted(desconocidos))}")
+    if not ids and not filtro:
+        raise TransicionInvalida('Indique los pre-registros o un filtro')
+
+    condiciones = ['estado = ANY(%(origen)s)']
+    params = {'origen': transicion['origen'], 'destino': transicion['destino'], **filtro}
+
+    if ids:
+        condiciones.append('id = ANY(%(ids)s)')
+        params['ids'] = [int(preregistro_id) for preregistro_id in ids]
+    condiciones.extend(FILTROS[clave] for clave in filtro)
+
+    if accion == 'rechazar':
+        # Respeta las reservas vigentes de la cola de revisión (core/cola_revision.py)
+        condiciones.append('aprobado = false')
+        condiciones.append('(reserva_hasta IS NULL OR reserva_hasta < now() OR revisor_id = %(revisor)s)')
+        params['revisor'] = usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE pre_registro
+            SET estado = %(destino)s, reserva_hasta = NULL
+            WHERE {' AND '.join(condiciones)}
+            RETURNING id, nombres, email
+        """, params)
+        afectados = cursor.fetchall()
+        registrar_varios(
+            [preregistro_id for preregistro_id, _, _ in afectados],
+            transicion['evento'], motivo or transicion['motivo'],
+        )
+    return afectados
@@ -9,6 +9,10 @@ urlpatterns = [
     path('gestionar-preregistros/', views.gestionar_preregistros, name='gestionar_preregistros'),
     path('aprobar-preregistro/<int:preregistro_id>/', views.aprobar_preregistro, name='aprobar_preregistro'),
     path('rechazar-preregistro/<int:preregistro_id>/', views.rechazar_preregistro, name='rechazar_preregistro'),
+    path('gestionar-preregistros/reclamar/', views.reclamar_preregistros, name='reclamar_preregistros'),
+    path('gestionar-preregistros/liberar/', views.liberar_preregistros, name='liberar_preregistros'),
+    path('gestionar-preregistros/masivo/<str:accion>/', views.transicion_masiva_preregistros, name='transicion_masiva_preregistros'),
+    path('gestionar-preregistros/<int:preregistro_id>/historial/', views.historial_preregistro, name='historial_preregistro'),
     path('bloquear-usuario/<int:preregistro_id>/', views.bloquear_usuario, name='bloquear_usuario'),
     path('activar-usuario/<int:preregistro_id>/', views.activar_usuario, name='activar_usuario'),
     
@@ -21,10 +25,14 @@ urlpatterns = [
     path('superuser/users/', views.superuser_users, name='superuser_users'),
     path('superuser/crear-administrador/', views.crear_administrador_ajax, name='crear_administrador_ajax'),
     path('superuser/crear-empleado/', views.crear_empleado_ajax, name='crear_empleado_ajax'),
+    path('superuser/api/importar-usuarios/', views.importar_usuarios_ajax, name='importar_usuarios_ajax'),
     
     # URLs de Estadísticas y Reportes
     path('superuser/api/estadisticas/', views.obtener_estadisticas_dashboard, name='obtener_estadisticas_dashboard'),
+    path('superuser/api/estadisticas/stream/', views.stream_estadisticas_dashboard, name='stream_estadisticas_dashboard'),
     path('superuser/api/grafico-usuarios/', views.obtener_datos_grafico_usuarios, name='obtener_datos_grafico_usuarios'),
+    path('superuser/reportes/', views.superuser_reportes, name='superuser_reportes'),
+    path('superuser/api/reportes/<str:nombre>/', views.obtener_datos_reporte, name='obtener_datos_reporte'),
     
     # URLs de Configuración
     path('superuser/api/politicas-password/', views.guardar_politicas_password, name='guardar_politicas_password'),
@@ -35,4 +43,10 @@ urlpatterns = [
     path('superuser/api/exportar-excel/', views.exportar_datos_excel, name='exportar_datos_excel'),
     path('superuser/api/logs-seguridad/', views.obtener_logs_seguridad, name='obtener_logs_seguridad'),
     path('superuser/api/estado-sistema/', views.obtener_estado_sistema, name='obtener_estado_sistema'),
+    
+    # URLs de Perfiles de Peticiones
+    path('superuser/api/perfiles/', views.listar_perfiles, name='listar_perfiles'),
+    path('superuser/api/perfiles/<str:perfil_id>/', views.detalle_perfil, name='detalle_perfil'),
+    path('superuser/api/perfiles/<str:perfil_id>/descargar/', views.descargar_perfil, name='descargar_perfil'),
+    path('superuser/api/consultas-lentas/', views.consultas_lentas, name='consultas_lentas'),
 ]
\ No newline at end of file
@@ -22,4 +22,17 @@ def get_modalidad_ingreso_choices():
     """Obtiene las opciones de modalidad de ingreso desde la base de datos"""
     cursor = connection.cursor()
     cursor.execute('SELECT id_modalidad_ingreso, modalidad_ingreso FROM sh_biblioteca.modalidad_ingreso')
-    return [(row[0].strip(), row[1].strip()) for row in cursor.fetchall()]
\ No newline at end of file
+    return [(row[0].strip(), row[1].strip()) for row in cursor.fetchall()]
+
+def copiar_csv(cursor, sql_copy, buffer):
+    """
+    Ejecuta COPY ... FROM STDIN con el contenido CSV de un buffer de texto.
+    Soporta psycopg2 (copy_expert) y psycopg 3 (cursor.copy).
+    """
+    buffer.seek(0)
+    cursor_db = getattr(cursor, 'cursor', cursor)
+    if hasattr(cursor_db, 'copy_expert'):
+        cursor_db.copy_expert(sql_copy, buffer)
+    else:
+        with cursor_db.copy(sql_copy) as copy:
+            copy.write(buffer.read())
@@ -1,17 +1,47 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.db import transaction
 from django.utils import timezone
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import django
 import json
-from .forms import PreRegistroForm, AgregarAdministradorForm, AgregarEmpleadoForm
-from .models import PreRegistro
+import platform
+from .forms import PreRegistroForm, RecepcionPreRegistroForm, AgregarAdministradorForm, AgregarEmpleadoForm
+from .models import PreRegistro, PreRegistroArchivo
 from .services import crear_usuario_desde_preregistro, verificar_ci_existe, verificar_email_existe, crear_administrador, crear_empleado
-from .email_service import enviar_email_aprobacion, enviar_email_rechazo
+from .email_service import enviar_email_aprobacion, enviar_email_rechazo, enviar_emails_rechazo
+from .configuracion import (
+    CONFIGURACION_SISTEMA_POR_DEFECTO, POLITICA_PASSWORD_POR_DEFECTO, ValorConfiguracionInvalido,
+    guardar_configuracion, obtener_configuracion, obtener_politica_password
+)
+from .middleware import marcar_bypass_mantenimiento, quitar_bypass_mantenimiento
+from .importacion import ErrorImportacion, importar_usuarios
+from .monitoreo import estadisticas_pool
+from .replicas import alias_lectura, conexion_lectura, estado_replica, replica_configurada, solo_lectura
+from .consultas_async import TABLAS_ESTADISTICAS, consultar_concurrentes, escalar, estadisticas_dashboard
+from .eventos import flujo_estadisticas
+from .condicional import VersionNoDisponible, respuesta_condicional, version_tablas_async
+from .entrada_preregistros import diferido_activo, recibir
+from .transiciones import TRANSICIONES, TransicionInvalida, aplicar_transicion
+from .historial import historial, registrar as registrar_evento
+from .perfilado import funciones_principales, listar as listar_perfiles_guardados, ruta_perfil
+from .consultas_lentas import (
+    limpiar as limpiar_consultas_lentas, resumen as resumen_consultas_lentas, umbral_ms as umbral_consultas_lentas
+)
+from .reportes import (
+    REPORTES, ReporteNoDisponible, actualizado_en as reporte_actualizado_en, disponibles as reportes_disponibles,
+    obtener as obtener_reporte
+)
+from .cola_revision import (
+    ReservaNoDisponible, cerrar_reserva, duracion_reserva, exigir_reserva, liberar, reclamar, serializar
+)
 
 def home(request):
     """Vista principal de la página de inicio"""
@@ -24,9 +54,23 @@ def home(request):
 def pre_registro(request):
     """Vista para el formulario de pre-registro"""
     if request.method == 'POST':
-        form = PreRegistroForm(request.POST)
+        # Modo diferido (picos de inscripción): solo formato aquí, el resto en procesar_preregistros
+        diferido = diferido_activo()
+        form = RecepcionPreRegistroForm(request.POST) if diferido else PreRegistroForm(request.POST)
         if form.is_valid():
             try:
+                if diferido:
+                    recibir(form.cleaned_data)
+                    
+                    messages.success(
+                        request,
+                        f'¡Solicitud recibida! '
+                        f'En unos minutos recibirás en {form.cleaned_data["email"]} la confirmación '
+                        f'de tu pre-registro o el motivo por el que no se pudo registrar.'
+                    )
+                    
+                    return redirect('core:home')
+                
                 # Guardar el pre-registro
                 pre_registro = form.save()
                 
@@ -66,16 +110,37 @@ def pre_registro(request):
         form = PreRegistroForm()
     
     context = {
-        'form': form
+        'form': form,
+        'politica_password': obtener_politica_password()
     }
     return render(request, 'core/pre_registro.html', context)
 
+# ==========================================
+# FUNCIONES DE VALIDACIÓN DE PERMISOS
+# ==========================================
+
+def is_superuser(user):
+    """Verifica si el usuario es superusuario"""
+    return user.is_authenticated and user.is_superuser
+
+def is_staff_or_superuser(user):
+    """Verifica si el usuario es staff o superusuario"""
+    return user.is_authenticated and (user.is_staff or user.is_superuser)
+
 def gestionar_preregistros(request):
     """Vista para que empleados gestionen pre-registros"""
-    preregistros = PreRegistro.objects.all().order_by('-fecha_registro')
+    # ?archivo=1 muestra, solo para consulta, los pre-registros movidos a pre_registro_archivo
+    archivo = request.GET.get('archivo') == '1'
+    modelo = PreRegistroArchivo if archivo else PreRegistro
+    
+    # Solo las columnas que muestra la tabla
+    preregistros = modelo.objects.only(
+        'ci', 'nombres', 'paterno', 'materno', 'email', 'id_tipo_usuario', 'estado', 'fecha_registro'
+    ).order_by('-fecha_registro')
     
     context = {
-        'preregistros': preregistros
+        'preregistros': preregistros,
+        'archivo': archivo,
     }
     return render(request, 'core/gestionar_preregistros.html', context)
 
@@ -85,7 +150,11 @@ def aprobar_preregistro(request, preregistro_id):
     if request.method == 'POST':
         try:
             with transaction.atomic():
-                preregistro = get_object_or_404(PreRegistro, id=preregistro_id, aprobado=False)
+                # Bloquea la fila: un segundo clic espera y ya no la encuentra pendiente
+                preregistro = get_object_or_404(
+                    PreRegistro.objects.select_for_update(), id=preregistro_id, aprobado=False
+                )
+                exigir_reserva(preregistro, request.user)
                 
                 # Verificar que no exista el CI o email
                 if verificar_ci_existe(preregistro.ci):
@@ -102,17 +171,22 @@ def aprobar_preregistro(request, preregistro_id):
                     preregistro.aprobado = True
                     preregistro.estado = 'ACTIVO'
                     preregistro.fecha_aprobacion = timezone.now()
-                    preregistro.observaciones = f"Aprobado - Usuario ID: {resultado['id_usuario']}"
+                    cerrar_reserva(preregistro)
                     preregistro.save()
+                    registrar_evento(preregistro.id, 'APROBADO', f"Usuario ID: {resultado['id_usuario']}")
                     
-                    # Enviar email con datos de acceso
+                    # Enviar email con datos de acceso, solo si la aprobación se confirma
+                    # y sin mantener los bloqueos durante el envío
                     if preregistro.email:
-                        enviar_email_aprobacion(preregistro, resultado['id_usuario'])
+                        id_usuario = resultado['id_usuario']
+                        transaction.on_commit(lambda: enviar_email_aprobacion(preregistro, id_usuario))
                 else:
                     return JsonResponse({'success': False, 'error': resultado['error']})
                 
                 return JsonResponse({'success': True})
                 
+        except ReservaNoDisponible as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=409)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
     
@@ -123,27 +197,131 @@ def rechazar_preregistro(request, preregistro_id):
     """Rechazar un pre-registro"""
     if request.method == 'POST':
         try:
-            preregistro = get_object_or_404(PreRegistro, id=preregistro_id, aprobado=False)
-            
             data = json.loads(request.body)
             motivo = data.get('motivo', 'Sin motivo especificado')
             
-            # Enviar email de rechazo
-            if preregistro.email:
-                enviar_email_rechazo(preregistro, motivo)
-            
-            # Marcar como rechazado
-            preregistro.estado = 'RECHAZADO'
-            preregistro.observaciones = f"RECHAZADO: {motivo}"
-            preregistro.save()
+            with transaction.atomic():
+                # Solo pendientes: un doble clic no rechaza (ni envía el correo) dos veces
+                preregistro = get_object_or_404(
+                    PreRegistro.objects.select_for_update(),
+                    id=preregistro_id, aprobado=False, estado='PENDIENTE'
+                )
+                exigir_reserva(preregistro, request.user)
+                
+                # Marcar como rechazado
+                preregistro.estado = 'RECHAZADO'
+                cerrar_reserva(preregistro)
+                preregistro.save()
+                registrar_evento(preregistro.id, 'RECHAZADO', motivo)
+                
+                # Enviar email de rechazo una vez confirmado el cambio de estado
+                if preregistro.email:
+                    transaction.on_commit(lambda: enviar_email_rechazo(preregistro, motivo))
             
             return JsonResponse({'success': True})
             
+        except ReservaNoDisponible as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=409)
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Método no permitido'})
+
+# ==========================================
+# COLA DE REVISIÓN (VARIOS REVISORES)
+# ==========================================
+
+@login_required
+@user_passes_test(is_staff_or_superuser, login_url='/')
+@csrf_exempt
+def reclamar_preregistros(request):
+    """Reserva al revisor los siguientes N pre-registros pendientes"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or '{}')
+            preregistros = reclamar(request.user, data.get('cantidad', 5))
+            
+            return JsonResponse({
+                'success': True,
+                'reserva_segundos': duracion_reserva(),
+                'preregistros': [serializar(preregistro) for preregistro in preregistros],
+            })
+            
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Método no permitido'})
+
+@login_required
+@user_passes_test(is_staff_or_superuser, login_url='/')
+@csrf_exempt
+def liberar_preregistros(request):
+    """Devuelve a la cola los pre-registros reservados por el revisor"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or '{}')
+            liberados = liberar(request.user, data.get('ids'))
+            
+            return JsonResponse({'success': True, 'liberados': liberados})
+            
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+    
+    return JsonResponse({'success': False, 'error': 'Método no permitido'})
+
+# ==========================================
+# CAMBIOS DE ESTADO MASIVOS
+# ==========================================
+
+@login_required
+@user_passes_test(is_staff_or_superuser, login_url='/')
+@csrf_exempt
+def transicion_masiva_preregistros(request, accion):
+    """Bloquear, reactivar o rechazar varios pre-registros con un solo UPDATE"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or '{}')
+            motivo = data.get('motivo') or None
+            
+            afectados = aplicar_transicion(
+                accion, ids=data.get('ids'), filtro=data.get('filtro'), motivo=motivo, usuario=request.user
+            )
+            
+            if accion == 'rechazar':
+                enviar_emails_rechazo(
+                    [(nombres, email) for _, nombres, email in afectados],
+                    motivo or TRANSICIONES['rechazar']['motivo'],
+                )
+            
+            ids = [preregistro_id for preregistro_id, _, _ in afectados]
+            return JsonResponse({
+                'success': True,
+                'ids': ids,
+                'afectados': len(ids),
+                # Pedidos por id que no estaban en un estado de origen permitido
+                'omitidos': sorted(set(map(int, data.get('ids') or [])) - set(ids)),
+            })
+            
+        except TransicionInvalida as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
     
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
+@login_required
+@user_passes_test(is_staff_or_superuser, login_url='/')
+def historial_preregistro(request, preregistro_id):
+    """Historial de un pre-registro (se carga al abrir su detalle)"""
+    # El historial sigue al pre-registro cuando se archiva (mismo id)
+    existe = (
+        PreRegistro.objects.filter(id=preregistro_id).exists()
+        or PreRegistroArchivo.objects.filter(id=preregistro_id).exists()
+    )
+    if not existe:
+        raise Http404('Pre-registro no encontrado')
+    return JsonResponse({'success': True, 'eventos': historial(preregistro_id)})
+
 @csrf_exempt
 def bloquear_usuario(request, preregistro_id):
     """Bloquear un usuario activo cambiando su estado a INACTIVO"""
@@ -154,9 +332,10 @@ def bloquear_usuario(request, preregistro_id):
             data = json.loads(request.body)
             motivo = data.get('motivo', 'Usuario bloqueado por el administrador')
             
-            preregistro.estado = 'INACTIVO'
-            preregistro.observaciones += f"\n[BLOQUEADO] {motivo} - {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            preregistro.save()
+            with transaction.atomic():
+                preregistro.estado = 'INACTIVO'
+                preregistro.save(update_fields=['estado'])
+                registrar_evento(preregistro.id, 'BLOQUEADO', motivo)
             
             return JsonResponse({'success': True})
             
@@ -172,9 +351,10 @@ def activar_usuario(request, preregistro_id):
         try:
             preregistro = get_object_or_404(PreRegistro, id=preregistro_id, estado='INACTIVO')
             
-            preregistro.estado = 'ACTIVO'
-            preregistro.observaciones += f"\n[REACTIVADO] Usuario reactivado - {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            preregistro.save()
+            with transaction.atomic():
+                preregistro.estado = 'ACTIVO'
+                preregistro.save(update_fields=['estado'])
+                registrar_evento(preregistro.id, 'REACTIVADO', 'Usuario reactivado')
             
             return JsonResponse({'success': True})
             
@@ -183,18 +363,6 @@ def activar_usuario(request, preregistro_id):
     
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
-# ==========================================
-# FUNCIONES DE VALIDACIÓN DE PERMISOS
-# ==========================================
-
-def is_superuser(user):
-    """Verifica si el usuario es superusuario"""
-    return user.is_authenticated and user.is_superuser
-
-def is_staff_or_superuser(user):
-    """Verifica si el usuario es staff o superusuario"""
-    return user.is_authenticated and (user.is_staff or user.is_superuser)
-
 # ==========================================
 # VISTAS DE AUTENTICACIÓN
 # ==========================================
@@ -212,7 +380,7 @@ def login_view(request):
             # Redirigir según el tipo de usuario
             if user.is_superuser:
                 messages.success(request, f'Bienvenido, Superusuario {user.username}!')
-                return redirect('core:superuser_dashboard')
+                return marcar_bypass_mantenimiento(redirect('core:superuser_dashboard'), request)
             elif user.is_staff:
                 messages.success(request, f'Bienvenido, {user.username}!')
                 return redirect('core:gestionar_preregistros')
@@ -228,7 +396,7 @@ def logout_view(request):
     """Vista de logout"""
     logout(request)
     messages.success(request, 'Has cerrado sesión exitosamente.')
-    return redirect('core:home')
+    return quitar_bypass_mantenimiento(redirect('core:home'))
 
 # ==========================================
 # VISTAS DEL SUPERUSUARIO
@@ -236,10 +404,11 @@ def logout_view(request):
 
 @login_required
 @user_passes_test(is_superuser, login_url='/')
+@solo_lectura
 def superuser_dashboard(request):
     """Dashboard principal del superusuario - Solo accesible para superusuarios"""
     try:
-        from django.db import connection
+        connection = conexion_lectura()
         
         with connection.cursor() as cursor:
             # Total de usuarios reales
@@ -307,6 +476,7 @@ def superuser_dashboard(request):
             'error': str(e)
         }
     
+    context['configuracion'] = obtener_configuracion()
     return render(request, 'pages/superuser/dashboard.html', context)
 
 @login_required
@@ -430,72 +600,71 @@ def crear_empleado_ajax(request):
     
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
+# Máximo de filas rechazadas que se devuelven en la respuesta JSON
+MAX_RECHAZADOS_RESPUESTA = 1000
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+@csrf_exempt
+def importar_usuarios_ajax(request):
+    """Vista AJAX para importar usuarios masivamente desde CSV/XLSX"""
+    if request.method == 'POST':
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            return JsonResponse({'success': False, 'error': 'Debe adjuntar un archivo .csv o .xlsx'})
+        
+        try:
+            resultado = importar_usuarios(
+                archivo.file,
+                archivo.name,
+                solo_validar=request.POST.get('solo_validar') == 'true'
+            )
+            
+            return JsonResponse({
+                'success': True,
+                'total': resultado['total'],
+                'insertados': resultado['insertados'],
+                'validos': resultado['validos'],
+                'total_rechazados': len(resultado['rechazados']),
+                'rechazados': resultado['rechazados'][:MAX_RECHAZADOS_RESPUESTA]
+            })
+            
+        except ErrorImportacion as e:
+            return JsonResponse({'success': False, 'error': str(e)})
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': f'Error interno: {str(e)}'
+            })
+    
+    return JsonResponse({'success': False, 'error': 'Método no permitido'})
+
 # ==========================================
 # VISTAS DE ESTADÍSTICAS Y REPORTES
 # ==========================================
 
+async def _version_estadisticas(request):
+    alias = await sync_to_async(alias_lectura)()
+    version, modificado = await version_tablas_async(
+        TABLAS_ESTADISTICAS, alias, paralelo=isinstance(request, ASGIRequest)
+    )
+    # Los préstamos vencidos cambian con la fecha aunque no haya escrituras
+    return (version, timezone.localdate()), modificado
+
 @login_required
 @user_passes_test(is_superuser, login_url='/')
-def obtener_estadisticas_dashboard(request):
-    """Obtiene estadísticas en tiempo real para el dashboard"""
+@solo_lectura
+@respuesta_condicional(_version_estadisticas)
+async def obtener_estadisticas_dashboard(request):
+    """Obtiene estadísticas en tiempo real para el dashboard (consultas en paralelo bajo ASGI)"""
     try:
-        from django.db import connection
+        alias = await sync_to_async(alias_lectura)()
+        
+        datos = await estadisticas_dashboard(alias, paralelo=isinstance(request, ASGIRequest))
         
-        with connection.cursor() as cursor:
-            # Total de usuarios
-            cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.usuario")
-            total_usuarios = cursor.fetchone()[0] or 0
-            
-            # Total de empleados
-            cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.empleado")
-            total_empleados = cursor.fetchone()[0] or 0
-            
-            # Total de libros reales
-            try:
-                cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.libro")
-                total_libros = cursor.fetchone()[0] or 0
-            except:
-                total_libros = 0  # Si no existe la tabla
-            
-            # Préstamos activos reales
-            try:
-                cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.prestamo WHERE estado = 'ACTIVO'")
-                prestamos_activos = cursor.fetchone()[0] or 0
-            except:
-                prestamos_activos = 0  # Si no existe la tabla
-            
-            # Préstamos vencidos reales
-            try:
-                cursor.execute("SELECT COUNT(*) FROM sh_biblioteca.prestamo WHERE estado = 'VENCIDO' OR fecha_devolucion < CURRENT_DATE")
-                vencidos = cursor.fetchone()[0] or 0
-            except:
-                vencidos = 0  # Si no existe la tabla
-            
-            # Usuarios por tipo
-            cursor.execute("""
-                SELECT tu.tipo_usuario, COUNT(*) 
-                FROM sh_biblioteca.usuario u
-                JOIN sh_biblioteca.tipo_usuario tu ON u.id_tipo_usuario = tu.id_tipo_usuario
-                GROUP BY tu.tipo_usuario
-            """)
-            usuarios_por_tipo = dict(cursor.fetchall())
-            
-            # Pre-registros pendientes
-            from .models import PreRegistro
-            preregistros_pendientes = PreRegistro.objects.filter(estado='PENDIENTE').count()
-            
         return JsonResponse({
             'success': True,
-            'data': {
-                'total_usuarios': total_usuarios,
-                'total_empleados': total_empleados,
-                'total_libros': total_libros,
-                'prestamos_activos': prestamos_activos,
-                'vencidos': vencidos,
-                'usuarios_por_tipo': usuarios_por_tipo,
-                'preregistros_pendientes': preregistros_pendientes,
-                'timestamp': timezone.now().isoformat()
-            }
+            'data': datos
         })
         
     except Exception as e:
@@ -506,64 +675,83 @@ def obtener_estadisticas_dashboard(request):
 
 @login_required
 @user_passes_test(is_superuser, login_url='/')
-def obtener_datos_grafico_usuarios(request):
-    """Obtiene datos para el gráfico de crecimiento de usuarios"""
+async def stream_estadisticas_dashboard(request):
+    """
+    Estadísticas del dashboard por Server-Sent Events: una instantánea al conectar y luego
+    solo los campos que cambian. Bajo WSGI cada conexión ocuparía un hilo, así que se
+    responde 204 y el navegador sigue consultando el endpoint JSON.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    response = StreamingHttpResponse(flujo_estadisticas(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule los eventos en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+# Series del gráfico de crecimiento: (etiqueta, tipo de usuario, colores)
+SERIES_GRAFICO_USUARIOS = [
+    ('Estudiantes', 'U-01', '#6f42c1', 'rgba(111, 66, 193, 0.1)'),
+    ('Docentes', 'U-02', '#198754', 'rgba(25, 135, 84, 0.1)'),
+    ('Visitantes', 'U-04', '#ffc107', 'rgba(255, 193, 7, 0.1)'),
+]
+
+def _cortes_grafico(periodo, hoy):
+    """Etiquetas y fechas de corte: 4 semanas para 'month', 5 años para 'year'"""
+    if periodo == 'month':
+        cortes = [hoy - timedelta(weeks=3 - i) for i in range(4)]
+        return [f'Sem {i + 1}' for i in range(4)], cortes
+    anios = [hoy.year - 4 + i for i in range(5)]
+    cortes = [date(anio, 12, 31) if anio < hoy.year else hoy for anio in anios]
+    return [str(anio) for anio in anios], cortes
+
+async def _version_grafico_usuarios(request):
+    alias = await sync_to_async(alias_lectura)()
+    version, modificado = await version_tablas_async(
+        ('usuario',), alias, paralelo=isinstance(request, ASGIRequest)
+    )
+    # Las fechas de corte dependen del día
+    return (version, timezone.localdate(), request.GET.get('periodo', 'month')), modificado
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+@solo_lectura
+@respuesta_condicional(_version_grafico_usuarios)
+async def obtener_datos_grafico_usuarios(request):
+    """Obtiene datos para el gráfico de crecimiento de usuarios (una consulta por serie, en paralelo bajo ASGI)"""
     try:
         periodo = request.GET.get('periodo', 'month')
+        labels, cortes = _cortes_grafico(periodo, timezone.localdate())
+        alias = await sync_to_async(alias_lectura)()
         
-        # Datos simulados - reemplazar con consultas reales
-        if periodo == 'month':
-            data = {
-                'labels': ['Sem 1', 'Sem 2', 'Sem 3', 'Sem 4'],
-                'datasets': [
-                    {
-                        'label': 'Estudiantes',
-                        'data': [65, 70, 75, 80],
-                        'borderColor': '#6f42c1',
-                        'backgroundColor': 'rgba(111, 66, 193, 0.1)'
-                    },
-                    {
-                        'label': 'Docentes', 
-                        'data': [20, 22, 24, 26],
-                        'borderColor': '#198754',
-                        'backgroundColor': 'rgba(25, 135, 84, 0.1)'
-                    },
-                    {
-                        'label': 'Visitantes',
-                        'data': [8, 10, 12, 14],
-                        'borderColor': '#ffc107',
-                        'backgroundColor': 'rgba(255, 193, 7, 0.1)'
-                    }
-                ]
-            }
-        else:  # year
-            data = {
-                'labels': ['2020', '2021', '2022', '2023', '2024'],
-                'datasets': [
-                    {
-                        'label': 'Estudiantes',
-                        'data': [1200, 1450, 1680, 1920, 2150],
-                        'borderColor': '#6f42c1',
-                        'backgroundColor': 'rgba(111, 66, 193, 0.1)'
-                    },
-                    {
-                        'label': 'Docentes',
-                        'data': [450, 520, 580, 640, 720],
-                        'borderColor': '#198754', 
-                        'backgroundColor': 'rgba(25, 135, 84, 0.1)'
-                    },
-                    {
-                        'label': 'Visitantes',
-                        'data': [180, 220, 260, 310, 360],
-                        'borderColor': '#ffc107',
-                        'backgroundColor': 'rgba(255, 193, 7, 0.1)'
-                    }
-                ]
-            }
+        # Usuarios acumulados de cada tipo registrados hasta cada fecha de corte
+        columnas = ', '.join('COUNT(*) FILTER (WHERE fecha_registro <= %s)' for _ in cortes)
+        resultados = await consultar_concurrentes({
+            tipo: (
+                f"SELECT {columnas} FROM sh_biblioteca.usuario WHERE id_tipo_usuario = %s",
+                [*cortes, tipo],
+            )
+            for _, tipo, _, _ in SERIES_GRAFICO_USUARIOS
+        }, alias=alias, paralelo=isinstance(request, ASGIRequest))
+        
+        datasets = []
+        for etiqueta, tipo, borde, fondo in SERIES_GRAFICO_USUARIOS:
+            if isinstance(resultados[tipo], Exception):
+                raise resultados[tipo]
+            datasets.append({
+                'label': etiqueta,
+                'data': list(resultados[tipo][0]),
+                'borderColor': borde,
+                'backgroundColor': fondo
+            })
         
         return JsonResponse({
             'success': True,
-            'data': data
+            'data': {
+                'labels': labels,
+                'datasets': datasets
+            }
         })
         
     except Exception as e:
@@ -572,6 +760,84 @@ def obtener_datos_grafico_usuarios(request):
             'error': str(e)
         })
 
+# Reportes sobre vistas materializadas (core/reportes.py): nunca leen el historial de préstamos
+
+def _parametros_reporte(request):
+    """(límite, filtros) de la petición; ValueError si no son válidos"""
+    limite = request.GET.get('limite')
+    limite = min(max(int(limite), 1), 1000) if limite else None
+    filtros = {}
+    for clave in ('desde', 'hasta'):
+        valor = request.GET.get(clave)
+        if valor:
+            datetime.strptime(valor, '%Y-%m')
+            filtros[clave] = valor
+    return limite, filtros
+
+def _version_reporte(request):
+    # Los datos solo cambian cuando 'actualizar_reportes' recalcula la vista
+    nombre = request.resolver_match.kwargs['nombre']
+    try:
+        fecha = reporte_actualizado_en(nombre, conexion_lectura())
+    except ReporteNoDisponible:
+        # Vista aún sin calcular: la respuesta es el 404 de la vista
+        raise VersionNoDisponible
+    return (nombre, fecha, sorted(request.GET.items())), fecha
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+@solo_lectura
+def obtener_datos_reporte(request, nombre):
+    """Filas de un reporte (?limite=, y ?desde=/?hasta= AAAA-MM en el mensual) con la fecha de sus datos"""
+    # Un nombre desconocido se descarta antes de calcular la versión
+    if nombre not in REPORTES:
+        return JsonResponse({'success': False, 'error': f'Reporte no válido: {nombre}'}, status=404)
+    return _datos_reporte(request, nombre)
+
+@respuesta_condicional(_version_reporte)
+def _datos_reporte(request, nombre):
+    try:
+        limite, filtros = _parametros_reporte(request)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Parámetros no válidos'}, status=400)
+    
+    try:
+        datos = obtener_reporte(nombre, limite, filtros, conexion_lectura())
+    except ReporteNoDisponible as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
+    
+    datos['actualizado_en'] = datos['actualizado_en'].isoformat()
+    return JsonResponse({'success': True, **datos})
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+@solo_lectura
+def superuser_reportes(request):
+    """Página de reportes: el reporte elegido (?reporte=) y la fecha de los datos de cada uno"""
+    nombre = request.GET.get('reporte')
+    if nombre not in REPORTES:
+        nombre = next(iter(REPORTES))
+    
+    context = {'reporte_actual': nombre, 'reportes': [], 'reporte': None}
+    try:
+        limite, filtros = _parametros_reporte(request)
+    except ValueError:
+        limite, filtros = None, {}
+        context['error'] = 'Parámetros no válidos'
+    
+    conexion = conexion_lectura()
+    try:
+        context['reportes'] = reportes_disponibles(conexion)
+        reporte = obtener_reporte(nombre, limite, filtros, conexion)
+        claves = [columna['clave'] for columna in reporte['columnas']]
+        reporte['filas'] = [[fila[clave] for clave in claves] for fila in reporte['filas']]
+        context['reporte'] = reporte
+        context['filtros'] = filtros
+    except ReporteNoDisponible as e:
+        context['error'] = str(e)
+    
+    return render(request, 'pages/superuser/reportes.html', context)
+
 # ==========================================
 # VISTAS DE CONFIGURACIÓN DEL SISTEMA
 # ==========================================
@@ -583,31 +849,18 @@ def guardar_politicas_password(request):
     """Guarda las políticas de contraseña del sistema"""
     if request.method == 'POST':
         try:
-            import json
             data = json.loads(request.body)
             
-            # Aquí guardarías en base de datos o archivo de configuración
-            # Por ahora simulamos el guardado
-            politicas = {
-                'min_length': data.get('min_length', 8),
-                'max_length': data.get('max_length', 128),
-                'require_uppercase': data.get('require_uppercase', True),
-                'require_lowercase': data.get('require_lowercase', True),
-                'require_numbers': data.get('require_numbers', True),
-                'require_special': data.get('require_special', False),
-                'password_expiry': data.get('password_expiry', 90),
-                'max_attempts': data.get('max_attempts', 5),
-                'lockout_duration': data.get('lockout_duration', 30),
-                'history_count': data.get('history_count', 5),
-                'force_change_first_login': data.get('force_change_first_login', True)
-            }
+            politicas = guardar_configuracion(data, POLITICA_PASSWORD_POR_DEFECTO)
             
-            # Simular guardado exitoso
             return JsonResponse({
                 'success': True,
-                'message': 'Políticas de contraseña actualizadas exitosamente'
+                'message': 'Políticas de contraseña actualizadas exitosamente',
+                'politicas': politicas
             })
             
+        except ValorConfiguracionInvalido as e:
+            return JsonResponse({'success': False, 'error': str(e), 'campo': e.clave}, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -623,27 +876,18 @@ def guardar_configuracion_sistema(request):
     """Guarda la configuración general del sistema"""
     if request.method == 'POST':
         try:
-            import json
             data = json.loads(request.body)
             
-            # Aquí guardarías la configuración en base de datos
-            configuracion = {
-                'nombre_sistema': data.get('nombre_sistema', 'Biblioteca Universitaria'),
-                'email_admin': data.get('email_admin', 'admin@biblioteca.edu.bo'),
-                'timezone': data.get('timezone', 'America/La_Paz'),
-                'idioma': data.get('idioma', 'es'),
-                'mantenimiento': data.get('mantenimiento', False),
-                'registro_publico': data.get('registro_publico', True),
-                'notificaciones_email': data.get('notificaciones_email', True),
-                'backup_automatico': data.get('backup_automatico', True),
-                'logs_detallados': data.get('logs_detallados', True)
-            }
+            configuracion = guardar_configuracion(data, CONFIGURACION_SISTEMA_POR_DEFECTO)
             
             return JsonResponse({
                 'success': True,
-                'message': 'Configuración del sistema actualizada exitosamente'
+                'message': 'Configuración del sistema actualizada exitosamente',
+                'configuracion': configuracion
             })
             
+        except ValorConfiguracionInvalido as e:
+            return JsonResponse({'success': False, 'error': str(e), 'campo': e.clave}, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -692,8 +936,12 @@ def realizar_backup(request):
     
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
+# Versión de los logs simulados; cambiará al conectar un sistema de logs real
+VERSION_LOGS_SEGURIDAD = 1
+
 @login_required
 @user_passes_test(is_superuser, login_url='/')
+@respuesta_condicional(lambda request: (VERSION_LOGS_SEGURIDAD, None))
 def obtener_logs_seguridad(request):
     """Obtiene los logs de seguridad del sistema"""
     try:
@@ -733,11 +981,39 @@ def obtener_logs_seguridad(request):
             'error': str(e)
         })
 
+# Segundos durante los que el estado del sistema se considera vigente
+VIGENCIA_ESTADO_SISTEMA = 10
+
+def _version_estado_sistema(request):
+    """El estado cambia continuamente: una versión por intervalo de VIGENCIA_ESTADO_SISTEMA"""
+    intervalo = int(timezone.now().timestamp()) // VIGENCIA_ESTADO_SISTEMA
+    inicio = datetime.fromtimestamp(intervalo * VIGENCIA_ESTADO_SISTEMA, tz=dt_timezone.utc)
+    return intervalo, inicio
+
 @login_required
 @user_passes_test(is_superuser, login_url='/')
-def obtener_estado_sistema(request):
-    """Obtiene el estado actual del sistema"""
+@respuesta_condicional(_version_estado_sistema)
+async def obtener_estado_sistema(request):
+    """Obtiene el estado actual del sistema (consultas a la BD en paralelo bajo ASGI)"""
     try:
+        resultados = await consultar_concurrentes({
+            'conexiones': """
+                SELECT (SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()),
+                       current_setting('max_connections')::int
+            """,
+            'tamano': "SELECT pg_size_pretty(pg_database_size(current_database()))",
+            'version': "SELECT current_setting('server_version')",
+            'inicio': "SELECT pg_postmaster_start_time()",
+            'sesiones': "SELECT COUNT(*) FROM django_session WHERE expire_date > now()",
+        }, paralelo=isinstance(request, ASGIRequest))
+        
+        if isinstance(resultados['conexiones'], Exception):
+            raise resultados['conexiones']
+        abiertas, maximo = resultados['conexiones'][0]
+        
+        inicio = escalar(resultados['inicio'], None)
+        actividad = timezone.now() - inicio if inicio else None
+        
         estado = {
             'servidor': {
                 'cpu': 25.0,
@@ -747,8 +1023,10 @@ def obtener_estado_sistema(request):
             },
             'base_datos': {
                 'estado': 'Conectado',
-                'conexiones': '12/100',
-                'tamaño': '2.4 GB',
+                'conexiones': f'{abiertas}/{maximo}',
+                'pool': estadisticas_pool(),
+                'replica': await sync_to_async(estado_replica)() if replica_configurada() else None,
+                'tamaño': escalar(resultados['tamano'], '-'),
                 'ultimo_backup': 'Hoy 02:00',
                 'consultas_por_segundo': 45
             },
@@ -764,13 +1042,15 @@ def obtener_estado_sistema(request):
             },
             'informacion': {
                 'version_sistema': 'v2.1.0',
-                'django': '5.2.8',
-                'python': '3.11.5',
-                'postgresql': '15.4',
-                'tiempo_actividad': '15 días, 8 horas',
-                'ultimo_reinicio': '2024-01-15 14:30:00',
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'postgresql': escalar(resultados['version'], '-'),
+                'tiempo_actividad': (
+                    f'{actividad.days} días, {actividad.seconds // 3600} horas' if actividad else '-'
+                ),
+                'ultimo_reinicio': timezone.localtime(inicio).strftime('%Y-%m-%d %H:%M:%S') if inicio else '-',
                 'usuarios_conectados': 23,
-                'sesiones_activas': 45
+                'sesiones_activas': escalar(resultados['sesiones'])
             }
         }
         
@@ -785,16 +1065,72 @@ def obtener_estado_sistema(request):
             'error': str(e)
         })
 
+# ==========================================
+# PERFILES DE PETICIONES (cProfile)
+# ==========================================
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+def listar_perfiles(request):
+    """Perfiles guardados por PerfiladoMiddleware, del más reciente al más antiguo"""
+    return JsonResponse({'success': True, 'perfiles': listar_perfiles_guardados()})
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+def detalle_perfil(request, perfil_id):
+    """Funciones con más tiempo acumulado de un perfil (?limite=, por defecto 30)"""
+    try:
+        limite = min(max(int(request.GET.get('limite', 30)), 1), 500)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Límite no válido'}, status=400)
+    
+    funciones = funciones_principales(perfil_id, limite)
+    if funciones is None:
+        return JsonResponse({'success': False, 'error': 'Perfil no encontrado'}, status=404)
+    return JsonResponse({'success': True, 'id': perfil_id, 'funciones': funciones})
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+def descargar_perfil(request, perfil_id):
+    """Archivo .prof del perfil (snakeviz, python -m pstats)"""
+    ruta = ruta_perfil(perfil_id)
+    if ruta is None:
+        raise Http404('Perfil no encontrado')
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=f'perfil_{perfil_id}.prof')
+
+# ==========================================
+# CONSULTAS LENTAS
+# ==========================================
+
+@login_required
+@user_passes_test(is_superuser, login_url='/')
+@csrf_exempt
+def consultas_lentas(request):
+    """
+    GET: consultas lentas de este proceso agrupadas por sentencia normalizada.
+    DELETE: vacía el registro.
+    """
+    if request.method == 'DELETE':
+        limpiar_consultas_lentas()
+        return JsonResponse({'success': True})
+    
+    return JsonResponse({
+        'success': True,
+        'umbral_ms': umbral_consultas_lentas(),
+        'consultas': resumen_consultas_lentas(),
+    })
+
 @login_required
 @user_passes_test(is_superuser, login_url='/')
 @csrf_exempt
+@solo_lectura
 def exportar_datos_excel(request):
     """Exporta datos del sistema a Excel"""
     if request.method == 'POST':
         try:
             import json
             from django.http import HttpResponse
-            from django.db import connection
+            connection = conexion_lectura()
             import io
             from datetime import datetime
             
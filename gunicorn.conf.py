@@ -0,0 +1,19 @@
+"""
+Configuración de gunicorn (se carga sola al ejecutar gunicorn desde la raíz del proyecto).
+
+    gunicorn biblioteca.wsgi:application --preload --workers 4
+
+Con --preload la aplicación se importa en el proceso maestro antes del fork. El
+precalentamiento (core/precalentamiento.py) no abre ahí el pool de conexiones ni carga
+la configuración: lo hace cada worker en post_worker_init, con o sin --preload.
+"""
+import os
+
+
+os.environ['PRECALENTAR_CONEXIONES_POR_WORKER'] = '1'
+
+
+def post_worker_init(worker):
+    from core.precalentamiento import precalentar_worker
+
+    precalentar_worker()
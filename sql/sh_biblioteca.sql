@@ -0,0 +1,175 @@
+-- ========================================
+-- ESQUEMA sh_biblioteca - versión 1
+-- ========================================
+-- Tablas que los modelos de core declaran con managed = False y datos de los
+-- catálogos. Las tablas propias de Django (pre_registro, configuración, auth,
+-- sesiones) se crean con `python manage.py migrate`.
+--
+-- Cualquier cambio en este archivo regenera la plantilla de la base de datos
+-- de pruebas (ver core/test_runner.py).
+
+CREATE SCHEMA IF NOT EXISTS sh_biblioteca;
+SET search_path = sh_biblioteca, public;
+
+-- ========================================
+-- TABLAS CATÁLOGO
+-- ========================================
+
+CREATE TABLE sexo (
+    id_sexo char(2) PRIMARY KEY,
+    sexo char(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE tipo_usuario (
+    id_tipo_usuario char(4) PRIMARY KEY,
+    tipo_usuario char(20) NOT NULL
+);
+
+CREATE TABLE grado_academico (
+    id_grado_academico char(5) PRIMARY KEY,
+    grado_academico char(20) NOT NULL
+);
+
+CREATE TABLE modalidad_ingreso (
+    id_modalidad_ingreso char(6) PRIMARY KEY,
+    modalidad_ingreso varchar(60) NOT NULL
+);
+
+CREATE TABLE estado_usuario (
+    id_estado_usuario char(5) PRIMARY KEY,
+    estado_usuario char(20) NOT NULL
+);
+
+CREATE TABLE turno (
+    id_turno char(4) PRIMARY KEY,
+    turno char(20) NOT NULL
+);
+
+CREATE TABLE cargo (
+    id_cargo char(4) PRIMARY KEY,
+    cargo varchar(50) NOT NULL
+);
+
+CREATE TABLE categoria (
+    id_categoria char(5) PRIMARY KEY,
+    categoria varchar(50) NOT NULL
+);
+
+-- ========================================
+-- TABLAS PRINCIPALES
+-- ========================================
+
+CREATE TABLE persona (
+    id_persona serial PRIMARY KEY,
+    ci varchar(15) NOT NULL UNIQUE,
+    nombres varchar(50) NOT NULL,
+    paterno varchar(50),
+    materno varchar(50),
+    direccion varchar(100),
+    telefono varchar(15),
+    email varchar(30) UNIQUE,
+    fecha_nacimiento date,
+    id_sexo char(2) NOT NULL REFERENCES sexo
+);
+
+CREATE TABLE usuario (
+    id_usuario serial PRIMARY KEY,
+    id_persona integer NOT NULL UNIQUE REFERENCES persona,
+    id_tipo_usuario char(4) NOT NULL REFERENCES tipo_usuario,
+    id_modalidad_ingreso char(6) REFERENCES modalidad_ingreso,
+    id_grado_academico char(5) REFERENCES grado_academico,
+    id_estado_usuario char(5) REFERENCES estado_usuario,
+    fecha_registro date NOT NULL DEFAULT CURRENT_DATE
+);
+
+CREATE TABLE empleado (
+    id_empleado serial PRIMARY KEY,
+    id_persona integer NOT NULL REFERENCES persona,
+    id_turno char(4) NOT NULL REFERENCES turno,
+    id_cargo char(4) NOT NULL REFERENCES cargo,
+    fecha_contratacion date NOT NULL
+);
+
+CREATE TABLE libro (
+    id_libro serial PRIMARY KEY,
+    isbn varchar(20) UNIQUE,
+    titulo varchar(150) NOT NULL,
+    autor varchar(100),
+    id_categoria char(5) REFERENCES categoria,
+    anio_publicacion integer,
+    ejemplares integer NOT NULL DEFAULT 1
+);
+
+CREATE TABLE prestamo (
+    id_prestamo serial PRIMARY KEY,
+    id_libro integer NOT NULL REFERENCES libro,
+    id_usuario integer NOT NULL REFERENCES usuario,
+    id_empleado integer REFERENCES empleado,
+    fecha_prestamo date NOT NULL DEFAULT CURRENT_DATE,
+    fecha_devolucion date NOT NULL,
+    fecha_entrega date,
+    estado varchar(10) NOT NULL DEFAULT 'ACTIVO'
+        CHECK (estado IN ('ACTIVO', 'DEVUELTO', 'VENCIDO'))
+);
+
+-- ========================================
+-- DATOS DE LOS CATÁLOGOS
+-- ========================================
+
+INSERT INTO sexo (id_sexo, sexo) VALUES
+    ('M', 'Masculino'),
+    ('F', 'Femenino'),
+    ('O', 'Otro');
+
+INSERT INTO tipo_usuario (id_tipo_usuario, tipo_usuario) VALUES
+    ('U-01', 'Estudiante'),
+    ('U-02', 'Docente'),
+    ('U-03', 'Administrador'),
+    ('U-04', 'Invitado');
+
+INSERT INTO grado_academico (id_grado_academico, grado_academico) VALUES
+    ('GA-01', 'Primaria'),
+    ('GA-02', 'Secundaria'),
+    ('GA-03', 'Bachillerato'),
+    ('GA-04', 'Técnico'),
+    ('GA-05', 'Licenciatura'),
+    ('GA-06', 'Maestría'),
+    ('GA-07', 'Doctorado');
+
+INSERT INTO modalidad_ingreso (id_modalidad_ingreso, modalidad_ingreso) VALUES
+    ('MIE-01', 'Prueba de Suficiencia Académica (PSA)'),
+    ('MIE-02', 'Curso Preuniversitario (CPU)'),
+    ('MIE-03', 'Examen de Dispensación (Excelencia Académica)'),
+    ('MIE-04', 'Transferencia Externa'),
+    ('MIE-05', 'Cambio de Carrera'),
+    ('MIE-06', 'Convenios Especiales'),
+    ('MIE-07', 'Titulados'),
+    ('MID-08', 'Concurso de Méritos y Examen de Competencia'),
+    ('MID-09', 'Interinato (Designación Temporal)'),
+    ('MID-10', 'Contrato Docente'),
+    ('MID-11', 'Titularización por Antigüedad'),
+    ('MID-12', 'Designación Directa (Autoridades)');
+
+INSERT INTO estado_usuario (id_estado_usuario, estado_usuario) VALUES
+    ('EU-01', 'Activo'),
+    ('EU-02', 'Inactivo');
+
+INSERT INTO turno (id_turno, turno) VALUES
+    ('T-01', 'Mañana'),
+    ('T-02', 'Tarde'),
+    ('T-03', 'Noche');
+
+INSERT INTO cargo (id_cargo, cargo) VALUES
+    ('C-01', 'Administrador'),
+    ('C-02', 'Bibliotecario'),
+    ('C-03', 'Asistente');
+
+INSERT INTO categoria (id_categoria, categoria) VALUES
+    ('CAT01', 'Ciencias Exactas'),
+    ('CAT02', 'Ingeniería'),
+    ('CAT03', 'Medicina'),
+    ('CAT04', 'Derecho'),
+    ('CAT05', 'Economía'),
+    ('CAT06', 'Humanidades'),
+    ('CAT07', 'Literatura'),
+    ('CAT08', 'Arquitectura');
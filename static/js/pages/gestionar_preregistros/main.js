@@ -8,10 +8,10 @@ function getCSRFToken() {
     return document.querySelector('[name=csrfmiddlewaretoken]').value;
 }
 
-// Función para aprobar pre-registro
-function aprobarPreregistro(id) {
+// Función para aprobar pre-registro (alTerminar: en modo cola, en lugar de recargar)
+function aprobarPreregistro(id, alTerminar) {
     if (confirm('¿Está seguro de aprobar este pre-registro?')) {
-        fetch(`/core/aprobar-preregistro/${id}/`, {
+        fetch(`/aprobar-preregistro/${id}/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': getCSRFToken(),
@@ -22,7 +22,7 @@ function aprobarPreregistro(id) {
         .then(data => {
             if (data.success) {
                 showSuccess('Pre-registro aprobado exitosamente', 3000);
-                setTimeout(() => location.reload(), 1500);
+                alTerminar ? alTerminar(id) : setTimeout(() => location.reload(), 1500);
             } else {
                 showError('Error: ' + data.error, 5000);
             }
@@ -34,10 +34,10 @@ function aprobarPreregistro(id) {
 }
 
 // Función para rechazar pre-registro
-function rechazarPreregistro(id) {
+function rechazarPreregistro(id, alTerminar) {
     const motivo = prompt('Motivo del rechazo (opcional):');
     if (motivo !== null) {
-        fetch(`/core/rechazar-preregistro/${id}/`, {
+        fetch(`/rechazar-preregistro/${id}/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': getCSRFToken(),
@@ -49,7 +49,7 @@ function rechazarPreregistro(id) {
         .then(data => {
             if (data.success) {
                 showWarning('Pre-registro rechazado', 3000);
-                setTimeout(() => location.reload(), 1500);
+                alTerminar ? alTerminar(id) : setTimeout(() => location.reload(), 1500);
             } else {
                 showError('Error: ' + data.error, 5000);
             }
@@ -64,7 +64,7 @@ function rechazarPreregistro(id) {
 function bloquearUsuario(id) {
     const motivo = prompt('Motivo del bloqueo:');
     if (motivo !== null && motivo.trim() !== '') {
-        fetch(`/core/bloquear-usuario/${id}/`, {
+        fetch(`/bloquear-usuario/${id}/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': getCSRFToken(),
@@ -90,7 +90,7 @@ function bloquearUsuario(id) {
 // Función para activar usuario
 function activarUsuario(id) {
     if (confirm('¿Está seguro de reactivar este usuario?')) {
-        fetch(`/core/activar-usuario/${id}/`, {
+        fetch(`/activar-usuario/${id}/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': getCSRFToken(),
@@ -112,7 +112,217 @@ function activarUsuario(id) {
     }
 }
 
+// ==========================================
+// MODO COLA
+// ==========================================
+
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto ?? '';
+    return div.innerHTML;
+}
+
+// Quita de la cola una fila ya decidida
+function quitarDeCola(id) {
+    const fila = document.getElementById(`cola-fila-${id}`);
+    if (fila) fila.remove();
+    if (!document.querySelector('#cola-filas tr')) {
+        document.getElementById('cola-tabla').classList.add('d-none');
+        document.getElementById('cola-vencimiento').textContent = '';
+    }
+}
+
+function mostrarCola(preregistros, segundos) {
+    const filas = document.getElementById('cola-filas');
+    filas.innerHTML = preregistros.map(pre => `
+        <tr id="cola-fila-${pre.id}">
+            <td>${escaparHtml(pre.ci)}</td>
+            <td>${escaparHtml(pre.nombre_completo)}</td>
+            <td>${escaparHtml(pre.email || 'Sin email')}</td>
+            <td><span class="badge bg-info">${escaparHtml(pre.tipo_usuario)}</span></td>
+            <td>${escaparHtml(pre.fecha_registro)}</td>
+            <td>
+                <button class="btn btn-sm btn-success me-1" onclick="aprobarPreregistro(${pre.id}, quitarDeCola)">
+                    <i class="fas fa-check"></i> Aprobar
+                </button>
+                <button class="btn btn-sm btn-danger" onclick="rechazarPreregistro(${pre.id}, quitarDeCola)">
+                    <i class="fas fa-times"></i> Rechazar
+                </button>
+            </td>
+        </tr>`).join('');
+
+    document.getElementById('cola-tabla').classList.toggle('d-none', preregistros.length === 0);
+    const vence = new Date(Date.now() + segundos * 1000);
+    document.getElementById('cola-vencimiento').textContent = preregistros.length
+        ? `Reservados hasta las ${vence.toLocaleTimeString()}`
+        : '';
+}
+
+// Reclamar los siguientes N pendientes (renueva también los ya reservados)
+function reclamarSiguientes() {
+    const cantidad = parseInt(document.getElementById('cola-cantidad').value, 10) || 5;
+    fetch('/gestionar-preregistros/reclamar/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCSRFToken(),
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({cantidad: cantidad})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            mostrarCola(data.preregistros, data.reserva_segundos);
+            if (data.preregistros.length === 0) {
+                showWarning('No quedan pre-registros pendientes sin reservar', 3000);
+            }
+        } else {
+            showError('Error: ' + data.error, 5000);
+        }
+    })
+    .catch(error => {
+        showError('Error de conexión: ' + error.message, 5000);
+    });
+}
+
+// Devolver a la cola las reservas propias
+function liberarReservas() {
+    fetch('/gestionar-preregistros/liberar/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCSRFToken(),
+            'Content-Type': 'application/json',
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            mostrarCola([], 0);
+            showSuccess(`${data.liberados} pre-registros devueltos a la cola`, 3000);
+        } else {
+            showError('Error: ' + data.error, 5000);
+        }
+    })
+    .catch(error => {
+        showError('Error de conexión: ' + error.message, 5000);
+    });
+}
+
+// ==========================================
+// HISTORIAL
+// ==========================================
+
+const COLORES_EVENTO = {
+    APROBADO: 'bg-success',
+    RECHAZADO: 'bg-danger',
+    BLOQUEADO: 'bg-secondary',
+    REACTIVADO: 'bg-info',
+    NOTA: 'bg-light text-dark',
+};
+
+// El historial no viaja con el listado: se pide al abrir el detalle
+function verHistorial(id) {
+    const lista = document.getElementById('historial-eventos');
+    lista.innerHTML = '<li class="list-group-item text-muted">Cargando...</li>';
+    bootstrap.Modal.getOrCreateInstance(document.getElementById('historialModal')).show();
+
+    fetch(`/gestionar-preregistros/${id}/historial/`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            showError('Error: ' + data.error, 5000);
+            return;
+        }
+        lista.innerHTML = data.eventos.length
+            ? data.eventos.map(evento => `
+                <li class="list-group-item">
+                    <span class="badge ${COLORES_EVENTO[evento.tipo] || 'bg-light text-dark'} me-2">${escaparHtml(evento.tipo_display)}</span>
+                    <small class="text-muted">${escaparHtml(evento.fecha)}</small>
+                    <div>${escaparHtml(evento.detalle)}</div>
+                </li>`).join('')
+            : '<li class="list-group-item text-muted">Sin eventos</li>';
+    })
+    .catch(error => {
+        showError('Error de conexión: ' + error.message, 5000);
+    });
+}
+
+// ==========================================
+// ACCIONES MASIVAS
+// ==========================================
+
+// Estados de origen permitidos por acción (los demás seleccionados se omiten en el servidor)
+const ACCIONES_MASIVAS = {
+    bloquear: {origen: 'ACTIVO', pregunta: 'Motivo del bloqueo:', exito: 'bloqueados'},
+    activar: {origen: 'INACTIVO', pregunta: null, exito: 'reactivados'},
+    rechazar: {origen: 'PENDIENTE', pregunta: 'Motivo del rechazo (opcional):', exito: 'rechazados'},
+};
+
+function seleccionados() {
+    return Array.from(document.querySelectorAll('.seleccion-preregistro:checked'));
+}
+
+function actualizarContadorSeleccion() {
+    const contador = document.getElementById('seleccion-contador');
+    if (contador) contador.textContent = `${seleccionados().length} seleccionados`;
+}
+
+function transicionMasiva(accion) {
+    const config = ACCIONES_MASIVAS[accion];
+    const ids = seleccionados()
+        .filter(casilla => casilla.dataset.estado === config.origen)
+        .map(casilla => parseInt(casilla.value, 10));
+
+    if (ids.length === 0) {
+        showWarning('Ningún pre-registro seleccionado admite esta acción', 3000);
+        return;
+    }
+
+    let motivo = '';
+    if (config.pregunta) {
+        motivo = prompt(config.pregunta);
+        if (motivo === null) return;
+    } else if (!confirm(`¿Está seguro de reactivar ${ids.length} usuarios?`)) {
+        return;
+    }
+
+    fetch(`/gestionar-preregistros/masivo/${accion}/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCSRFToken(),
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ids: ids, motivo: motivo})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const omitidos = data.omitidos.length ? ` (${data.omitidos.length} omitidos)` : '';
+            showSuccess(`${data.afectados} pre-registros ${config.exito}${omitidos}`, 3000);
+            setTimeout(() => location.reload(), 1500);
+        } else {
+            showError('Error: ' + data.error, 5000);
+        }
+    })
+    .catch(error => {
+        showError('Error de conexión: ' + error.message, 5000);
+    });
+}
+
 // Inicialización
 document.addEventListener('DOMContentLoaded', function() {
+    const todos = document.getElementById('seleccionar-todos');
+    if (todos) {
+        todos.addEventListener('change', () => {
+            document.querySelectorAll('.seleccion-preregistro').forEach(casilla => {
+                casilla.checked = todos.checked;
+            });
+            actualizarContadorSeleccion();
+        });
+    }
+    document.querySelectorAll('.seleccion-preregistro').forEach(casilla => {
+        casilla.addEventListener('change', actualizarContadorSeleccion);
+    });
+
     console.log('Gestionar pre-registros JavaScript loaded successfully');
 });
\ No newline at end of file
@@ -531,14 +531,12 @@ async function downloadExcelFile(options) {
 async function showSecurityLogs() {
     try {
         // Cargar logs desde el servidor
-        const response = await fetch('/superuser/api/logs-seguridad/', {
-            method: 'GET',
-            headers: {
-                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-            }
-        });
+        const response = await fetchJsonConditional('/superuser/api/logs-seguridad/');
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         
-        const result = await response.json();
+        const result = response.data;
         
         if (result.success) {
             const logsHTML = generateSecurityLogsHTML(result.logs);
@@ -644,14 +642,12 @@ async function showSystemHealth() {
  */
 async function refreshSystemStatus() {
     try {
-        const response = await fetch('/superuser/api/estado-sistema/', {
-            method: 'GET',
-            headers: {
-                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-            }
-        });
+        const response = await fetchJsonConditional('/superuser/api/estado-sistema/');
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         
-        const result = await response.json();
+        const result = response.data;
         
         if (result.success) {
             updateSystemStatusModal(result.estado);
@@ -684,6 +680,16 @@ function updateSystemStatusModal(estado) {
         updateSystemInfo('db-conexiones', estado.base_datos.conexiones);
         updateSystemInfo('db-tamaño', estado.base_datos.tamaño);
         updateSystemInfo('db-backup', estado.base_datos.ultimo_backup);
+        
+        // Pool de conexiones (null si el servidor no usa pool)
+        const pool = estado.base_datos.pool;
+        if (pool) {
+            updateSystemInfo('db-pool', `${pool.en_uso}/${pool.max} (${pool.disponibles} libres)`);
+            updateSystemInfo('db-pool-espera', `${pool.espera_promedio_ms} ms promedio`);
+            updateSystemInfo('db-pool-agotamientos', `${pool.agotamientos} / ${pool.timeouts}`);
+        } else {
+            updateSystemInfo('db-pool', 'Sin pool');
+        }
     }
     
     // Actualizar servicios
@@ -871,14 +877,53 @@ function updateDashboardStats() {
     // Aquí se actualizarían las métricas mostradas
 }
 
+// Últimas estadísticas recibidas; los eventos 'cambios' solo traen los campos modificados
+let dashboardStatsState = {};
+let statisticsPollingTimer = null;
+
 /**
- * Inicia las actualizaciones en tiempo real
+ * Inicia las actualizaciones en tiempo real: Server-Sent Events si el servidor
+ * los admite (ASGI) y consulta periódica como alternativa
  */
 function startRealTimeUpdates() {
-    // Actualizar cada 30 segundos
-    setInterval(() => {
+    if (!window.EventSource) {
+        startStatisticsPolling();
+        return;
+    }
+    
+    const source = new EventSource('/superuser/api/estadisticas/stream/');
+    
+    source.addEventListener('snapshot', (event) => {
+        dashboardStatsState = JSON.parse(event.data);
+        updateDashboardCounters(dashboardStatsState);
+    });
+    
+    source.addEventListener('cambios', (event) => {
+        Object.assign(dashboardStatsState, JSON.parse(event.data));
+        updateDashboardCounters(dashboardStatsState);
+    });
+    
+    source.onerror = () => {
+        // CLOSED: el servidor no transmite (204 bajo WSGI) o rechazó la conexión.
+        // En otros errores EventSource reconecta solo.
+        if (source.readyState === EventSource.CLOSED) {
+            console.warn('⚠️ Sin transmisión de estadísticas, se usa consulta periódica');
+            startStatisticsPolling();
+        }
+    };
+}
+
+/**
+ * Consulta las estadísticas cada 30 segundos mientras la pestaña esté visible
+ */
+function startStatisticsPolling() {
+    if (statisticsPollingTimer) {
+        return;
+    }
+    loadUserStatistics();
+    statisticsPollingTimer = setInterval(() => {
         if (!document.hidden) {
-            updateDashboardStats();
+            loadUserStatistics();
         }
     }, 30000);
 }
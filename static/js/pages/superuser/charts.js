@@ -230,14 +230,12 @@ async function updateChartPeriod(period) {
     
     try {
         // Cargar datos desde el servidor
-        const response = await fetch(`/superuser/api/grafico-usuarios/?periodo=${period}`, {
-            method: 'GET',
-            headers: {
-                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-            }
-        });
+        const response = await fetchJsonConditional(`/superuser/api/grafico-usuarios/?periodo=${period}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         
-        const result = await response.json();
+        const result = response.data;
         
         if (result.success && result.data) {
             // Actualizar datos del gráfico
@@ -295,14 +293,12 @@ async function updateUsersChartData() {
  */
 async function fetchUsersChartData(periodo = 'month') {
     try {
-        const response = await fetch(`/superuser/api/grafico-usuarios/?periodo=${periodo}`, {
-            method: 'GET',
-            headers: {
-                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-            }
-        });
+        const response = await fetchJsonConditional(`/superuser/api/grafico-usuarios/?periodo=${periodo}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         
-        const result = await response.json();
+        const result = response.data;
         
         if (result.success) {
             return result.data;
@@ -24,13 +24,9 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeDashboard();
     loadDashboardData();
     setupEventListeners();
-    startRealTimeUpdates();
-    
-    // Cargar estadísticas inmediatamente
-    loadUserStatistics();
     
-    // Actualizar cada 30 segundos
-    setInterval(loadUserStatistics, 30000);
+    // Estadísticas por Server-Sent Events (o consulta periódica si no hay transmisión)
+    startRealTimeUpdates();
 });
 
 /**
@@ -145,20 +141,55 @@ async function loadDashboardData() {
     }
 }
 
+// Última respuesta y validadores (ETag / Last-Modified) de cada URL de la API
+const conditionalCache = new Map();
+
+/**
+ * GET a una API JSON enviando los validadores de la respuesta anterior.
+ * Si el servidor responde 304 se reutiliza el JSON guardado.
+ * Devuelve { ok, status, notModified, data }.
+ */
+async function fetchJsonConditional(url) {
+    const cached = conditionalCache.get(url);
+    const headers = { 'X-CSRFToken': getCsrfToken() };
+    if (cached) {
+        if (cached.etag) headers['If-None-Match'] = cached.etag;
+        if (cached.lastModified) headers['If-Modified-Since'] = cached.lastModified;
+    }
+    
+    // no-store: los validadores los gestiona esta función, no la caché del navegador
+    const response = await fetch(url, { method: 'GET', headers, cache: 'no-store' });
+    
+    if (response.status === 304 && cached) {
+        return { ok: true, status: 304, notModified: true, data: cached.data };
+    }
+    if (!response.ok) {
+        return { ok: false, status: response.status, notModified: false, data: null };
+    }
+    
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    const lastModified = response.headers.get('Last-Modified');
+    if (etag || lastModified) {
+        conditionalCache.set(url, { etag, lastModified, data });
+    } else {
+        conditionalCache.delete(url);
+    }
+    return { ok: true, status: response.status, notModified: false, data };
+}
+
 /**
  * Carga las estadísticas de usuarios desde el servidor
  */
 async function loadUserStatistics() {
     try {
-        const response = await fetch('/superuser/api/estadisticas/', {
-            method: 'GET',
-            headers: {
-                'X-CSRFToken': getCsrfToken()
-            }
-        });
+        const response = await fetchJsonConditional('/superuser/api/estadisticas/');
         
+        if (response.notModified) {
+            return;
+        }
         if (response.ok) {
-            const result = await response.json();
+            const result = response.data;
             if (result.success) {
                 updateDashboardCounters(result.data);
                 console.log('✅ Estadísticas actualizadas:', result.data);
@@ -736,7 +767,12 @@ async function saveSystemConfig() {
             registro_publico: formData.get('registro_publico') === 'on',
             notificaciones_email: formData.get('notificaciones_email') === 'on',
             backup_automatico: formData.get('backup_automatico') === 'on',
-            logs_detallados: formData.get('logs_detallados') === 'on'
+            logs_detallados: formData.get('logs_detallados') === 'on',
+            dias_prestamo_estudiante: parseInt(formData.get('dias_prestamo_estudiante')),
+            dias_prestamo_docente: parseInt(formData.get('dias_prestamo_docente')),
+            max_libros_usuario: parseInt(formData.get('max_libros_usuario')),
+            multas_activas: formData.get('multas_activas') === 'on',
+            multa_por_dia: parseFloat(formData.get('multa_por_dia'))
         };
         
         // Enviar al servidor
@@ -821,9 +821,89 @@ function exportUsersData() {
 /**
  * Importa datos de usuarios
  */
-function importUsersData() {
-    console.log('📥 Importando usuarios...');
-    showNotification('Función de importación en desarrollo', 'info');
+async function importUsersData() {
+    const { value: file } = await Swal.fire({
+        title: '📥 Importar Usuarios',
+        html: '<p class="small text-muted mb-2">Archivo .csv o .xlsx con columnas: ci, nombres, paterno, materno, ' +
+              'direccion, telefono, email, fecha_nacimiento, id_sexo, id_tipo_usuario, id_modalidad_ingreso, id_grado_academico</p>',
+        input: 'file',
+        inputAttributes: { accept: '.csv,.xlsx' },
+        showCancelButton: true,
+        confirmButtonText: 'Importar',
+        cancelButtonText: 'Cancelar',
+        inputValidator: (value) => !value && 'Seleccione un archivo'
+    });
+    
+    if (!file) return;
+    
+    console.log('📥 Importando usuarios desde', file.name);
+    
+    const formData = new FormData();
+    formData.append('archivo', file);
+    
+    try {
+        Swal.fire({
+            title: 'Importando...',
+            text: 'Validando y cargando las filas del archivo',
+            allowOutsideClick: false,
+            didOpen: () => Swal.showLoading()
+        });
+        
+        const response = await fetch('/superuser/api/importar-usuarios/', {
+            method: 'POST',
+            body: formData
+        });
+        const result = await response.json();
+        
+        if (!result.success) {
+            throw new Error(result.error || 'Error desconocido');
+        }
+        
+        await Swal.fire({
+            title: 'Importación completada',
+            html: generateImportReportHTML(result),
+            icon: result.total_rechazados ? 'warning' : 'success',
+            width: '700px'
+        });
+        
+        loadUsersData();
+        
+    } catch (error) {
+        console.error('❌ Error importando usuarios:', error);
+        Swal.fire('Error', 'Error al importar usuarios: ' + error.message, 'error');
+    }
+}
+
+/**
+ * Genera el resumen de la importación con las filas rechazadas
+ */
+function generateImportReportHTML(result) {
+    let html = `
+        <p><strong>${result.insertados}</strong> usuarios importados de <strong>${result.total}</strong> filas.</p>
+    `;
+    
+    if (result.total_rechazados) {
+        const filas = result.rechazados.map(r => `
+            <tr>
+                <td>${r.fila}</td>
+                <td>${r.ci || ''}</td>
+                <td>${r.nombres || ''}</td>
+                <td>${r.motivo}</td>
+            </tr>
+        `).join('');
+        
+        html += `
+            <p class="text-warning">${result.total_rechazados} filas rechazadas:</p>
+            <div class="table-responsive" style="max-height: 300px;">
+                <table class="table table-sm table-striped small text-start">
+                    <thead><tr><th>Fila</th><th>CI</th><th>Nombres</th><th>Motivo</th></tr></thead>
+                    <tbody>${filas}</tbody>
+                </table>
+            </div>
+        `;
+    }
+    
+    return html;
 }
 
 // Funciones de utilidad de fechas y formato